@@ -0,0 +1,70 @@
+"""Lookup and write cost of ConfigManager with many models and endpoints.
+
+Run from the repository root:
+
+    python benchmarks/bench_config.py [count]
+"""
+import sys
+import json
+import time
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from core.config_manager import ConfigManager  # noqa: E402
+
+
+def per_call(calls: int, seconds: float) -> str:
+    return f"{seconds / calls * 1e9:>8,.0f} ns/call"
+
+
+def main(count: int = 500, calls: int = 200_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "config.json"
+        path.write_text(json.dumps({
+            "litellm": {"models": [{"name": f"model-{i}"} for i in range(count)]},
+            "openhands": {"endpoints": [{"name": f"endpoint-{i}"} for i in range(count)]}
+        }))
+        config = ConfigManager(str(path))
+        last_model = f"model-{count - 1}"
+
+        start = time.perf_counter()
+        for _ in range(calls):
+            config.get('litellm.models')
+        print(f"get              x{calls}: {per_call(calls, time.perf_counter() - start)}")
+
+        start = time.perf_counter()
+        for _ in range(calls):
+            config.get_model(last_model)
+        print(f"get_model        x{calls}: {per_call(calls, time.perf_counter() - start)}")
+
+        # What get_model_config used to do: walk the path and scan the list
+        scans = calls // 100
+        start = time.perf_counter()
+        for _ in range(scans):
+            next(m for m in config._resolve('litellm.models') if m['name'] == last_model)
+        print(f"linear scan      x{scans}: {per_call(scans, time.perf_counter() - start)}"
+              f" ({count} models)")
+
+        sets = 1000
+        writes = config.writes
+        start = time.perf_counter()
+        with config.batch():
+            for i in range(sets):
+                config.set('litellm.default_model', f"model-{i}")
+        print(f"set in batch()   x{sets}: {per_call(sets, time.perf_counter() - start)}"
+              f", {config.writes - writes} file write(s)")
+
+        writes = config.writes
+        start = time.perf_counter()
+        for i in range(sets):
+            config.set('litellm.default_model', f"model-{i}")
+        elapsed = time.perf_counter() - start
+        config.close()
+        print(f"set (debounced)  x{sets}: {per_call(sets, elapsed)}"
+              f", {config.writes - writes} file write(s)")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
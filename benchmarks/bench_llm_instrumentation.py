@@ -0,0 +1,55 @@
+"""Per-call overhead of LiteLLMManager's completion instrumentation.
+
+Calls the wrapper with litellm.completion replaced by a stub that returns a
+canned response, and compares it with calling the stub directly.
+
+    python benchmarks/bench_llm_instrumentation.py [calls]
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import litellm  # noqa: E402
+from core.config_manager import ConfigManager  # noqa: E402
+from core.litellm_manager import LiteLLMManager  # noqa: E402
+
+
+def main(calls: int = 200_000):
+    config_path = Path(tempfile.mkdtemp()) / "config.json"
+    config_path.write_text(json.dumps({
+        "litellm": {"models": [], "default_model": "bench-model"},
+        "monitoring": {"prometheus": {"enabled": False}}
+    }))
+    manager = LiteLLMManager(ConfigManager(str(config_path)))
+
+    response = SimpleNamespace(
+        usage=SimpleNamespace(prompt_tokens=120, completion_tokens=40, total_tokens=160),
+        _hidden_params={"response_cost": 0.0004}
+    )
+    litellm.completion = lambda **kwargs: response
+    messages = [{"role": "user", "content": "hi"}]
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        litellm.completion(model="bench-model", messages=messages)
+    baseline = (time.perf_counter() - start) / calls
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        manager.completion(messages)
+    wrapped = (time.perf_counter() - start) / calls
+
+    print(f"direct:       {baseline * 1e6:6.2f} us/call")
+    print(f"instrumented: {wrapped * 1e6:6.2f} us/call")
+    print(f"overhead:     {(wrapped - baseline) * 1e6:6.2f} us/call")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
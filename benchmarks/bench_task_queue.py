@@ -0,0 +1,42 @@
+"""Enqueue/dequeue throughput of TaskQueue.
+
+Run from the repository root:
+
+    python benchmarks/bench_task_queue.py [count]
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from task_queue import TaskQueue  # noqa: E402
+
+
+def rate(count: int, seconds: float) -> str:
+    return f"{count / seconds:>12,.0f} tasks/s ({seconds * 1000:.1f} ms)"
+
+
+def main(count: int = 100_000):
+    tasks = [{"command": "noop", "parameters": {"n": i}} for i in range(count)]
+
+    queue = TaskQueue()
+    start = time.perf_counter()
+    for task in tasks:
+        queue.add_task(task, priority=1)
+    print(f"add_task   x{count}: {rate(count, time.perf_counter() - start)}")
+
+    queue = TaskQueue()
+    start = time.perf_counter()
+    ids = queue.add_tasks(tasks, priority=1)
+    print(f"add_tasks  x{count}: {rate(count, time.perf_counter() - start)}")
+    assert len(set(ids)) == count
+
+    start = time.perf_counter()
+    while queue.get_next_task() is not None:
+        pass
+    print(f"get_next   x{count}: {rate(count, time.perf_counter() - start)}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -1,10 +1,12 @@
-from typing import Optional, Dict
-from .openhands_client import OpenHandsClient
+import asyncio
+from typing import Optional, Dict, Iterable
+from .openhands_client import OpenHandsClient, AsyncOpenHandsClient
+from .browser_pool import BrowserPool, AsyncBrowserPool
 
 class Agent:
-    def __init__(self, role: str, openhands_url: str):
+    def __init__(self, role: str, openhands_url: str, pool: Optional[BrowserPool] = None):
         self.role = role
-        self.client = OpenHandsClient(openhands_url)
+        self.client = OpenHandsClient(openhands_url, pool=pool, agent_id=f"{role}-{id(self):x}")
         self.client.connect()
         
     def perform_task(self, task: Dict):
@@ -24,5 +26,59 @@ class Agent:
         except Exception as e:
             return {"status": "error", "error": str(e)}
             
+    def get_stats(self) -> Dict:
+        """Browser startup time and memory use for this agent"""
+        return self.client.get_stats()
+            
     def shutdown(self):
-        self.client.close()
\ No newline at end of file
+        self.client.close()
+
+class AsyncAgent:
+    """Agent whose tasks run on the event loop instead of blocking a thread.
+
+    Build with ``await AsyncAgent.create(...)``; agents sharing one
+    ``AsyncBrowserPool`` each get their own page, and their ``perform_task``
+    calls overlap freely.
+    """
+
+    def __init__(self, role: str, client: AsyncOpenHandsClient):
+        self.role = role
+        self.client = client
+
+    @classmethod
+    async def create(cls, role: str, openhands_url: str, pool: AsyncBrowserPool,
+                     selector_timeout: float = 30) -> 'AsyncAgent':
+        client = AsyncOpenHandsClient(openhands_url, pool, selector_timeout=selector_timeout)
+        agent = cls(role, client)
+        client.agent_id = f"{role}-{id(agent):x}"
+        await client.connect()
+        return agent
+
+    async def perform_task(self, task: Dict):
+        """Execute a task based on agent role"""
+        try:
+            command = task.get("command")
+            params = task.get("parameters", {})
+            result = await self.client.execute_command(command, params)
+            if result:
+                return {"status": "success", "result": result}
+            return {"status": "failed", "error": "No result returned"}
+        except Exception as e:
+            return {"status": "error", "error": str(e)}
+
+    def get_stats(self) -> Dict:
+        """Browser startup time and memory use for this agent"""
+        return self.client.get_stats()
+
+    async def shutdown(self):
+        await self.client.close()
+
+async def perform_tasks(agents: Iterable[AsyncAgent], tasks: Iterable[Dict]) -> list[Dict]:
+    """Run tasks concurrently, handing them out to agents round-robin"""
+    agents = list(agents)
+    if not agents:
+        raise ValueError("No agents to perform tasks")
+    return await asyncio.gather(*(
+        agents[i % len(agents)].perform_task(task)
+        for i, task in enumerate(tasks)
+    ))
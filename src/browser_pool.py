@@ -0,0 +1,300 @@
+import os
+import time
+import asyncio
+import threading
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Tuple
+from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright
+
+
+def _read_rss_pages(pid: int) -> Optional[Tuple[int, int]]:
+    """(ppid, rss in pages) of one process, or None if it is gone"""
+    try:
+        with open(f'/proc/{pid}/stat', 'rb') as f:
+            fields = f.read().rsplit(b')', 1)[1].split()
+    except OSError:
+        return None
+    # Fields after the command name start at state; ppid is next and
+    # rss (in pages) is the 22nd
+    return int(fields[1]), int(fields[21])
+
+
+def _scan_tree(pid: int) -> Optional[Dict[int, int]]:
+    """RSS in pages of a process and all of its descendants, by PID"""
+    try:
+        entries = os.listdir('/proc')
+    except OSError:
+        return None
+    children: Dict[int, list[int]] = {}
+    rss_pages: Dict[int, int] = {}
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        stat = _read_rss_pages(int(entry))
+        if stat is not None:
+            children.setdefault(stat[0], []).append(int(entry))
+            rss_pages[int(entry)] = stat[1]
+
+    tree, stack = {}, [pid]
+    while stack:
+        current = stack.pop()
+        tree[current] = rss_pages.get(current, 0)
+        stack.extend(children.get(current, []))
+    return tree
+
+
+def process_tree_rss(pid: Optional[int] = None) -> Optional[int]:
+    """Resident memory in bytes of a process and all of its descendants.
+
+    Chromium runs as child processes of the Playwright driver, so this is what
+    the browser actually costs. Only available where /proc exists.
+    """
+    tree = _scan_tree(pid or os.getpid())
+    return None if tree is None else sum(tree.values()) * os.sysconf('SC_PAGE_SIZE')
+
+
+class ProcessTreeRss:
+    """``process_tree_rss`` that remembers which PIDs make up the tree.
+
+    Listing /proc costs a read of every process on the machine, so it is
+    only redone every ``rescan_interval`` seconds or on request; other
+    samples read the stat files of the known PIDs alone.
+    """
+
+    def __init__(self, pid: Optional[int] = None, rescan_interval: float = 30):
+        self.pid = pid or os.getpid()
+        self.rescan_interval = rescan_interval
+        self._pids: Optional[list[int]] = None
+        self._scanned = 0.0
+
+    def __call__(self, rescan: bool = False) -> Optional[int]:
+        now = time.monotonic()
+        if rescan or self._pids is None or now - self._scanned > self.rescan_interval:
+            tree = _scan_tree(self.pid)
+            if tree is None:
+                return None
+            self._pids, self._scanned = list(tree), now
+            pages = sum(tree.values())
+        else:
+            stats = (_read_rss_pages(pid) for pid in self._pids)
+            pages = sum(stat[1] for stat in stats if stat is not None)
+        return pages * os.sysconf('SC_PAGE_SIZE')
+
+
+@dataclass
+class BrowserLease:
+    """An isolated browser context and page lent to one agent"""
+    url: str
+    context: Any
+    page: Any
+    warm: bool = False
+    released_at: float = field(default_factory=time.monotonic)
+
+
+class _PoolBookkeeping:
+    """Idle lease tracking and per-agent stats shared by both pool flavours"""
+
+    def __init__(self, headless: bool = True, max_idle: int = 4,
+                 idle_timeout: float = 300):
+        self.headless = headless
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self.playwright = None
+        self.browser = None
+        self._idle: Dict[str, list[BrowserLease]] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._rss = ProcessTreeRss()
+
+    def _take_idle(self, url: str) -> Optional[BrowserLease]:
+        idle = self._idle.get(url)
+        if not idle:
+            return None
+        lease = idle.pop()
+        lease.warm = True
+        return lease
+
+    def _has_room(self) -> bool:
+        return sum(map(len, self._idle.values())) < self.max_idle
+
+    def _keep_idle(self, lease: BrowserLease):
+        lease.released_at = time.monotonic()
+        self._idle.setdefault(lease.url, []).append(lease)
+
+    def _expired(self) -> list[BrowserLease]:
+        """Remove and return leases idle longer than the timeout"""
+        now = time.monotonic()
+        expired = []
+        for url, leases in self._idle.items():
+            keep = []
+            for lease in leases:
+                if now - lease.released_at > self.idle_timeout:
+                    expired.append(lease)
+                else:
+                    keep.append(lease)
+            self._idle[url] = keep
+        return expired
+
+    def _drain_idle(self) -> list[BrowserLease]:
+        leases = [lease for leases in self._idle.values() for lease in leases]
+        self._idle = {}
+        return leases
+
+    def _record_acquire(self, agent_id: str, lease: BrowserLease, started: float,
+                        rss_before: Optional[int]):
+        # A new context may have started renderer processes
+        rss_after = self._rss(rescan=not lease.warm)
+        self._stats[agent_id] = {
+            "startup_seconds": time.perf_counter() - started,
+            "warm": lease.warm,
+            "rss_bytes": rss_after,
+            "rss_delta_bytes": (
+                rss_after - rss_before
+                if rss_after is not None and rss_before is not None else None
+            )
+        }
+
+    def record(self, agent_id: str, **values):
+        """Add figures measured by the client to an agent's stats"""
+        self._stats.setdefault(agent_id, {}).update(values)
+
+    def get_stats(self, agent_id: Optional[str] = None) -> Dict[str, Any]:
+        """Startup time and memory figures, for one agent or all of them"""
+        if agent_id is not None:
+            return self._stats.get(agent_id, {})
+        return {
+            "agents": dict(self._stats),
+            "idle_contexts": sum(map(len, self._idle.values())),
+            "browser_rss_bytes": self._rss()
+        }
+
+
+_CLEAR_STORAGE = "() => { localStorage.clear(); sessionStorage.clear(); }"
+_BLANK = "about:blank"
+
+
+class BrowserPool(_PoolBookkeeping):
+    """One shared headless Chromium handing out isolated contexts.
+
+    Released contexts are kept warm per URL and handed to the next agent for
+    the same URL after their cookies and storage are cleared and the page is
+    left on about:blank; the client navigates to its URL again. Contexts idle
+    longer than ``idle_timeout`` are closed. Playwright's sync API is bound
+    to the thread that started it, so a pool must be used from one thread.
+    """
+
+    _shared: Optional['BrowserPool'] = None
+    _shared_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> 'BrowserPool':
+        """Process-wide pool used when an agent is not given one explicitly"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def _ensure_browser(self):
+        if self.browser is None:
+            self.playwright = sync_playwright().start()
+            self.browser = self.playwright.chromium.launch(headless=self.headless)
+
+    def acquire(self, agent_id: str, url: str) -> BrowserLease:
+        """Lend a context and page to an agent, reusing a warm one if possible"""
+        started = time.perf_counter()
+        rss_before = self._rss()
+        self._ensure_browser()
+        for lease in self._expired():
+            lease.context.close()
+
+        lease = self._take_idle(url)
+        if lease is None:
+            context = self.browser.new_context()
+            lease = BrowserLease(url=url, context=context, page=context.new_page())
+        self._record_acquire(agent_id, lease, started, rss_before)
+        return lease
+
+    def release(self, lease: BrowserLease):
+        """Return a lease; keep it warm if there is room, otherwise close it"""
+        if lease.page.is_closed() or not self._has_room():
+            lease.context.close()
+            return
+        try:
+            lease.context.clear_cookies()
+            lease.page.evaluate(_CLEAR_STORAGE)
+            # Unload the page so no DOM or script state reaches the next agent
+            lease.page.goto(_BLANK)
+        except Exception:
+            lease.context.close()
+            return
+        self._keep_idle(lease)
+
+    def close(self):
+        """Close every context and shut the shared browser down"""
+        for lease in self._drain_idle():
+            lease.context.close()
+        if self.browser is not None:
+            self.browser.close()
+            self.playwright.stop()
+            self.browser = None
+            self.playwright = None
+        if BrowserPool._shared is self:
+            BrowserPool._shared = None
+
+
+class AsyncBrowserPool(_PoolBookkeeping):
+    """asyncio counterpart of ``BrowserPool`` built on ``playwright.async_api``.
+
+    All pages live in one Chromium and are driven from the event loop, so
+    many agents can work concurrently without a thread each.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = asyncio.Lock()
+
+    async def _ensure_browser(self):
+        async with self._lock:
+            if self.browser is None:
+                self.playwright = await async_playwright().start()
+                self.browser = await self.playwright.chromium.launch(headless=self.headless)
+
+    async def acquire(self, agent_id: str, url: str) -> BrowserLease:
+        """Lend a context and page to an agent, reusing a warm one if possible"""
+        started = time.perf_counter()
+        rss_before = self._rss()
+        await self._ensure_browser()
+        for lease in self._expired():
+            await lease.context.close()
+
+        lease = self._take_idle(url)
+        if lease is None:
+            context = await self.browser.new_context()
+            lease = BrowserLease(url=url, context=context, page=await context.new_page())
+        self._record_acquire(agent_id, lease, started, rss_before)
+        return lease
+
+    async def release(self, lease: BrowserLease):
+        """Return a lease; keep it warm if there is room, otherwise close it"""
+        if lease.page.is_closed() or not self._has_room():
+            await lease.context.close()
+            return
+        try:
+            await lease.context.clear_cookies()
+            await lease.page.evaluate(_CLEAR_STORAGE)
+            # Unload the page so no DOM or script state reaches the next agent
+            await lease.page.goto(_BLANK)
+        except Exception:
+            await lease.context.close()
+            return
+        self._keep_idle(lease)
+
+    async def close(self):
+        """Close every context and shut the browser down"""
+        for lease in self._drain_idle():
+            await lease.context.close()
+        if self.browser is not None:
+            await self.browser.close()
+            await self.playwright.stop()
+            self.browser = None
+            self.playwright = None
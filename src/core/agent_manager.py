@@ -1,7 +1,49 @@
-from typing import Dict, Any
-from agents import Agent, Runner
+import time
+import asyncio
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Iterable, Tuple, AsyncIterator
+from agents import Agent, Runner, RunHooks
 from .litellm_manager import LiteLLMManager
 from .config_manager import ConfigManager
+from .rate_limiter import AdmissionController, Admission, is_rate_limited, retry_after
+
+@dataclass
+class AgentResult:
+    """Outcome of one agent run started by ``run_many``"""
+    agent: str
+    input: str
+    output: Any = None
+    error: Optional[BaseException] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+class _AdmissionHooks(RunHooks):
+    """Takes an admission for each LLM call of a run, not for the whole run.
+
+    A multi-turn run would otherwise hold a concurrency slot while its tools
+    execute, and count as one request however many calls it makes.
+    """
+
+    def __init__(self, admission: AdmissionController, agent_name: str):
+        self.admission = admission
+        self.agent_name = agent_name
+        self.current: Optional[Admission] = None
+
+    async def on_llm_start(self, context, agent, system_prompt, input_items):
+        self.release()
+        self.current = await self.admission.admit(agent.model, self.agent_name)
+
+    async def on_llm_end(self, context, agent, response):
+        usage = getattr(response, 'usage', None)
+        self.release(getattr(usage, 'total_tokens', None) or None)
+
+    def release(self, tokens: Optional[int] = None):
+        current, self.current = self.current, None
+        if current is not None:
+            current.release(tokens)
 
 class AgentManager:
     def __init__(self, config: ConfigManager):
@@ -18,7 +60,6 @@ class AgentManager:
             name=name,
             instructions=instructions,
             tools=tools or [],
-            max_turns=self.config.get('agents.max_turns', 10),
             model=model
         )
         self.agents[name] = agent
@@ -30,8 +71,78 @@ class AgentManager:
             raise ValueError(f"Agent {agent_name} not found")
             
         agent = self.agents[agent_name]
-        return await Runner.run(agent, input=input_text)
+        admission = self.litellm_manager.admission
+        hooks = _AdmissionHooks(admission, agent_name)
+        try:
+            return await Runner.run(agent, input=input_text, hooks=hooks,
+                                    max_turns=self.config.get('agents.max_turns', 10))
+        except Exception as e:
+            if is_rate_limited(e):
+                admission.report_rate_limited(agent.model, retry_after(e))
+            raise
+        finally:
+            # A failed or cancelled LLM call never reaches on_llm_end
+            hooks.release()
         
+    async def run_many(self, jobs: Iterable[Tuple[str, str]],
+                       max_concurrency: Optional[int] = None,
+                       timeout: Optional[float] = None) -> AsyncIterator[AgentResult]:
+        """Run (agent_name, input_text) jobs concurrently.
+
+        Results are yielded as each run finishes, in completion order. At most
+        ``max_concurrency`` runs are active at once, and a run that exceeds
+        ``timeout`` seconds is cancelled and reported with a TimeoutError. A
+        failing run never cancels the others; closing the iterator early
+        cancels every run still in progress.
+
+        The runs live in a TaskGroup that spans the ``yield``, so a caller
+        that may stop early must close the iterator deterministically, e.g.
+        ``async with contextlib.aclosing(manager.run_many(jobs)) as results``;
+        leaving it to garbage collection would cancel the runs from an
+        unrelated task at an arbitrary time.
+        """
+        jobs = list(jobs)
+        for agent_name, _ in jobs:
+            if agent_name not in self.agents:
+                raise ValueError(f"Agent {agent_name} not found")
+        if max_concurrency is None:
+            max_concurrency = self.config.get('agents.max_parallel', 8)
+        if timeout is None:
+            timeout = self.config.get('agents.timeout')
+        slots = asyncio.Semaphore(max_concurrency)
+        results: asyncio.Queue = asyncio.Queue()
+
+        async def run_one(agent_name: str, input_text: str):
+            async with slots:
+                started = time.monotonic()
+                result = AgentResult(agent_name, input_text)
+                try:
+                    async with asyncio.timeout(timeout):
+                        result.output = await self.run_agent(agent_name, input_text)
+                except Exception as e:
+                    result.error = e
+                result.elapsed = time.monotonic() - started
+            results.put_nowait(result)
+
+        async with asyncio.TaskGroup() as group:
+            runs = [group.create_task(run_one(name, text)) for name, text in jobs]
+            try:
+                for _ in runs:
+                    yield await results.get()
+            except GeneratorExit:
+                # The caller stopped listening; don't leave runs going
+                for run in runs:
+                    run.cancel()
+                return
+
+    def broadcast(self, input_text: str, agent_names: Optional[Iterable[str]] = None,
+                  max_concurrency: Optional[int] = None,
+                  timeout: Optional[float] = None) -> AsyncIterator[AgentResult]:
+        """Send one directive to every agent (or ``agent_names``) at once"""
+        names = list(self.agents) if agent_names is None else list(agent_names)
+        return self.run_many(((name, input_text) for name in names),
+                             max_concurrency=max_concurrency, timeout=timeout)
+
     def get_agent(self, agent_name: str) -> Agent:
         """Get an agent by name"""
         return self.agents.get(agent_name)
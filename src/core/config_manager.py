@@ -1,11 +1,85 @@
+import os
+import copy
 import json
+import time
+import atexit
+import tempfile
+import threading
+import weakref
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Optional, Dict, List, Callable, Tuple
+
+_MISSING = object()
+# Managers with changes that must reach disk before the interpreter exits
+_LIVE_MANAGERS = weakref.WeakSet()
+
+@atexit.register
+def _flush_all():
+    for manager in list(_LIVE_MANAGERS):
+        manager.flush()
+
+def _logger():
+    """loguru's logger, imported on first use so startup doesn't pay for it"""
+    from loguru import logger
+    return logger
+
+def _inotify_observer(manager: 'ConfigManager'):
+    """A started watchdog observer for the config file, or None without watchdog"""
+    try:
+        from watchdog.observers import Observer
+        from watchdog.events import FileSystemEventHandler
+    except ImportError:
+        return None
+    path = os.path.abspath(manager.config_path)
+
+    class Handler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            # Editors and our own writer replace the file, so watch renames too
+            paths = (event.src_path, getattr(event, 'dest_path', None))
+            if any(p and os.path.abspath(p) == path for p in paths):
+                manager._check_file()
+
+    observer = Observer()
+    observer.schedule(Handler(), os.path.dirname(path))
+    observer.daemon = True
+    observer.start()
+    return observer
 
 class ConfigManager:
-    def __init__(self, config_path: str):
+    """JSON configuration with cached reads and debounced, atomic writes.
+
+    ``set`` only changes memory; a background thread writes the file once no
+    change has arrived for ``flush_delay`` seconds (and at the latest
+    ``4 * flush_delay`` after the first unsaved change). ``batch()`` groups
+    changes into one write and rolls them back if the block raises.
+
+    ``watch()`` reloads the file when it is edited outside the application
+    and ``subscribe`` reports changed values to interested components.
+    """
+
+    def __init__(self, config_path: str, flush_delay: float = 0.5):
         self.config_path = Path(config_path)
+        self.flush_delay = flush_delay
+        self.writes = 0
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+        self._write_lock = threading.Lock()
+        self._dirty = False
+        self._first_change = self._last_change = 0.0
+        self._version = self._written_version = 0
+        self._batch_depth = 0
+        self._flusher: Optional[threading.Thread] = None
+        self._closed = False
+        self._subscribers: Dict[str, List[Tuple[Callable, Any]]] = {}
+        self._watcher = None
+        self._stop_watching = threading.Event()
         self.config = self._load_config()
+        self._signature = self._stat()
+        # Resolved values by key path and name indexes; both dropped on set()
+        self._values: Dict[str, Any] = {}
+        self._indexes: Dict[str, Dict[str, dict]] = {}
+        _LIVE_MANAGERS.add(self)
         
     def _load_config(self) -> dict:
         try:
@@ -19,17 +93,71 @@ class ConfigManager:
             "openhands": {
                 "endpoints": [],
                 "default_timeout": 30,
-                "max_retries": 3
+                "max_retries": 3,
+                "pool": {
+                    "size": 4,
+                    "idle_timeout": 300,
+                    "ping_interval": 20,
+                    "ping_timeout": 20
+                },
+                "scheduler": {
+                    "policy": "round_robin",
+                    "failure_threshold": 5,
+                    "recovery_timeout": 30
+                },
+                "dispatcher": {
+                    "workers_per_endpoint": 4,
+                    "max_in_flight": 8,
+                    "max_queue_size": 1000
+                },
+                "streaming": {
+                    "max_frames": 64,
+                    "max_buffer": 1048576
+                }
             },
             "litellm": {
                 "models": [],
                 "default_model": "",
-                "max_concurrent_requests": 5
+                "max_concurrent_requests": 5,
+                "rate_limit_retries": 3,
+                "fallback_models": [],
+                "hedging": {
+                    "enabled": False,
+                    "quantile": 0.95,
+                    "min_samples": 20
+                },
+                "cache": {
+                    "enabled": False,
+                    "path": "data/llm_cache.db",
+                    "max_entries": 1000,
+                    "max_disk_entries": 100000,
+                    "ttl": 86400,
+                    "flush_interval": 1.0,
+                    "bypass_agents": [],
+                    "semantic": {
+                        "enabled": False,
+                        "embedding_model": "text-embedding-3-small",
+                        "threshold": 0.95,
+                        "max_entries": 1000
+                    }
+                }
+            },
+            "daemon": {
+                "address": "127.0.0.1:8765",
+                "token": "",
+                "task_store": "data/tasks.db",
+                "drain_timeout": 30,
+                "idle_timeout": 60
             },
             "ui": {
                 "language": "en_US",
                 "theme": "dark",
-                "font_size": 12
+                "font_size": 12,
+                "max_fps": 30,
+                "dashboard": {
+                    "interval": 1.0,
+                    "history": 3600
+                }
             },
             "i18n": {
                 "available_languages": ["en_US"],
@@ -43,25 +171,280 @@ class ConfigManager:
         return default_config
         
     def save_config(self, config: Optional[dict] = None):
-        with open(self.config_path, 'w', encoding='utf-8') as f:
-            json.dump(config or self.config, f, indent=4)
+        """Write the configuration now, replacing the file atomically"""
+        if config is not None:
+            self._write(json.dumps(config, indent=4), None)
+            return
+        with self._lock:
+            text, version = json.dumps(self.config, indent=4), self._version
+            self._dirty = False
+        self._write(text, version)
+
+    def flush(self):
+        """Write pending changes now instead of waiting for the debounce"""
+        if self._dirty:
+            self.save_config()
+
+    def _write(self, text: str, version: Optional[int]):
+        with self._write_lock:
+            # A slower writer must not replace a newer snapshot
+            if version is not None:
+                if version <= self._written_version:
+                    return
+                self._written_version = version
+            directory = self.config_path.parent
+            directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=self.config_path.name,
+                                            suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(text)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.config_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            # Lets the file watcher recognise this write as our own
+            self._signature = self._stat()
+            if hasattr(os, 'O_DIRECTORY'):
+                # Make the rename itself durable
+                dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+                try:
+                    os.fsync(dir_fd)
+                finally:
+                    os.close(dir_fd)
+            self.writes += 1
+
+    def _mark_dirty(self):
+        now = time.monotonic()
+        if not self._dirty:
+            self._dirty = True
+            self._first_change = now
+        self._last_change = now
+        self._version += 1
+        if self._batch_depth:
+            return
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name="config-flusher",
+                                             daemon=True)
+            self._flusher.start()
+        self._changed.notify()
+
+    def _flush_loop(self):
+        with self._lock:
+            while not self._closed:
+                if not self._dirty or self._batch_depth:
+                    self._changed.wait()
+                    continue
+                deadline = min(self._last_change + self.flush_delay,
+                               self._first_change + 4 * self.flush_delay)
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    self._changed.wait(delay)
+                    continue
+                text, version = json.dumps(self.config, indent=4), self._version
+                self._dirty = False
+                self._lock.release()
+                try:
+                    self._write(text, version)
+                finally:
+                    self._lock.acquire()
+
+    @contextmanager
+    def batch(self):
+        """Apply several changes as one: a single write, or none on error"""
+        with self._lock:
+            outermost = self._batch_depth == 0
+            if outermost:
+                snapshot, was_dirty = copy.deepcopy(self.config), self._dirty
+            self._batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            with self._lock:
+                self._batch_depth -= 1
+                before = self._watched_values() if outermost else {}
+                if outermost:
+                    self.config, self._dirty = snapshot, was_dirty
+                    self.invalidate()
+            self._notify(before)
+            raise
+        with self._lock:
+            self._batch_depth -= 1
+        if outermost:
+            self.flush()
+
+    def subscribe(self, key_path: str, callback: Callable[[Any], None], loop=None) -> Callable[[], None]:
+        """Call ``callback(new_value)`` whenever the value at ``key_path`` changes.
+
+        Changes come from ``set`` or from a reload of the file. With an asyncio
+        ``loop`` the callback runs on that loop's thread; otherwise it runs on
+        whichever thread made the change. Returns a function that unsubscribes.
+        """
+        entry = (callback, loop)
+        with self._lock:
+            self._subscribers.setdefault(key_path, []).append(entry)
+
+        def unsubscribe():
+            with self._lock:
+                subscribers = self._subscribers.get(key_path, [])
+                if entry in subscribers:
+                    subscribers.remove(entry)
+        return unsubscribe
+
+    def _watched_values(self, key_path: Optional[str] = None) -> Dict[str, Any]:
+        """Copies of the current values of subscribed paths ``key_path`` may affect.
+
+        Copies, because ``set`` changes the dicts of parent paths in place.
+        """
+        values = {}
+        for path in self._subscribers:
+            if (key_path is None or path == key_path
+                    or path.startswith(key_path + '.') or key_path.startswith(path + '.')):
+                value = self._resolve(path)
+                values[path] = value if value is _MISSING else copy.deepcopy(value)
+        return values
+
+    def _notify(self, before: Dict[str, Any]):
+        for path, old_value in before.items():
+            value = self._resolve(path)
+            if value == old_value:
+                continue
+            value = None if value is _MISSING else value
+            for callback, loop in list(self._subscribers.get(path, ())):
+                if loop is not None:
+                    loop.call_soon_threadsafe(callback, value)
+                    continue
+                try:
+                    callback(value)
+                except Exception as e:
+                    _logger().error(f"Config subscriber for {path} failed: {str(e)}")
+
+    def reload(self) -> bool:
+        """Re-read the file; returns True if the configuration changed"""
+        try:
+            with open(self.config_path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            # Often an editor midway through saving; the next event retries
+            _logger().warning(f"Could not reload {self.config_path}: {str(e)}")
+            return False
+        with self._lock:
+            if config == self.config:
+                return False
+            if self._dirty:
+                _logger().warning(f"{self.config_path} changed on disk; discarding unsaved changes")
+            before = self._watched_values()
+            self.config = config
+            self._dirty = False
+            self.invalidate()
+        self._notify(before)
+        return True
+
+    def _stat(self) -> Optional[tuple]:
+        try:
+            st = os.stat(self.config_path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _check_file(self):
+        with self._write_lock:
+            signature = self._stat()
+            if signature is None or signature == self._signature:
+                return
+            self._signature = signature
+        self.reload()
+
+    def watch(self, poll_interval: float = 1.0):
+        """Reload on external edits, via inotify (watchdog) or by polling"""
+        if self._watcher is not None:
+            return
+        self._stop_watching.clear()
+        # Imported here so startup doesn't pay for watchdog
+        self._watcher = _inotify_observer(self)
+        if self._watcher is not None:
+            return
+
+        def poll():
+            while not self._stop_watching.wait(poll_interval):
+                self._check_file()
+        self._watcher = threading.Thread(target=poll, name="config-watcher", daemon=True)
+        self._watcher.start()
+
+    def unwatch(self):
+        watcher, self._watcher = self._watcher, None
+        if watcher is None:
+            return
+        self._stop_watching.set()
+        if hasattr(watcher, 'stop'):
+            watcher.stop()
+        watcher.join()
+
+    def close(self):
+        """Write pending changes and stop the background threads"""
+        self.unwatch()
+        with self._lock:
+            self._closed = True
+            self._changed.notify()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
             
     def get(self, key_path: str, default: Any = None) -> Any:
-        keys = key_path.split('.')
+        value = self._values.get(key_path, _MISSING)
+        if value is _MISSING:
+            # Resolved and cached under the lock, so a concurrent set or
+            # reload cannot be undone by caching the value it replaced
+            with self._lock:
+                value = self._values[key_path] = self._resolve(key_path)
+        return default if value is _MISSING else value
+
+    def _resolve(self, key_path: str) -> Any:
         value = self.config
         try:
-            for key in keys:
+            for key in key_path.split('.'):
                 value = value[key]
             return value
         except (KeyError, TypeError):
-            return default
-            
+            return _MISSING
+
+    def get_indexed(self, key_path: str, name: str) -> Optional[dict]:
+        """Entry called ``name`` in the list of dicts at ``key_path``"""
+        index = self._indexes.get(key_path)
+        if index is None:
+            with self._lock:
+                entries = self.get(key_path, [])
+                index = self._indexes[key_path] = {
+                    entry['name']: entry for entry in entries
+                    if isinstance(entry, dict) and 'name' in entry
+                }
+        return index.get(name)
+
+    def get_model(self, name: str) -> Optional[dict]:
+        """Configuration of the LiteLLM model called ``name``"""
+        return self.get_indexed('litellm.models', name)
+
+    def get_endpoint(self, name: str) -> Optional[dict]:
+        """Configuration of the OpenHands endpoint called ``name``"""
+        return self.get_indexed('openhands.endpoints', name)
+
+    def invalidate(self):
+        """Forget cached lookups after changing ``self.config`` in place"""
+        self._values.clear()
+        self._indexes.clear()
+
     def set(self, key_path: str, value: Any):
         keys = key_path.split('.')
-        current = self.config
-        for key in keys[:-1]:
-            if key not in current:
-                current[key] = {}
-            current = current[key]
-        current[keys[-1]] = value
-        self.save_config()
\ No newline at end of file
+        with self._lock:
+            before = self._watched_values(key_path)
+            current = self.config
+            for key in keys[:-1]:
+                if key not in current:
+                    current[key] = {}
+                current = current[key]
+            current[keys[-1]] = value
+            self.invalidate()
+            self._mark_dirty()
+        self._notify(before)
\ No newline at end of file
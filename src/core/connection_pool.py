@@ -0,0 +1,242 @@
+import json
+import time
+import asyncio
+import itertools
+import websockets
+from loguru import logger
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, AsyncIterator
+
+
+class PooledConnection:
+    """A long-lived WebSocket shared by many in-flight requests.
+
+    Requests are tagged with a ``request_id`` and a background reader task
+    routes every response frame to the future waiting for that id. While a
+    stream is attached, raw frames go to the bounded ``sink`` queue instead,
+    so a slow consumer pushes back on the socket rather than buffering.
+    """
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.pending: "OrderedDict[str, asyncio.Future]" = OrderedDict()
+        self.sink: Optional[asyncio.Queue] = None
+        self.finished = False
+        # True while the reader waits for room in the sink
+        self.blocked = False
+        self.last_used = time.monotonic()
+        self.closed = False
+        self._reader = asyncio.create_task(self._read_loop())
+
+    @property
+    def in_flight(self) -> int:
+        return len(self.pending)
+
+    async def request(self, payload: Dict[str, Any], request_id: str,
+                      timeout: float) -> Dict:
+        """Send a payload and wait for the response carrying its request ID"""
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        self.last_used = time.monotonic()
+        try:
+            await self.websocket.send(json.dumps(payload))
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self.pending.pop(request_id, None)
+            self.last_used = time.monotonic()
+
+    async def _read_loop(self):
+        try:
+            async for message in self.websocket:
+                if self.sink is not None:
+                    self.blocked = True
+                    try:
+                        await self.sink.put(message)
+                    finally:
+                        self.blocked = False
+                else:
+                    self._dispatch(message)
+        except websockets.exceptions.ConnectionClosed as e:
+            self._fail_pending(e)
+        except Exception as e:
+            self._fail_pending(e)
+        else:
+            self._fail_pending(
+                websockets.exceptions.ConnectionClosed(None, None)
+            )
+        finally:
+            self.closed = True
+            if self.sink is not None:
+                # Wake the stream consumer; None marks the end of the socket
+                try:
+                    await self.sink.put(None)
+                except asyncio.CancelledError:
+                    pass
+
+    def _dispatch(self, message):
+        try:
+            response = json.loads(message)
+        except ValueError:
+            # One bad frame must not take down every request on the socket
+            logger.warning(f"Skipping non-JSON frame: {message[:200]!r}")
+            return
+        request_id = response.get("request_id") if isinstance(response, dict) else None
+        future = self.pending.get(request_id)
+        if future is None and request_id is None and self.pending:
+            # Servers that do not echo request IDs answer in order
+            future = next(iter(self.pending.values()))
+        if future is not None and not future.done():
+            future.set_result(response)
+
+    def _fail_pending(self, error: BaseException):
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    async def close(self):
+        self.closed = True
+        self._reader.cancel()
+        try:
+            await self.websocket.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """Per-endpoint pool of multiplexed WebSocket connections"""
+
+    def __init__(self, url: str, size: int = 4, idle_timeout: float = 300,
+                 ping_interval: float = 20, ping_timeout: float = 20,
+                 open_timeout: float = 30):
+        self.url = url
+        self.size = max(1, size)
+        self.idle_timeout = idle_timeout
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.open_timeout = open_timeout
+        self.connections: list[PooledConnection] = []
+        self._lock = asyncio.Lock()
+        self._ids = itertools.count()
+        # Idle connections being closed in the background, kept referenced
+        self._closing: set[asyncio.Task] = set()
+        # Connections being opened; they count towards size while connecting
+        self._opening: set[asyncio.Task] = set()
+
+    def next_request_id(self) -> str:
+        return f"{id(self):x}-{next(self._ids)}"
+
+    async def acquire(self) -> PooledConnection:
+        """Return the least loaded healthy connection, opening one if useful.
+
+        The slot is reserved under the lock but the handshake runs outside
+        it, so a slow connect does not hold up requests that can use an
+        existing connection. With the pool full of connections still being
+        opened, callers share the first of them.
+        """
+        async with self._lock:
+            self._prune()
+            best = min(self.connections, key=lambda c: c.in_flight, default=None)
+            full = len(self.connections) + len(self._opening) >= self.size
+            if best is not None and (best.in_flight == 0 or full):
+                return best
+            if full:
+                opening = next(iter(self._opening))
+            else:
+                opening = asyncio.create_task(self._open())
+                self._opening.add(opening)
+                opening.add_done_callback(self._opened)
+        return await asyncio.shield(opening)
+
+    def _opened(self, opening: asyncio.Task):
+        self._opening.discard(opening)
+        if not opening.cancelled() and opening.exception() is None:
+            self.connections.append(opening.result())
+
+    async def _open(self) -> PooledConnection:
+        websocket = await websockets.connect(
+            self.url,
+            open_timeout=self.open_timeout,
+            ping_interval=self.ping_interval,
+            ping_timeout=self.ping_timeout
+        )
+        return PooledConnection(websocket)
+
+    @asynccontextmanager
+    async def stream(self, max_frames: int = 64) -> AsyncIterator[PooledConnection]:
+        """Borrow a connection exclusively for a streamed command.
+
+        An idle pooled connection is reused when available. It goes back to
+        the pool only if the caller marks the stream ``finished`` and no
+        frames arrived past the end; a stream abandoned half way, or one the
+        server kept writing to, would leak stray frames into later requests,
+        so its socket is closed.
+        """
+        async with self._lock:
+            self._prune()
+            connection = next(
+                (c for c in self.connections if c.in_flight == 0), None
+            )
+            if connection is not None:
+                self.connections.remove(connection)
+        if connection is None:
+            connection = await self._open()
+        connection.sink = asyncio.Queue(maxsize=max_frames)
+        connection.finished = False
+        try:
+            yield connection
+        finally:
+            sink, connection.sink = connection.sink, None
+            connection.last_used = time.monotonic()
+            if (connection.finished and not connection.closed and
+                    sink.empty() and not connection.blocked and
+                    len(self.connections) < self.size):
+                self.connections.append(connection)
+            else:
+                await connection.close()
+
+    async def request(self, payload: Dict[str, Any], timeout: float) -> Dict:
+        """Send a payload over a pooled connection and return the response"""
+        connection = await self.acquire()
+        request_id = self.next_request_id()
+        try:
+            return await connection.request(
+                {**payload, "request_id": request_id}, request_id, timeout
+            )
+        except (websockets.exceptions.ConnectionClosed, OSError):
+            await self.discard(connection)
+            raise
+
+    async def discard(self, connection: PooledConnection):
+        """Drop a broken connection from the pool"""
+        if connection in self.connections:
+            self.connections.remove(connection)
+        await connection.close()
+
+    def _prune(self):
+        """Forget closed connections and close ones idle past the timeout"""
+        now = time.monotonic()
+        keep = []
+        for connection in self.connections:
+            if connection.closed:
+                continue
+            if (connection.in_flight == 0 and
+                    now - connection.last_used > self.idle_timeout):
+                task = asyncio.create_task(connection.close())
+                self._closing.add(task)
+                task.add_done_callback(self._closing.discard)
+                continue
+            keep.append(connection)
+        self.connections = keep
+
+    async def close(self):
+        """Close every connection in the pool"""
+        for opening in list(self._opening):
+            opening.cancel()
+        if self._opening:
+            await asyncio.gather(*self._opening, return_exceptions=True)
+        connections, self.connections = self.connections, []
+        for connection in connections:
+            await connection.close()
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
@@ -0,0 +1,236 @@
+import time
+import asyncio
+import itertools
+from typing import Optional, Dict, Any, Iterable, TYPE_CHECKING
+from .openhands_client import OpenHandsClient, OpenHandsEndpoint
+
+if TYPE_CHECKING:
+    from task_queue import TaskQueue
+    from monitor import Monitor
+
+
+class TaskDispatcher:
+    """Runs queued tasks concurrently against every active OpenHands endpoint.
+
+    Tasks submitted to the ``TaskQueue`` are moved by a feeder into a bounded
+    asyncio priority queue. Each endpoint gets ``workers_per_endpoint`` workers
+    and each worker keeps at most ``max_in_flight`` commands outstanding.
+    Outcomes are reported to ``monitor``, if given, with their latency.
+    """
+
+    def __init__(self, client: OpenHandsClient, task_queue: 'TaskQueue',
+                 workers_per_endpoint: int = 4, max_in_flight: int = 8,
+                 max_queue_size: int = 1000, poll_interval: float = 0.05,
+                 monitor: Optional['Monitor'] = None):
+        self.client = client
+        self.task_queue = task_queue
+        self.monitor = monitor
+        self.workers_per_endpoint = workers_per_endpoint
+        self.max_in_flight = max_in_flight
+        self.max_queue_size = max_queue_size
+        self.poll_interval = poll_interval
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._sequence = itertools.count()
+        self._workers: Dict[str, list[asyncio.Task]] = {}
+        self._in_flight: set[asyncio.Task] = set()
+        self._feeder: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._space = asyncio.Condition()
+        self._held = 0
+        self._closing = False
+
+    @classmethod
+    def from_config(cls, client: OpenHandsClient, task_queue: 'TaskQueue',
+                    config: Dict[str, Any],
+                    monitor: Optional['Monitor'] = None) -> 'TaskDispatcher':
+        return cls(
+            client, task_queue,
+            workers_per_endpoint=config.get('workers_per_endpoint', 4),
+            max_in_flight=config.get('max_in_flight', 8),
+            max_queue_size=config.get('max_queue_size', 1000),
+            monitor=monitor
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._feeder is not None and not self._feeder.done()
+
+    async def start(self):
+        """Start the feeder and the workers for every active endpoint"""
+        if self.running:
+            return
+        self._closing = False
+        self._queue = asyncio.PriorityQueue(maxsize=self.max_queue_size)
+        self._wakeup = asyncio.Event()
+        self._feeder = asyncio.create_task(self._feed())
+        for endpoint in self.client.get_active_endpoints():
+            self.add_workers(endpoint)
+
+    def add_workers(self, endpoint: OpenHandsEndpoint):
+        """Start workers for an endpoint that has no workers yet"""
+        if endpoint.name in self._workers:
+            return
+        self._workers[endpoint.name] = [
+            asyncio.create_task(self._work(endpoint))
+            for _ in range(self.workers_per_endpoint)
+        ]
+
+    def apply_endpoints(self, endpoints: list[Dict[str, Any]]):
+        """Apply new endpoint configuration to the client and the workers"""
+        _, removed = self.client.apply_endpoints(endpoints)
+        for name in removed:
+            self.remove_workers(name)
+        if self.running:
+            for endpoint in self.client.get_active_endpoints():
+                self.add_workers(endpoint)
+
+    def remove_workers(self, endpoint_name: str):
+        """Stop pulling new tasks for an endpoint; in-flight tasks finish"""
+        for worker in self._workers.pop(endpoint_name, []):
+            worker.cancel()
+
+    async def submit(self, task: Dict[str, Any], priority: int = 1) -> str:
+        """Queue a task, waiting while the dispatch backlog is full"""
+        task_ids = await self.submit_many([task], priority)
+        return task_ids[0]
+
+    async def submit_many(self, tasks: Iterable[Dict[str, Any]], priority: int = 1) -> list[str]:
+        """Queue a batch of tasks, adding only as many as the backlog has room for.
+
+        The backlog counts tasks waiting in the TaskQueue, the one the feeder
+        holds and the dispatch queue. Submitters wait on ``_space``, which
+        workers notify as they take tasks, so the room checked is the room used.
+        """
+        tasks = list(tasks)
+        task_ids: list[str] = []
+        if self._closing:
+            raise RuntimeError("Dispatcher is shutting down")
+        while len(task_ids) < len(tasks):
+            async with self._space:
+                await self._space.wait_for(
+                    lambda: self._closing or self._room() > 0
+                )
+                if self._closing:
+                    raise RuntimeError("Dispatcher is shutting down")
+                count = len(tasks) - len(task_ids)
+                if self._queue is not None:
+                    count = min(count, self._room())
+                chunk = tasks[len(task_ids):len(task_ids) + count]
+                task_ids.extend(self.task_queue.add_tasks(chunk, priority))
+            if self._wakeup is not None:
+                self._wakeup.set()
+        return task_ids
+
+    def _room(self) -> int:
+        if self._queue is None:
+            return self.max_queue_size
+        backlog = self.task_queue.queue.qsize() + self._held + self._queue.qsize()
+        return self.max_queue_size - backlog
+
+    async def _notify_space(self):
+        async with self._space:
+            self._space.notify_all()
+
+    async def _feed(self):
+        """Move tasks from the TaskQueue into the bounded dispatch queue"""
+        while True:
+            task = self.task_queue.get_next_task()
+            if task is None:
+                if self._closing:
+                    return
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            # Still part of the backlog while blocked on a full dispatch queue
+            self._held = 1
+            try:
+                await self._queue.put((-task["priority"], next(self._sequence), task))
+            finally:
+                self._held = 0
+
+    async def _work(self, endpoint: OpenHandsEndpoint):
+        slots = asyncio.Semaphore(self.max_in_flight)
+        while True:
+            if not endpoint.active or not self._endpoint_available(endpoint):
+                await asyncio.sleep(self.poll_interval)
+                continue
+            await slots.acquire()
+            try:
+                _, _, task = await self._queue.get()
+            except BaseException:
+                slots.release()
+                raise
+            await self._notify_space()
+            execution = asyncio.create_task(self._execute(endpoint, task, slots))
+            self._in_flight.add(execution)
+            execution.add_done_callback(self._in_flight.discard)
+
+    def _endpoint_available(self, endpoint: OpenHandsEndpoint) -> bool:
+        breaker = self.client.scheduler.breakers.get(endpoint.name)
+        return breaker is None or breaker.available()
+
+    async def _execute(self, endpoint: OpenHandsEndpoint, task: Dict[str, Any],
+                       slots: asyncio.Semaphore):
+        started = time.monotonic()
+        try:
+            command = task["task"].get("command")
+            params = task["task"].get("parameters", {})
+            result = await self.client.send_command(endpoint, command, params)
+            self.task_queue.complete_task(task["id"], result)
+            self._report(task, "completed", endpoint, started)
+        except asyncio.CancelledError:
+            self.task_queue.fail_task(task["id"], "cancelled")
+            self._report(task, "failed", endpoint, started, "cancelled")
+            raise
+        except Exception as e:
+            self.task_queue.fail_task(task["id"], str(e))
+            self._report(task, "failed", endpoint, started, str(e))
+        finally:
+            slots.release()
+            self._queue.task_done()
+
+    def _report(self, task: Dict[str, Any], status: str, endpoint: OpenHandsEndpoint,
+                started: float, error: Optional[str] = None):
+        if self.monitor is None:
+            return
+        details = {
+            "latency": time.monotonic() - started,
+            "endpoint": endpoint.name,
+            "agent": task["task"].get("agent", "")
+        }
+        if error is not None:
+            details["error"] = error
+        self.monitor.log_task(task["id"], status, details)
+
+    async def drain(self, timeout: Optional[float] = None):
+        """Stop accepting tasks, finish everything queued, then stop workers"""
+        if not self.running:
+            return
+        self._closing = True
+        self._wakeup.set()
+        await self._notify_space()
+        try:
+            await asyncio.wait_for(self._finish_queued(), timeout)
+        finally:
+            await self.stop()
+
+    async def _finish_queued(self):
+        await self._feeder
+        await self._queue.join()
+
+    async def stop(self):
+        """Cancel workers, the feeder and any in-flight tasks immediately"""
+        self._closing = True
+        await self._notify_space()
+        tasks = [t for workers in self._workers.values() for t in workers]
+        tasks.extend(self._in_flight)
+        if self._feeder is not None:
+            tasks.append(self._feeder)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = {}
+        self._in_flight = set()
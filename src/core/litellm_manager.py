@@ -1,38 +1,204 @@
 import litellm
+import asyncio
 import re
-from typing import Dict, Any
+import time
+import bisect
+import threading
+from typing import Dict, Any, Optional
 from pathlib import Path
 import json
 from urllib.parse import urlparse
 from loguru import logger
-from prometheus_client import start_http_server, Counter, Gauge
+from prometheus_client import start_http_server, REGISTRY
+from prometheus_client.core import CounterMetricFamily, HistogramMetricFamily
+from prometheus_client.utils import floatToGoString
 from .config_manager import ConfigManager
+from .rate_limiter import AdmissionController, Admission, is_rate_limited, retry_after
+from .stats import LatencyHistogram
+from .response_cache import ResponseCache
+
+LLM_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120, 300)
+
+class ModelMetrics:
+    """Request figures for one model.
+
+    Every request updates plain fields under a single lock; Prometheus reads
+    them at scrape time through ``LLMMetricsCollector``. Going through
+    prometheus_client's Counter/Histogram instead costs a lock per metric
+    per request, which is several times the budget for this hot path.
+    """
+    __slots__ = ("lock", "requests", "errors", "tokens", "cost",
+                 "duration_buckets", "duration_sum", "ttft_buckets", "ttft_sum")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.tokens = 0
+        self.cost = 0.0
+        # One slot per bucket plus +Inf; counts are per bucket, not cumulative
+        self.duration_buckets = [0] * (len(LLM_LATENCY_BUCKETS) + 1)
+        self.duration_sum = 0.0
+        self.ttft_buckets = [0] * (len(LLM_LATENCY_BUCKETS) + 1)
+        self.ttft_sum = 0.0
+
+    def observe(self, response: Any, latency: float, ttft: Optional[float] = None):
+        """Record one finished request.
+
+        ``ttft`` is only passed for streamed responses; for a plain completion
+        the first token arrives with the whole response, so the duration
+        histogram already is its time to first token.
+        """
+        usage = getattr(response, 'usage', None)
+        tokens = (getattr(usage, 'total_tokens', 0) or 0) if usage is not None else 0
+        # LiteLLM computes the cost itself when cost tracking is enabled
+        hidden = getattr(response, '_hidden_params', None)
+        cost = (hidden.get('response_cost') or 0.0) if hidden else 0.0
+        with self.lock:
+            self.requests += 1
+            self.tokens += tokens
+            self.cost += cost
+            self.duration_buckets[bisect.bisect_left(LLM_LATENCY_BUCKETS, latency)] += 1
+            self.duration_sum += latency
+            if ttft is not None:
+                self.ttft_buckets[bisect.bisect_left(LLM_LATENCY_BUCKETS, ttft)] += 1
+                self.ttft_sum += ttft
+
+    def failed(self):
+        """Record a request that raised"""
+        with self.lock:
+            self.requests += 1
+            self.errors += 1
+
+    def error(self):
+        """Record an error outside of a request, e.g. during registration"""
+        with self.lock:
+            self.errors += 1
+
+class LLMMetricsCollector:
+    """Exports every model's ``ModelMetrics`` to Prometheus"""
+
+    def __init__(self):
+        self.models: Dict[str, ModelMetrics] = {}
+        self._lock = threading.Lock()
+
+    def for_model(self, model: str) -> ModelMetrics:
+        metrics = self.models.get(model)
+        if metrics is None:
+            with self._lock:
+                metrics = self.models.setdefault(model, ModelMetrics())
+        return metrics
+
+    @staticmethod
+    def _histogram_buckets(counts: list[int]) -> list[tuple[str, int]]:
+        buckets, total = [], 0
+        for bound, count in zip(LLM_LATENCY_BUCKETS + (float('inf'),), counts):
+            total += count
+            buckets.append((floatToGoString(bound), total))
+        return buckets
+
+    def collect(self):
+        requests = CounterMetricFamily('llm_requests_total', 'Total LLM requests', labels=['model'])
+        errors = CounterMetricFamily('llm_errors_total', 'Total LLM errors', labels=['model'])
+        cost = CounterMetricFamily('llm_cost_total', 'Total LLM cost in USD', labels=['model'])
+        tokens = CounterMetricFamily('llm_tokens_total', 'Total tokens processed', labels=['model'])
+        duration = HistogramMetricFamily('llm_request_duration_seconds',
+                                         'LLM request duration in seconds', labels=['model'])
+        ttft = HistogramMetricFamily('llm_time_to_first_token_seconds',
+                                     'Time until the first streamed token arrives', labels=['model'])
+        for model, m in list(self.models.items()):
+            with m.lock:
+                snapshot = (m.requests, m.errors, m.cost, m.tokens, list(m.duration_buckets),
+                            m.duration_sum, list(m.ttft_buckets), m.ttft_sum)
+            (n_requests, n_errors, total_cost, n_tokens, duration_buckets,
+             duration_sum, ttft_buckets, ttft_sum) = snapshot
+            requests.add_metric([model], n_requests)
+            errors.add_metric([model], n_errors)
+            cost.add_metric([model], total_cost)
+            tokens.add_metric([model], n_tokens)
+            duration.add_metric([model], self._histogram_buckets(duration_buckets), duration_sum)
+            ttft.add_metric([model], self._histogram_buckets(ttft_buckets), ttft_sum)
+        yield from (requests, errors, cost, tokens, duration, ttft)
 
 # Prometheus metrics
-LLM_REQUESTS_TOTAL = Counter('llm_requests_total', 'Total LLM requests', ['model'])
-LLM_REQUEST_DURATION = Gauge('llm_request_duration_seconds', 'LLM request duration in seconds', ['model'])
-LLM_ERRORS_TOTAL = Counter('llm_errors_total', 'Total LLM errors', ['model'])
-LLM_COST_TOTAL = Counter('llm_cost_total', 'Total LLM cost in USD', ['model'])
-LLM_TOKENS_TOTAL = Counter('llm_tokens_total', 'Total tokens processed', ['model'])
+LLM_METRICS = LLMMetricsCollector()
+REGISTRY.register(LLM_METRICS)
+
+class AdmittedStream:
+    """A streamed response that holds its admission until it ends.
+
+    The admission is released as soon as the stream is exhausted, raises or
+    is closed with ``aclose`` (or by leaving ``async with``), rather than
+    whenever the garbage collector finalises an abandoned generator.
+    Callers that stop reading early must close it.
+    """
+
+    def __init__(self, first: Any, stream, admission: Admission):
+        self._first = first
+        self._started = False
+        self._stream = stream
+        self.admission = admission
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._started:
+            self._started = True
+            first, self._first = self._first, None
+            return first
+        try:
+            return await self._stream.__anext__()
+        except BaseException:
+            await self.aclose()
+            raise
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            # Normally already released, with the usage, by the stream itself
+            self.admission.release()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
 
 class LiteLLMManager:
     def __init__(self, config: ConfigManager):
         self.config = config
+        self.admission = AdmissionController.from_config(config)
+        # Time to first token per model, after admission; drives hedging
+        self.first_token: Dict[str, LatencyHistogram] = {}
+        cache_config = self.config.get('litellm.cache', {})
+        self.cache = ResponseCache.from_config(cache_config) if cache_config.get('enabled') else None
+        self.cache_bypass = set(cache_config.get('bypass_agents', []))
+        # Model configs as last applied, to tell what a config change touched
+        self.models: Dict[str, Dict[str, Any]] = {}
         # Configure logging
         logger.add("logs/litellm.log", rotation="100 MB", retention="10 days")
         
-        # Configure Prometheus if enabled
+        # Configure Prometheus if enabled; binding the port must not hold up startup
         prometheus_config = self.config.get('monitoring.prometheus', {})
         if prometheus_config.get('enabled', True):
-            try:
-                port = prometheus_config.get('port', 8000)
-                start_http_server(port)
-                logger.info(f"Prometheus metrics server started on port {port}")
-            except Exception as e:
-                logger.error(f"Failed to start Prometheus server: {str(e)}")
+            threading.Thread(target=self._start_prometheus,
+                             args=(prometheus_config.get('port', 8000),),
+                             name="prometheus-start", daemon=True).start()
         
         self._setup_litellm()
+        self.config.subscribe('litellm.models', self.apply_models)
         
+    @staticmethod
+    def _start_prometheus(port: int):
+        try:
+            start_http_server(port)
+            logger.info(f"Prometheus metrics server started on port {port}")
+        except Exception as e:
+            logger.error(f"Failed to start Prometheus server: {str(e)}")
+
     def _setup_litellm(self):
         """Initialize LiteLLM with configuration settings"""
         litellm.drop_params = True
@@ -41,6 +207,7 @@ class LiteLLMManager:
         # Configure models from config
         for model in self.config.get('litellm.models', []):
             self.register_model(model)
+            self.models[model['name']] = model
             
     
         
@@ -69,14 +236,14 @@ class LiteLLMManager:
         # Validate API key
         api_key = model_config.get('api_key', '')
         if not self._validate_api_key(api_key):
-            LLM_ERRORS_TOTAL.labels(model=model_name).inc()
+            LLM_METRICS.for_model(model_name).error()
             logger.error(f"Invalid API key format for model {model_name}")
             raise ValueError("Invalid API key format")
 
         # Validate base URL
         base_url = model_config.get('provider_options', {}).get('api_base', '')
         if not self._validate_url(base_url):
-            LLM_ERRORS_TOTAL.labels(model=model_name).inc()
+            LLM_METRICS.for_model(model_name).error()
             logger.error(f"Invalid API base URL for model {model_name}: {base_url}")
             raise ValueError("Invalid API base URL")
 
@@ -102,16 +269,298 @@ class LiteLLMManager:
         try:
             litellm.register_model(model_name, config)
             logger.info(f"Successfully registered model: {model_name}")
-            LLM_REQUESTS_TOTAL.labels(model=model_name).inc()
             
-            # Initialize cost tracking
-            LLM_COST_TOTAL.labels(model=model_name).inc(0)
-            LLM_TOKENS_TOTAL.labels(model=model_name).inc(0)
+            # Initialize per-model series so they are exported from zero
+            LLM_METRICS.for_model(model_name)
         except Exception as e:
-            LLM_ERRORS_TOTAL.labels(model=model_name).inc()
+            LLM_METRICS.for_model(model_name).error()
             logger.error(f"Failed to register model {model_name}: {str(e)}")
             raise
 
+    def apply_models(self, models: Optional[list]):
+        """Register new or changed models and drop removed ones.
+
+        Called when ``litellm.models`` changes; models whose configuration
+        is unchanged are left alone. Changes arriving on another thread, such
+        as the config watcher, are handed to the loop requests run on.
+        """
+        loop = self.admission.loop
+        if loop is not None and loop.is_running() and not self._on_loop(loop):
+            loop.call_soon_threadsafe(self.apply_models, models)
+            return
+        wanted = {m['name']: m for m in models or []}
+        for name in [n for n in self.models if n not in wanted]:
+            del self.models[name]
+            self.admission.forget(name)
+            logger.info(f"Removed model: {name}")
+        for name, model_config in wanted.items():
+            if self.models.get(name) == model_config:
+                continue
+            try:
+                self._apply_model(model_config)
+            except Exception:
+                # Already counted and logged by register_model
+                pass
+
+    @staticmethod
+    def _on_loop(loop: asyncio.AbstractEventLoop) -> bool:
+        try:
+            return asyncio.get_running_loop() is loop
+        except RuntimeError:
+            return False
+
+    def _apply_model(self, model_config: Dict[str, Any]):
+        name = model_config['name']
+        self.models[name] = model_config
+        self.admission.set_model_limits(name, model_config.get('rate_limit', 60),
+                                        model_config.get('tpm_limit'))
+        self.register_model(model_config)
+
+    def completion(self, messages: list, model: Optional[str] = None, **kwargs):
+        """Call litellm.completion and record latency, tokens and cost"""
+        model = model or self.get_default_model()
+        metrics = LLM_METRICS.for_model(model)
+        started = time.perf_counter()
+        try:
+            response = litellm.completion(model=model, messages=messages, **kwargs)
+        except Exception:
+            metrics.failed()
+            raise
+        if kwargs.get('stream'):
+            return self._instrument_stream(response, metrics, started)
+        metrics.observe(response, time.perf_counter() - started)
+        return response
+
+    async def acompletion(self, messages: list, model: Optional[str] = None,
+                          agent: str = "", **kwargs):
+        """Answer from the response cache, or call the model and cache the result.
+
+        Streams and agents in ``cache_bypass`` always go to the model.
+        """
+        model = model or self.get_default_model()
+        if self.cache is None or kwargs.get('stream') or agent in self.cache_bypass:
+            return await self._route(messages, model, agent, kwargs)
+
+        scope = ResponseCache.scope(model, kwargs)
+        key = ResponseCache.key(scope, messages)
+        cached = await self.cache.aget(key)
+        embedding = None
+        if cached is None and self.cache.semantic:
+            embedding = await self._embed(messages)
+            if embedding is not None:
+                cached = await self.cache.afind_similar(scope, embedding)
+        if cached is not None:
+            response = litellm.ModelResponse(**cached)
+            response._hidden_params['cache_hit'] = True
+            return response
+
+        self.cache.miss()
+        response = await self._route(messages, model, agent, kwargs)
+        self.cache.put(key, scope, response.model_dump(), embedding)
+        return response
+
+    async def _embed(self, messages: list) -> Optional[list]:
+        """Embedding of the prompt text for the semantic cache tier"""
+        text = "\n".join(str(m.get('content') or '') for m in messages)
+        embedding_model = self.config.get('litellm.cache.semantic.embedding_model',
+                                          'text-embedding-3-small')
+        try:
+            response = await litellm.aembedding(model=embedding_model, input=[text])
+        except Exception as e:
+            logger.warning(f"Embedding for response cache failed: {str(e)}")
+            return None
+        data = response.data[0]
+        return data['embedding'] if isinstance(data, dict) else data.embedding
+
+    def set_cache_bypass(self, agent: str, bypass: bool = True):
+        """Always send an agent's requests to the model, skipping the cache"""
+        if bypass:
+            self.cache_bypass.add(agent)
+        else:
+            self.cache_bypass.discard(agent)
+
+    async def _route(self, messages: list, model: str, agent: str, kwargs: Dict[str, Any]):
+        """Try ``model`` then ``litellm.fallback_models`` until one succeeds.
+
+        Errors and timeouts move on to the next model. With
+        ``litellm.hedging.enabled`` a request to the next model is started
+        early if the current one has not produced a first token within its
+        observed p95, and whichever answers first wins.
+        """
+        candidates = [model] + [m for m in self.config.get('litellm.fallback_models', []) if m != model]
+        attempts: Dict[asyncio.Task, str] = {}
+        # Set once each attempt has been admitted and its request sent
+        admitted: Dict[asyncio.Task, asyncio.Event] = {}
+        errors = []
+        hedged = False
+
+        def start_next():
+            next_model = candidates.pop(0)
+            event = asyncio.Event()
+            attempt = asyncio.create_task(
+                self._acompletion_once(next_model, messages, agent, kwargs, event))
+            attempts[attempt] = next_model
+            admitted[attempt] = event
+
+        start_next()
+        try:
+            while attempts:
+                delay = None
+                if candidates and not hedged and len(attempts) == 1:
+                    attempt, attempt_model = next(iter(attempts.items()))
+                    delay = self._hedge_delay(attempt_model)
+                    if (delay is not None and not admitted[attempt].is_set()
+                            and not attempt.done()):
+                        # Time spent queued for admission is not slowness of
+                        # the model, so the hedge clock starts once it is sent
+                        await self._wait_admitted(attempt, admitted[attempt])
+                        continue
+                done, _ = await asyncio.wait(attempts, timeout=delay,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    logger.info(f"Hedging slow request to {next(iter(attempts.values()))}")
+                    start_next()
+                    continue
+                for attempt in done:
+                    attempt_model = attempts.pop(attempt)
+                    error = attempt.exception()
+                    if error is None:
+                        if attempt_model != model:
+                            logger.info(f"Request for {model} served by {attempt_model}")
+                        return attempt.result()
+                    errors.append(error)
+                    logger.warning(f"Request to {attempt_model} failed: {error}")
+                if not attempts and candidates:
+                    start_next()
+            raise errors[-1]
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+            for attempt in attempts:
+                try:
+                    result = await attempt
+                except BaseException:
+                    continue
+                if kwargs.get('stream'):
+                    await result.aclose()
+
+    @staticmethod
+    async def _wait_admitted(attempt: asyncio.Task, admitted: asyncio.Event):
+        """Wait until an attempt is admitted or has already finished"""
+        waiter = asyncio.create_task(admitted.wait())
+        try:
+            await asyncio.wait({attempt, waiter}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            waiter.cancel()
+
+    def _hedge_delay(self, model: str) -> Optional[float]:
+        """Observed time-to-first-token quantile after which to hedge"""
+        hedging = self.config.get('litellm.hedging', {})
+        if not hedging.get('enabled', False):
+            return None
+        histogram = self.first_token.get(model)
+        if histogram is None or histogram.count < hedging.get('min_samples', 20):
+            return None
+        return histogram.quantile(hedging.get('quantile', 0.95))
+
+    async def _acompletion_once(self, model: str, messages: list, agent: str,
+                                kwargs: Dict[str, Any],
+                                admitted: Optional[asyncio.Event] = None):
+        """One model's attempt, within the rate limits.
+
+        Streams are returned only once their first chunk has arrived, so a
+        stream that stalls before its first token can be failed over or hedged.
+        """
+        metrics = LLM_METRICS.for_model(model)
+        estimate = self._estimate_tokens(messages, kwargs)
+        retries = self.config.get('litellm.rate_limit_retries', 3)
+        timeout = self.get_model_config(model).get('timeout')
+        for attempt in range(retries + 1):
+            admission = await self.admission.admit(model, agent, estimate)
+            if admitted is not None:
+                admitted.set()
+            started = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(
+                    litellm.acompletion(model=model, messages=messages, **kwargs), timeout)
+            except BaseException as e:
+                admission.release()
+                if isinstance(e, Exception):
+                    metrics.failed()
+                if is_rate_limited(e):
+                    self.admission.report_rate_limited(model, retry_after(e))
+                    if attempt < retries:
+                        continue
+                raise
+            self.admission.report_success(model)
+            if kwargs.get('stream'):
+                stream = self._instrument_astream(response, metrics, started, admission)
+                try:
+                    first = await asyncio.wait_for(stream.__anext__(), timeout)
+                except BaseException:
+                    await stream.aclose()
+                    raise
+                self._record_first_token(model, time.perf_counter() - started)
+                return AdmittedStream(first, stream, admission)
+            latency = time.perf_counter() - started
+            metrics.observe(response, latency)
+            self._record_first_token(model, latency)
+            admission.release(self._used_tokens(response))
+            return response
+
+    def _record_first_token(self, model: str, latency: float):
+        histogram = self.first_token.get(model)
+        if histogram is None:
+            histogram = self.first_token[model] = LatencyHistogram()
+        histogram.record(latency)
+
+    @staticmethod
+    def _estimate_tokens(messages: list, kwargs: Dict[str, Any]) -> int:
+        """Rough token count for TPM budgeting; corrected once usage is known"""
+        chars = sum(len(str(m.get('content') or '')) for m in messages)
+        return chars // 4 + (kwargs.get('max_tokens') or 0)
+
+    @staticmethod
+    def _used_tokens(response: Any) -> Optional[int]:
+        usage = getattr(response, 'usage', None)
+        return getattr(usage, 'total_tokens', None) if usage is not None else None
+
+    @staticmethod
+    def _instrument_stream(stream, metrics: ModelMetrics, started: float):
+        ttft = None
+        last = None
+        try:
+            for chunk in stream:
+                if ttft is None:
+                    ttft = time.perf_counter() - started
+                last = chunk
+                yield chunk
+        except Exception:
+            metrics.failed()
+            raise
+        # With stream_options={"include_usage": True} the last chunk carries usage
+        metrics.observe(last, time.perf_counter() - started, ttft)
+
+    @staticmethod
+    async def _instrument_astream(stream, metrics: ModelMetrics, started: float,
+                                  admission: Admission):
+        ttft = None
+        last = None
+        try:
+            async for chunk in stream:
+                if ttft is None:
+                    ttft = time.perf_counter() - started
+                last = chunk
+                yield chunk
+        except Exception:
+            metrics.failed()
+            raise
+        finally:
+            # The concurrency slot is held until the stream is consumed
+            admission.release(LiteLLMManager._used_tokens(last))
+        metrics.observe(last, time.perf_counter() - started, ttft)
+
     def get_cost_data(self, model_name: str) -> Dict[str, float]:
         """Get cost data for a specific model"""
         try:
@@ -127,24 +576,31 @@ class LiteLLMManager:
         
     def get_model_config(self, model_name: str) -> Dict[str, Any]:
         """Get configuration for a specific model"""
-        for model in self.config.get('litellm.models', []):
-            if model['name'] == model_name:
-                return model
-        return {}
+        return self.config.get_model(model_name) or {}
         
     def update_model_config(self, model_name: str, config: Dict[str, Any]):
         """Update configuration for a specific model"""
-        models = self.config.get('litellm.models', [])
+        # Copy so the background config writer never sees a half-edited list
+        models = list(self.config.get('litellm.models', []))
         for i, model in enumerate(models):
             if model['name'] == model_name:
-                models[i] = {**model, **config}
+                models[i] = entry = {**model, **config}
                 break
         else:
             models.append(config)
-            
+            entry = config
+
+        # Registered here rather than by apply_models so errors reach the caller
+        self.models[model_name] = entry
         self.config.set('litellm.models', models)
-        self.register_model(config)
+        self._apply_model(entry)
         
+    def update_model_configs(self, configs: Dict[str, Dict[str, Any]]):
+        """Update several models with a single config write"""
+        with self.config.batch():
+            for model_name, config in configs.items():
+                self.update_model_config(model_name, config)
+
     def remove_model(self, model_name: str):
         """Remove a model configuration"""
         models = self.config.get('litellm.models', [])
@@ -1,8 +1,12 @@
 import json
+import time
 import asyncio
 import websockets
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator
 from dataclasses import dataclass
+from .connection_pool import ConnectionPool
+from .scheduler import EndpointScheduler
+from .streaming import IncrementalJSONDecoder
 
 @dataclass
 class OpenHandsEndpoint:
@@ -20,6 +24,30 @@ class OpenHandsClient:
         ]
         self.default_timeout = config.get('default_timeout', 30)
         self.max_retries = config.get('max_retries', 3)
+        self.pool_config = config.get('pool', {})
+        self.stream_config = config.get('streaming', {})
+        self.pools: Dict[str, ConnectionPool] = {}
+        # Pools of removed or re-pointed endpoints that are still closing
+        self._closing: set[asyncio.Task] = set()
+        self.scheduler = EndpointScheduler.from_config(config.get('scheduler', {}))
+
+    def _get_pool(self, endpoint: OpenHandsEndpoint) -> ConnectionPool:
+        """Get or create the connection pool for an endpoint"""
+        pool = self.pools.get(endpoint.name)
+        if pool is not None and pool.url != endpoint.url:
+            self._close_pool(endpoint.name)
+            pool = None
+        if pool is None:
+            pool = ConnectionPool(
+                endpoint.url,
+                size=self.pool_config.get('size', 4),
+                idle_timeout=self.pool_config.get('idle_timeout', 300),
+                ping_interval=self.pool_config.get('ping_interval', 20),
+                ping_timeout=self.pool_config.get('ping_timeout', 20),
+                open_timeout=self.default_timeout
+            )
+            self.pools[endpoint.name] = pool
+        return pool
         
     async def send_command(self, endpoint: OpenHandsEndpoint, command: str, 
                          params: Optional[Dict] = None) -> Dict:
@@ -33,22 +61,109 @@ class OpenHandsClient:
             "api_key": endpoint.api_key
         }
         
+        self.scheduler.on_start(endpoint)
+        started = time.monotonic()
+        try:
+            response = await self._send_with_retries(endpoint, payload)
+        except asyncio.CancelledError:
+            self.scheduler.on_cancel(endpoint)
+            raise
+        except Exception:
+            self.scheduler.on_failure(endpoint)
+            raise
+        self.scheduler.on_success(endpoint, time.monotonic() - started)
+        return response
+
+    async def _send_with_retries(self, endpoint: OpenHandsEndpoint,
+                                 payload: Dict[str, Any]) -> Dict:
         for attempt in range(self.max_retries):
             try:
-                async with websockets.connect(
-                    endpoint.url,
-                    timeout=self.default_timeout
-                ) as websocket:
-                    await websocket.send(json.dumps(payload))
-                    response = await websocket.recv()
-                    return json.loads(response)
-            except (websockets.exceptions.ConnectionClosed, 
-                   asyncio.TimeoutError) as e:
+                pool = self._get_pool(endpoint)
+                return await pool.request(
+                    payload, endpoint.timeout or self.default_timeout
+                )
+            except (websockets.exceptions.ConnectionClosed,
+                   asyncio.TimeoutError, OSError) as e:
                 if attempt == self.max_retries - 1:
                     raise ConnectionError(
                         f"Failed to connect after {self.max_retries} attempts"
                     ) from e
-                await asyncio.sleep(1)
+            await asyncio.sleep(1)
+
+    async def stream_command(self, endpoint: OpenHandsEndpoint, command: str,
+                             params: Optional[Dict] = None) -> AsyncIterator[Dict]:
+        """Send a command and yield its events as they arrive.
+
+        The server may split events across frames or pack several into one.
+        The stream ends after an event with a true ``done`` field. Memory use
+        is capped by ``streaming.max_frames`` queued frames plus
+        ``streaming.max_buffer`` characters of one partial event.
+        """
+        if not endpoint.active:
+            raise ConnectionError("Endpoint is not active")
+
+        payload = {
+            "command": command,
+            "params": params or {},
+            "api_key": endpoint.api_key,
+            "stream": True
+        }
+        timeout = endpoint.timeout or self.default_timeout
+        decoder = IncrementalJSONDecoder(self.stream_config.get('max_buffer', 1 << 20))
+        pool = self._get_pool(endpoint)
+
+        self.scheduler.on_start(endpoint)
+        started = time.monotonic()
+        try:
+            async with pool.stream(self.stream_config.get('max_frames', 64)) as connection:
+                await connection.websocket.send(json.dumps(payload))
+                while True:
+                    frame = await asyncio.wait_for(connection.sink.get(), timeout)
+                    if frame is None:
+                        raise ConnectionError("Stream closed before the final event")
+                    for event in decoder.feed(frame):
+                        yield event
+                        if isinstance(event, dict) and event.get("done"):
+                            connection.finished = True
+                            break
+                    if connection.finished:
+                        break
+        except (websockets.exceptions.ConnectionClosed,
+                asyncio.TimeoutError, OSError) as e:
+            self.scheduler.on_failure(endpoint)
+            raise ConnectionError(f"Stream from {endpoint.name} failed") from e
+        except (asyncio.CancelledError, GeneratorExit):
+            self.scheduler.on_cancel(endpoint)
+            raise
+        except Exception:
+            self.scheduler.on_failure(endpoint)
+            raise
+        else:
+            self.scheduler.on_success(endpoint, time.monotonic() - started)
+
+    def choose_endpoint(self, key: Optional[str] = None) -> OpenHandsEndpoint:
+        """Pick an endpoint using the configured scheduling policy"""
+        return self.scheduler.select(self.endpoints, key)
+
+    async def send_task(self, command: str, params: Optional[Dict] = None,
+                        key: Optional[str] = None) -> Dict:
+        """Send a command to a scheduled endpoint, failing over to the others"""
+        tried = set()
+        last_error = None
+        while True:
+            try:
+                endpoint = self.scheduler.select(self.endpoints, key, exclude=tried)
+            except ConnectionError:
+                if last_error is None:
+                    raise
+                raise ConnectionError(
+                    f"All OpenHands endpoints failed for command {command}"
+                ) from last_error
+            try:
+                return await self.send_command(endpoint, command, params)
+            except ConnectionError as e:
+                tried.add(endpoint.name)
+                last_error = e
                 
     def get_active_endpoints(self) -> list[OpenHandsEndpoint]:
         return [e for e in self.endpoints if e.active]
@@ -57,4 +172,54 @@ class OpenHandsClient:
         self.endpoints.append(OpenHandsEndpoint(**endpoint))
         
     def remove_endpoint(self, endpoint_name: str):
-        self.endpoints = [e for e in self.endpoints if e.name != endpoint_name]
\ No newline at end of file
+        self.endpoints = [e for e in self.endpoints if e.name != endpoint_name]
+        self.scheduler.forget(endpoint_name)
+        self._close_pool(endpoint_name)
+
+    def _close_pool(self, endpoint_name: str):
+        pool = self.pools.pop(endpoint_name, None)
+        if pool is not None:
+            try:
+                task = asyncio.get_running_loop().create_task(pool.close())
+            except RuntimeError:
+                return
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+
+    def apply_endpoints(self, endpoints: list[Dict[str, Any]]) -> tuple[list[str], list[str]]:
+        """Bring the endpoint list in line with new configuration.
+
+        Endpoints are matched by name and updated in place, so unchanged ones
+        keep their pooled connections and in-flight commands. Only an endpoint
+        whose URL changed gets a fresh pool. Returns (added, removed) names.
+        """
+        wanted = {e['name']: e for e in endpoints}
+        current = {e.name: e for e in self.endpoints}
+        removed = [name for name in current if name not in wanted]
+        for name in removed:
+            self.remove_endpoint(name)
+
+        added = []
+        for name, endpoint_config in wanted.items():
+            endpoint = current.get(name)
+            if endpoint is None:
+                self.add_endpoint(endpoint_config)
+                added.append(name)
+                continue
+            updated = OpenHandsEndpoint(**endpoint_config)
+            if updated.url != endpoint.url:
+                self._close_pool(name)
+                self.scheduler.forget(name)
+            endpoint.url = updated.url
+            endpoint.api_key = updated.api_key
+            endpoint.timeout = updated.timeout
+            endpoint.active = updated.active
+        return added, removed
+
+    async def close(self):
+        """Close all pooled connections"""
+        pools, self.pools = self.pools, {}
+        for pool in pools.values():
+            await pool.close()
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
@@ -0,0 +1,300 @@
+import time
+import asyncio
+import threading
+from collections import deque
+from typing import Optional, Dict, Any
+
+
+class TokenBucket:
+    """Continuously refilling budget of ``rate`` units per minute.
+
+    ``capacity`` bounds the burst; by default ten seconds' worth of budget,
+    which keeps a burst from overrunning a provider's per-minute window.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or max(1.0, self.rate * 10)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` units are available (0 if they are now)"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        # May go negative when reconciling an underestimate; refill repays it
+        self.tokens -= min(amount, self.capacity)
+
+    def refund(self, amount: float):
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def set_rate(self, rate_per_minute: float):
+        self._refill(time.monotonic())
+        self.rate = rate_per_minute / 60.0
+
+
+class _ModelState:
+    def __init__(self, rpm: Optional[float], tpm: Optional[float]):
+        self.configured_rpm = rpm
+        self.rpm = TokenBucket(rpm) if rpm else None
+        self.tpm = TokenBucket(tpm) if tpm else None
+        self.paused_until = 0.0
+        self.backoff = 1.0
+        # Per-agent FIFO queues, served round-robin for fairness
+        self.waiters: Dict[str, deque] = {}
+        self.turns: deque = deque()
+        self.pump: Optional[asyncio.Task] = None
+        self.wakeup = asyncio.Event()
+
+    def has_waiters(self) -> bool:
+        return bool(self.turns)
+
+
+class Admission:
+    """A granted request slot; release it when the request finishes"""
+
+    def __init__(self, controller: 'AdmissionController', model: str, tokens: float):
+        self.controller = controller
+        self.model = model
+        self.tokens = tokens
+        self._released = False
+
+    def release(self, actual_tokens: Optional[float] = None):
+        if self._released:
+            return
+        self._released = True
+        self.controller._release(self, actual_tokens)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.release()
+
+
+class AdmissionController:
+    """Keeps LLM traffic within concurrency and per-model rate limits.
+
+    ``admit`` waits until the global concurrency limit, the model's RPM and
+    TPM buckets and any Retry-After pause all allow the request. Waiting
+    requests for a model are granted round-robin across agents, so one busy
+    agent cannot starve the others. A 429 pauses the model and lowers its
+    request rate; successes raise it back towards the configured limit.
+
+    Grants happen on the event loop. Model limits may also be changed from
+    other threads (a config reload), so the model tables are guarded by
+    ``_lock``.
+    """
+
+    def __init__(self, max_concurrent: int = 5, model_limits: Optional[Dict[str, Dict[str, Any]]] = None,
+                 rate_decrease: float = 0.8, rate_recovery: float = 0.05):
+        self.max_concurrent = max_concurrent
+        self.model_limits = model_limits or {}
+        self.rate_decrease = rate_decrease
+        self.rate_recovery = rate_recovery
+        self.in_flight = 0
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._models: Dict[str, _ModelState] = {}
+        self._lock = threading.Lock()
+        # The event loop requests are admitted on, once the first one arrives
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def from_config(cls, config) -> 'AdmissionController':
+        limits = {
+            model['name']: {
+                'rpm': model.get('rate_limit', 60),
+                'tpm': model.get('tpm_limit')
+            }
+            for model in config.get('litellm.models', [])
+        }
+        return cls(
+            max_concurrent=config.get('litellm.max_concurrent_requests', 5),
+            model_limits=limits
+        )
+
+    def set_model_limits(self, model: str, rpm: Optional[float] = None, tpm: Optional[float] = None):
+        """Change a model's limits; takes effect for requests not yet granted"""
+        with self._lock:
+            self.model_limits[model] = {'rpm': rpm, 'tpm': tpm}
+            state = self._models.get(model)
+            if state is not None and not state.has_waiters():
+                del self._models[model]
+
+    def forget(self, model: str):
+        """Drop a removed model's limits"""
+        with self._lock:
+            self.model_limits.pop(model, None)
+            state = self._models.get(model)
+            if state is not None and not state.has_waiters():
+                del self._models[model]
+
+    def _state(self, model: str) -> _ModelState:
+        with self._lock:
+            state = self._models.get(model)
+            if state is None:
+                limits = self.model_limits.get(model, {})
+                state = self._models[model] = _ModelState(limits.get('rpm'), limits.get('tpm'))
+            return state
+
+    async def admit(self, model: str, agent: str = "", tokens: float = 0) -> Admission:
+        """Wait for permission to send one request of about ``tokens`` tokens"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrent)
+            self.loop = asyncio.get_running_loop()
+        state = self._state(model)
+        future = asyncio.get_running_loop().create_future()
+        queue = state.waiters.get(agent)
+        if queue is None:
+            queue = state.waiters[agent] = deque()
+        if not queue:
+            state.turns.append(agent)
+        queue.append((future, tokens))
+        if state.pump is None or state.pump.done():
+            state.pump = asyncio.create_task(self._pump(model, state))
+        else:
+            state.wakeup.set()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                future.result().release()
+            raise
+        return future.result()
+
+    def _next_waiter(self, state: _ModelState):
+        """Head of the next agent's queue in round-robin order"""
+        while state.turns:
+            agent = state.turns[0]
+            queue = state.waiters[agent]
+            while queue and queue[0][0].done():
+                queue.popleft()
+            if queue:
+                return agent, queue
+            state.turns.popleft()
+            del state.waiters[agent]
+        return None, None
+
+    def _wait_time(self, state: _ModelState, tokens: float) -> float:
+        now = time.monotonic()
+        wait = state.paused_until - now
+        if state.rpm is not None:
+            wait = max(wait, state.rpm.wait_time(1, now))
+        if state.tpm is not None and tokens:
+            wait = max(wait, state.tpm.wait_time(tokens, now))
+        return wait
+
+    async def _pump(self, model: str, state: _ModelState):
+        while True:
+            agent, queue = self._next_waiter(state)
+            if queue is None:
+                return
+            future, tokens = queue[0]
+            wait = self._wait_time(state, tokens)
+            if wait > 0:
+                state.wakeup.clear()
+                try:
+                    await asyncio.wait_for(state.wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._slots.acquire()
+            # A 429 may have paused the model while waiting for a slot
+            if future.done() or self._wait_time(state, tokens) > 0:
+                self._slots.release()
+                continue
+
+            queue.popleft()
+            state.turns.popleft()
+            if queue:
+                state.turns.append(agent)
+            else:
+                del state.waiters[agent]
+            if state.rpm is not None:
+                state.rpm.consume(1)
+            if state.tpm is not None and tokens:
+                state.tpm.consume(tokens)
+            self.in_flight += 1
+            future.set_result(Admission(self, model, tokens))
+
+    def _release(self, admission: Admission, actual_tokens: Optional[float]):
+        self.in_flight -= 1
+        self._slots.release()
+        state = self._models.get(admission.model)
+        if state is None or state.tpm is None or actual_tokens is None:
+            return
+        # Settle the estimate against what the provider actually counted
+        difference = admission.tokens - actual_tokens
+        if difference > 0:
+            state.tpm.refund(difference)
+        else:
+            state.tpm.consume(-difference)
+
+    def report_success(self, model: str):
+        """Let a model's request rate recover after earlier 429s"""
+        state = self._models.get(model)
+        if state is None:
+            return
+        state.backoff = 1.0
+        if state.rpm is not None and state.configured_rpm:
+            current = state.rpm.rate * 60
+            if current < state.configured_rpm:
+                state.rpm.set_rate(current + (state.configured_rpm - current) * self.rate_recovery)
+
+    def report_rate_limited(self, model: str, retry_after: Optional[float] = None):
+        """Pause a model after a 429 and lower its request rate"""
+        state = self._state(model)
+        delay = retry_after if retry_after is not None else state.backoff
+        state.backoff = min(state.backoff * 2, 60.0)
+        state.paused_until = max(state.paused_until, time.monotonic() + delay)
+        if state.rpm is not None:
+            state.rpm.set_rate(max(1.0, state.rpm.rate * 60 * self.rate_decrease))
+            state.rpm.tokens = min(state.rpm.tokens, 0.0)
+        state.wakeup.set()
+
+    def get_state(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            models = list(self._models.items())
+        return {
+            "in_flight": self.in_flight,
+            "max_concurrent": self.max_concurrent,
+            "models": {
+                model: {
+                    "rpm": state.rpm.rate * 60 if state.rpm else None,
+                    "waiting": sum(len(q) for q in list(state.waiters.values())),
+                    "paused_for": max(0.0, state.paused_until - now)
+                }
+                for model, state in models
+            }
+        }
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    """Whether an exception is a provider's HTTP 429 response"""
+    return getattr(error, 'status_code', None) == 429
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds from a 429's Retry-After header, if the provider sent one"""
+    headers = getattr(error, 'litellm_response_headers', None)
+    if headers is None:
+        headers = getattr(getattr(error, 'response', None), 'headers', None)
+    if not headers:
+        return None
+    value = headers.get('retry-after') or headers.get('Retry-After')
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        # HTTP-date form; fall back to exponential backoff
+        return None
@@ -0,0 +1,356 @@
+import json
+import math
+import time
+import asyncio
+import sqlite3
+import hashlib
+import operator
+import threading
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple
+from loguru import logger
+from prometheus_client import Counter
+
+# Prometheus metrics
+CACHE_HITS_TOTAL = Counter('llm_cache_hits_total', 'LLM response cache hits', ['tier'])
+CACHE_MISSES_TOTAL = Counter('llm_cache_misses_total', 'LLM response cache misses')
+
+# Request parameters that do not change what the model answers
+_UNCACHED_PARAMS = frozenset({'stream', 'stream_options', 'timeout', 'metadata',
+                              'api_key', 'num_retries'})
+
+
+def normalize(vector) -> array:
+    """Unit-length copy of an embedding, so cosine similarity is a dot product"""
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return array('f', (x / norm for x in vector))
+
+
+class ResponseCache:
+    """Two-tier cache of LLM completions.
+
+    The exact tier hashes (model, messages, params) and keeps the most recent
+    ``max_entries`` responses in an in-memory LRU in front of a SQLite table
+    of up to ``max_disk_entries``. The optional semantic tier also stores the
+    prompt's embedding and returns a response whose prompt has cosine
+    similarity of at least ``similarity_threshold`` under the same model and
+    parameters. Entries older than ``ttl`` seconds are never returned.
+
+    New entries and access times are written behind by a background thread
+    every ``flush_interval`` seconds, in one transaction per batch. Async
+    callers use ``aget`` and ``afind_similar``, which read the disk tier and
+    scan the embeddings on worker threads instead of blocking the event loop.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            scope TEXT NOT NULL,
+            response TEXT NOT NULL,
+            embedding BLOB,
+            created_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at);
+    """
+
+    def __init__(self, path: str = "data/llm_cache.db", max_entries: int = 1000,
+                 max_disk_entries: int = 100000, ttl: Optional[float] = 86400,
+                 similarity_threshold: Optional[float] = None,
+                 max_semantic_entries: int = 1000, flush_interval: float = 1.0,
+                 batch_size: int = 256):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.max_semantic_entries = max_semantic_entries
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self._SCHEMA)
+        self._memory: OrderedDict[str, Tuple[float, Dict[str, Any]]] = OrderedDict()
+        # scope -> [(key, unit embedding)], newest last
+        self._vectors: Dict[str, List[Tuple[str, array]]] = {}
+        self._vector_count = 0
+        self._puts = 0
+        self.stats = {"hits": 0, "misses": 0}
+        if self.semantic:
+            self._load_vectors()
+        # _lock guards the write-behind buffers, _db_lock the connection
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._pending: Dict[str, tuple] = {}
+        self._touched: Dict[str, float] = {}
+        self._evict_due = False
+        self._wakeup = threading.Event()
+        self._closed = threading.Event()
+        self._writer = threading.Thread(target=self._write_loop, name="response-cache-writer",
+                                        daemon=True)
+        self._writer.start()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'ResponseCache':
+        semantic = config.get('semantic', {})
+        return cls(
+            path=config.get('path', "data/llm_cache.db"),
+            max_entries=config.get('max_entries', 1000),
+            max_disk_entries=config.get('max_disk_entries', 100000),
+            ttl=config.get('ttl', 86400),
+            flush_interval=config.get('flush_interval', 1.0),
+            similarity_threshold=semantic.get('threshold', 0.95) if semantic.get('enabled') else None,
+            max_semantic_entries=semantic.get('max_entries', 1000)
+        )
+
+    @property
+    def semantic(self) -> bool:
+        return self.similarity_threshold is not None
+
+    @staticmethod
+    def scope(model: str, params: Dict[str, Any]) -> str:
+        """Hash of the model and answer-affecting parameters"""
+        relevant = {k: v for k, v in params.items() if k not in _UNCACHED_PARAMS}
+        blob = json.dumps([model, relevant], sort_keys=True, default=str)
+        return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def key(scope: str, messages: list) -> str:
+        blob = json.dumps(messages, sort_keys=True, default=str)
+        return hashlib.sha256((scope + blob).encode('utf-8')).hexdigest()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return bool(self.ttl) and now - created_at > self.ttl
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Exact-match lookup; returns the stored response data"""
+        now = time.time()
+        response = self._memory_get(key, now)
+        if response is not None:
+            return response
+        return self._disk_hit(key, self._lookup(key), now)
+
+    async def aget(self, key: str) -> Optional[Dict[str, Any]]:
+        """``get`` for async callers; the disk tier is read on a worker thread"""
+        now = time.time()
+        response = self._memory_get(key, now)
+        if response is not None:
+            return response
+        return self._disk_hit(key, await asyncio.to_thread(self._lookup, key), now)
+
+    def _memory_get(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            if not self._expired(entry[0], now):
+                self._memory.move_to_end(key)
+                return self._hit("memory", entry[1])
+            del self._memory[key]
+        return None
+
+    def _lookup(self, key: str) -> Optional[Tuple[str, float]]:
+        """Stored (response JSON, created_at), including entries not yet written"""
+        # Holding _db_lock keeps a batch from being between buffer and table
+        with self._db_lock:
+            with self._lock:
+                row = self._pending.get(key)
+            if row is not None:
+                return row[2], row[4]
+            return self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+
+    def _disk_hit(self, key: str, row: Optional[Tuple[str, float]],
+                  now: float) -> Optional[Dict[str, Any]]:
+        if row is None or self._expired(row[1], now):
+            return None
+        response = json.loads(row[0])
+        with self._lock:
+            self._touched[key] = now
+        self._remember(key, row[1], response)
+        return self._hit("disk", response)
+
+    def find_similar(self, scope: str, embedding) -> Optional[Dict[str, Any]]:
+        """Semantic lookup of the closest prompt at or above the threshold.
+
+        A match whose entry has since expired or been evicted gives way to
+        the next closest one.
+        """
+        now = time.time()
+        for key in self._ranked(scope, embedding):
+            response = self._similar_memory_hit(key, now)
+            if response is None:
+                response = self._similar_row_hit(self._lookup(key), now)
+            if response is not None:
+                return response
+        return None
+
+    async def afind_similar(self, scope: str, embedding) -> Optional[Dict[str, Any]]:
+        """``find_similar`` for async callers; scan and disk reads run on worker threads"""
+        candidates = await asyncio.to_thread(self._ranked, scope, embedding)
+        now = time.time()
+        for key in candidates:
+            response = self._similar_memory_hit(key, now)
+            if response is None:
+                row = await asyncio.to_thread(self._lookup, key)
+                response = self._similar_row_hit(row, now)
+            if response is not None:
+                return response
+        return None
+
+    def _ranked(self, scope: str, embedding) -> List[str]:
+        """Keys of prompts at or above the threshold, most similar first"""
+        if not self.semantic:
+            return []
+        query = normalize(embedding)
+        scored = []
+        # A snapshot, as put() may add vectors while a worker thread scans
+        for index, (key, vector) in enumerate(list(self._vectors.get(scope, ()))):
+            score = sum(map(operator.mul, query, vector))
+            if score >= self.similarity_threshold:
+                scored.append((score, index, key))
+        # Equal scores prefer the newer entry
+        scored.sort(reverse=True)
+        return [key for _, _, key in scored]
+
+    def _similar_memory_hit(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        entry = self._memory.get(key)
+        if entry is not None and not self._expired(entry[0], now):
+            return self._hit("semantic", entry[1])
+        return None
+
+    def _similar_row_hit(self, row: Optional[Tuple[str, float]],
+                         now: float) -> Optional[Dict[str, Any]]:
+        if row is not None and not self._expired(row[1], now):
+            return self._hit("semantic", json.loads(row[0]))
+        return None
+
+    def put(self, key: str, scope: str, response: Dict[str, Any], embedding=None):
+        """Store a response; it reaches the disk tier on the next flush"""
+        now = time.time()
+        vector = normalize(embedding) if embedding is not None and self.semantic else None
+        row = (key, scope, json.dumps(response),
+               vector.tobytes() if vector is not None else None, now, now)
+        self._remember(key, now, response)
+        if vector is not None:
+            self._add_vector(scope, key, vector)
+        self._puts += 1
+        with self._lock:
+            self._pending[key] = row
+            self._touched.pop(key, None)
+            if self._puts % 100 == 0:
+                self._evict_due = True
+            full = len(self._pending) >= self.batch_size
+        if full or self._evict_due:
+            self._wakeup.set()
+
+    def flush(self):
+        """Write buffered entries and access times in one transaction"""
+        with self._db_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                touched, self._touched = self._touched, {}
+            if not pending and not touched:
+                return
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                        list(pending.values()))
+                    self._conn.executemany(
+                        "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                        [(accessed, key) for key, accessed in touched.items()])
+            except sqlite3.Error:
+                # Keep the batch for the next flush; newer puts win
+                with self._lock:
+                    for key, row in pending.items():
+                        self._pending.setdefault(key, row)
+                    for key, accessed in touched.items():
+                        self._touched.setdefault(key, accessed)
+                raise
+
+    def _write_loop(self):
+        while not self._closed.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+                if self._evict_due:
+                    self._evict_due = False
+                    self.evict()
+            except sqlite3.Error as e:
+                logger.error(f"Response cache write failed: {str(e)}")
+
+    def _remember(self, key: str, created_at: float, response: Dict[str, Any]):
+        self._memory[key] = (created_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _add_vector(self, scope: str, key: str, vector: array):
+        self._vectors.setdefault(scope, []).append((key, vector))
+        self._vector_count += 1
+        if self._vector_count > self.max_semantic_entries:
+            # Drop the oldest vector of the largest scope
+            largest = max(self._vectors.values(), key=len)
+            largest.pop(0)
+            self._vector_count -= 1
+
+    def _load_vectors(self):
+        rows = self._conn.execute(
+            "SELECT key, scope, embedding FROM responses WHERE embedding IS NOT NULL "
+            "ORDER BY created_at DESC LIMIT ?", (self.max_semantic_entries,)).fetchall()
+        for key, scope, blob in reversed(rows):
+            vector = array('f')
+            vector.frombytes(blob)
+            self._add_vector(scope, key, vector)
+
+    def evict(self):
+        """Drop expired entries and trim the table to ``max_disk_entries``"""
+        self.flush()
+        with self._db_lock, self._conn:
+            if self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE created_at < ?",
+                                   (time.time() - self.ttl,))
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses "
+                "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)", (self.max_disk_entries,))
+
+    def _hit(self, tier: str, response: Dict[str, Any]) -> Dict[str, Any]:
+        self.stats["hits"] += 1
+        CACHE_HITS_TOTAL.labels(tier=tier).inc()
+        return response
+
+    def miss(self):
+        """Count a request that no tier could answer"""
+        self.stats["misses"] += 1
+        CACHE_MISSES_TOTAL.inc()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "semantic_entries": self._vector_count
+        }
+
+    def clear(self):
+        self._memory.clear()
+        self._vectors.clear()
+        self._vector_count = 0
+        with self._db_lock, self._conn:
+            with self._lock:
+                self._pending.clear()
+                self._touched.clear()
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self):
+        """Write pending entries, stop the writer thread and close the database"""
+        self._closed.set()
+        self._wakeup.set()
+        self._writer.join()
+        self.flush()
+        self._conn.close()
@@ -0,0 +1,242 @@
+import time
+import bisect
+import hashlib
+import itertools
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Iterable, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .openhands_client import OpenHandsEndpoint
+
+
+class CircuitBreaker:
+    """Takes an endpoint out of rotation after repeated failures.
+
+    After ``recovery_timeout`` seconds a single trial request is let through;
+    its outcome either closes the breaker again or re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+
+    def available(self) -> bool:
+        """Whether a request may be routed through this breaker right now"""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            return time.monotonic() - self.opened_at >= self.recovery_timeout
+        return not self.trial_in_flight
+
+    def on_start(self):
+        if self.state == self.OPEN and self.available():
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            self.trial_in_flight = True
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+@dataclass
+class EndpointStats:
+    outstanding: int = 0
+    latency_ewma: Optional[float] = None
+    requests: int = 0
+    failures: int = 0
+
+
+class SchedulingPolicy:
+    """Chooses one endpoint out of the currently available candidates"""
+
+    def select(self, candidates: list['OpenHandsEndpoint'],
+               stats: Dict[str, EndpointStats],
+               key: Optional[str] = None) -> 'OpenHandsEndpoint':
+        raise NotImplementedError
+
+
+class RoundRobinPolicy(SchedulingPolicy):
+    def __init__(self):
+        self._counter = itertools.count()
+
+    def select(self, candidates, stats, key=None):
+        return candidates[next(self._counter) % len(candidates)]
+
+
+class LeastOutstandingPolicy(SchedulingPolicy):
+    def select(self, candidates, stats, key=None):
+        return min(candidates, key=lambda e: stats[e.name].outstanding)
+
+
+class LatencyWeightedPolicy(SchedulingPolicy):
+    """Prefers endpoints with the lowest expected wait.
+
+    The expected wait is the EWMA response time scaled by the queue depth;
+    endpoints without samples yet are tried first so they get measured.
+    """
+
+    def select(self, candidates, stats, key=None):
+        def expected_wait(endpoint):
+            s = stats[endpoint.name]
+            if s.latency_ewma is None:
+                return (0, s.outstanding)
+            return (1, s.latency_ewma * (s.outstanding + 1))
+        return min(candidates, key=expected_wait)
+
+
+class ConsistentHashPolicy(SchedulingPolicy):
+    """Pins a task key to the same endpoint while the endpoint set is stable"""
+
+    def __init__(self, replicas: int = 100):
+        self.replicas = replicas
+        self._ring_names: tuple = ()
+        self._ring: list[tuple[int, str]] = []
+        self._hashes: list[int] = []
+        self._fallback = RoundRobinPolicy()
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.md5(value.encode('utf-8')).digest()[:8], 'big')
+
+    def _build_ring(self, names: Iterable[str]):
+        names = tuple(sorted(names))
+        if names == self._ring_names:
+            return
+        self._ring = sorted(
+            (self._hash(f"{name}#{i}"), name)
+            for name in names for i in range(self.replicas)
+        )
+        self._hashes = [h for h, _ in self._ring]
+        self._ring_names = names
+
+    def select(self, candidates, stats, key=None):
+        if key is None:
+            return self._fallback.select(candidates, stats)
+        # The ring covers every known endpoint so that a tripped breaker only
+        # moves that endpoint's keys, not everybody else's
+        self._build_ring(stats.keys())
+        by_name = {e.name: e for e in candidates}
+        start = bisect.bisect(self._hashes, self._hash(key))
+        for i in range(len(self._ring)):
+            name = self._ring[(start + i) % len(self._ring)][1]
+            if name in by_name:
+                return by_name[name]
+        return self._fallback.select(candidates, stats)
+
+
+class EndpointScheduler:
+    """Balances requests across endpoints with a pluggable policy"""
+
+    POLICIES = {
+        "round_robin": RoundRobinPolicy,
+        "least_outstanding": LeastOutstandingPolicy,
+        "latency_weighted": LatencyWeightedPolicy,
+        "consistent_hash": ConsistentHashPolicy
+    }
+
+    def __init__(self, policy: str = "round_robin", failure_threshold: int = 5,
+                 recovery_timeout: float = 30, ewma_alpha: float = 0.2):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown scheduling policy: {policy}")
+        self.policy = self.POLICIES[policy]()
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.ewma_alpha = ewma_alpha
+        self.stats: Dict[str, EndpointStats] = {}
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'EndpointScheduler':
+        return cls(
+            policy=config.get('policy', 'round_robin'),
+            failure_threshold=config.get('failure_threshold', 5),
+            recovery_timeout=config.get('recovery_timeout', 30),
+            ewma_alpha=config.get('ewma_alpha', 0.2)
+        )
+
+    def _track(self, endpoint: 'OpenHandsEndpoint'):
+        if endpoint.name not in self.stats:
+            self.stats[endpoint.name] = EndpointStats()
+            self.breakers[endpoint.name] = CircuitBreaker(
+                self.failure_threshold, self.recovery_timeout
+            )
+
+    def select(self, endpoints: list['OpenHandsEndpoint'], key: Optional[str] = None,
+               exclude: Iterable[str] = ()) -> 'OpenHandsEndpoint':
+        """Pick an endpoint for the next request"""
+        for endpoint in endpoints:
+            self._track(endpoint)
+        exclude = set(exclude)
+        candidates = [
+            e for e in endpoints
+            if e.active and e.name not in exclude and self.breakers[e.name].available()
+        ]
+        if not candidates:
+            raise ConnectionError("No available OpenHands endpoints")
+        return self.policy.select(candidates, self.stats, key)
+
+    def on_start(self, endpoint: 'OpenHandsEndpoint'):
+        self._track(endpoint)
+        self.stats[endpoint.name].outstanding += 1
+        self.breakers[endpoint.name].on_start()
+
+    def on_success(self, endpoint: 'OpenHandsEndpoint', latency: float):
+        self._track(endpoint)
+        stats = self.stats[endpoint.name]
+        stats.outstanding = max(0, stats.outstanding - 1)
+        stats.requests += 1
+        if stats.latency_ewma is None:
+            stats.latency_ewma = latency
+        else:
+            stats.latency_ewma += self.ewma_alpha * (latency - stats.latency_ewma)
+        self.breakers[endpoint.name].record_success()
+
+    def on_cancel(self, endpoint: 'OpenHandsEndpoint'):
+        """Release a request that was cancelled without an outcome"""
+        self._track(endpoint)
+        stats = self.stats[endpoint.name]
+        stats.outstanding = max(0, stats.outstanding - 1)
+        self.breakers[endpoint.name].trial_in_flight = False
+
+    def on_failure(self, endpoint: 'OpenHandsEndpoint'):
+        self._track(endpoint)
+        stats = self.stats[endpoint.name]
+        stats.outstanding = max(0, stats.outstanding - 1)
+        stats.requests += 1
+        stats.failures += 1
+        self.breakers[endpoint.name].record_failure()
+
+    def forget(self, endpoint_name: str):
+        """Drop tracking state for a removed endpoint"""
+        self.stats.pop(endpoint_name, None)
+        self.breakers.pop(endpoint_name, None)
+
+    def get_state(self) -> Dict[str, Dict[str, Any]]:
+        """Snapshot of per-endpoint load, latency and breaker state"""
+        return {
+            name: {
+                "outstanding": stats.outstanding,
+                "latency_ewma": stats.latency_ewma,
+                "requests": stats.requests,
+                "failures": stats.failures,
+                "breaker": self.breakers[name].state
+            }
+            for name, stats in self.stats.items()
+        }
@@ -0,0 +1,116 @@
+import math
+import time
+from array import array
+from typing import Dict, Optional
+
+
+class LatencyHistogram:
+    """Fixed-memory log-bucketed histogram for streaming quantiles.
+
+    Buckets grow geometrically by ``1 + 2 * relative_error`` between
+    ``min_value`` and ``max_value``, so any quantile is reported within
+    ``relative_error`` of the true value using a constant number of counters
+    however many samples are recorded (the HDR histogram approach).
+    """
+
+    __slots__ = ("min_value", "max_value", "_log_base", "_counts",
+                 "count", "total", "min", "max")
+
+    def __init__(self, min_value: float = 1e-4, max_value: float = 3600.0,
+                 relative_error: float = 0.02):
+        self.min_value = min_value
+        self.max_value = max_value
+        self._log_base = math.log1p(2 * relative_error)
+        buckets = int(math.log(max_value / min_value) / self._log_base) + 2
+        self._counts = array('Q', bytes(8 * buckets))
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def _index(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        index = int(math.log(value / self.min_value) / self._log_base) + 1
+        return min(index, len(self._counts) - 1)
+
+    def _bucket_value(self, index: int) -> float:
+        if index == 0:
+            return self.min_value
+        # Midpoint (geometric) of the bucket's range
+        return self.min_value * math.exp((index - 0.5) * self._log_base)
+
+    def record(self, value: float):
+        self._counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Value at quantile ``q`` (0..1), or None if nothing was recorded"""
+        if self.count == 0:
+            return None
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index, bucket_count in enumerate(self._counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(max(self._bucket_value(index), self.min), self.max)
+        return self.max
+
+    def merge(self, other: 'LatencyHistogram'):
+        """Add another histogram with the same bucket layout into this one"""
+        for index, bucket_count in enumerate(other._counts):
+            if bucket_count:
+                self._counts[index] += bucket_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "max": self.max if self.count else None
+        }
+
+
+class SlidingWindowRate:
+    """Events per second over the last ``window`` seconds.
+
+    Counts are kept in a ring of ``window / resolution`` slots, so memory
+    is fixed and old slots are reused rather than expired one by one.
+    """
+
+    __slots__ = ("window", "resolution", "_slots", "_stamps")
+
+    def __init__(self, window: float = 60.0, resolution: float = 1.0):
+        self.window = window
+        self.resolution = resolution
+        size = max(1, int(window / resolution))
+        self._slots = [0.0] * size
+        self._stamps = [-1] * size
+
+    def add(self, amount: float = 1.0, now: Optional[float] = None):
+        tick = int((time.monotonic() if now is None else now) / self.resolution)
+        slot = tick % len(self._slots)
+        if self._stamps[slot] != tick:
+            self._stamps[slot] = tick
+            self._slots[slot] = 0.0
+        self._slots[slot] += amount
+
+    def rate(self, now: Optional[float] = None) -> float:
+        tick = int((time.monotonic() if now is None else now) / self.resolution)
+        oldest = tick - len(self._slots) + 1
+        total = sum(
+            amount for amount, stamp in zip(self._slots, self._stamps)
+            if stamp >= oldest
+        )
+        return total / self.window
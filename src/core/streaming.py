@@ -0,0 +1,75 @@
+import re
+import json
+import codecs
+from typing import Any, Union
+
+# Characters that can change nesting or string state
+_TOKENS = re.compile(r'[{}\[\]"\\]')
+
+
+class IncrementalJSONDecoder:
+    """Splits a stream of text or byte chunks into complete JSON values.
+
+    Values may be concatenated, newline-delimited or split across chunks at
+    any point. Each byte is scanned once, so a large value arriving in many
+    small frames is not re-parsed on every frame. Only objects and arrays are
+    recognised at the top level.
+    """
+
+    def __init__(self, max_buffer: int = 1 << 20):
+        self.max_buffer = max_buffer
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ""
+        self._scanned = 0
+        self._depth = 0
+        self._in_string = False
+
+    @property
+    def pending(self) -> int:
+        """Number of buffered characters not yet part of a complete value"""
+        return len(self._buffer)
+
+    def feed(self, chunk: Union[str, bytes]) -> list[Any]:
+        """Add a chunk and return every value it completes"""
+        if isinstance(chunk, bytes):
+            chunk = self._utf8.decode(chunk)
+        buffer = self._buffer + chunk
+        values = []
+        start = 0
+        pos = self._scanned
+        while True:
+            match = _TOKENS.search(buffer, pos)
+            if match is None:
+                break
+            i = match.start()
+            char = buffer[i]
+            if self._in_string:
+                if char == '\\':
+                    # Skip the escaped character, even if it has not arrived yet
+                    pos = i + 2
+                    continue
+                if char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth < 0:
+                    raise ValueError("Malformed JSON stream: unbalanced brackets")
+                if self._depth == 0:
+                    values.append(json.loads(buffer[start:i + 1]))
+                    start = i + 1
+            pos = i + 1
+
+        self._buffer = buffer[start:]
+        self._scanned = max(pos, len(buffer)) - start
+        if self._depth == 0 and not self._in_string and not self._buffer.strip():
+            self._buffer = ""
+            self._scanned = 0
+        if len(self._buffer) > self.max_buffer:
+            raise ValueError(
+                f"Streamed JSON value exceeds buffer limit of {self.max_buffer} characters"
+            )
+        return values
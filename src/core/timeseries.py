@@ -0,0 +1,147 @@
+import time
+import bisect
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+from .scheduler import CircuitBreaker
+
+if TYPE_CHECKING:
+    from monitor import Monitor
+    from .openhands_client import OpenHandsClient
+    from .litellm_manager import LLMMetricsCollector
+
+
+class RingBuffer:
+    """Fixed-size (time, value) series; once full the oldest point is overwritten"""
+
+    __slots__ = ("capacity", "_times", "_values", "_start", "_size")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._times = array('d', bytes(8 * capacity))
+        self._values = array('d', bytes(8 * capacity))
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, t: float, value: float):
+        end = (self._start + self._size) % self.capacity
+        self._times[end] = t
+        self._values[end] = value
+        if self._size < self.capacity:
+            self._size += 1
+        else:
+            self._start = (self._start + 1) % self.capacity
+
+    def _ordered(self, data: array) -> array:
+        end = self._start + self._size
+        if end <= self.capacity:
+            return data[self._start:end]
+        return data[self._start:] + data[:end - self.capacity]
+
+    def points(self, since: Optional[float] = None) -> Tuple[array, array]:
+        """Times and values, oldest first, optionally only from ``since`` on"""
+        times, values = self._ordered(self._times), self._ordered(self._values)
+        if since is not None:
+            first = bisect.bisect_left(times, since)
+            times, values = times[first:], values[first:]
+        return times, values
+
+
+def decimate_minmax(times: Sequence[float], values: Sequence[float],
+                    buckets: int) -> Tuple[List[float], List[float]]:
+    """Reduce a series to at most ``2 * buckets`` points.
+
+    Each bucket keeps its minimum and maximum in time order, so spikes
+    survive however many samples are folded into one pixel column.
+    """
+    n = len(times)
+    if n <= 2 * buckets:
+        return list(times), list(values)
+    out_times: List[float] = []
+    out_values: List[float] = []
+    for bucket in range(buckets):
+        low, high = bucket * n // buckets, (bucket + 1) * n // buckets
+        if low == high:
+            continue
+        chunk = values[low:high]
+        smallest, largest = min(chunk), max(chunk)
+        first, second = low + chunk.index(smallest), low + chunk.index(largest)
+        if first > second:
+            first, second = second, first
+        out_times.append(times[first])
+        out_values.append(values[first])
+        if second != first:
+            out_times.append(times[second])
+            out_values.append(values[second])
+    return out_times, out_values
+
+
+class MetricsSampler:
+    """Samples the controller's metrics into ring buffers for the dashboard.
+
+    Each ``sample`` appends one point per series: overall task throughput,
+    latency percentiles of the tasks finished since the previous sample,
+    token and cost rates per model, and a health score per endpoint
+    (1 healthy, 0.5 on trial after failures, 0 out of rotation).
+    """
+
+    CHARTS = ("throughput", "latency", "tokens", "cost", "health")
+    HEALTH = {CircuitBreaker.CLOSED: 1.0, CircuitBreaker.HALF_OPEN: 0.5, CircuitBreaker.OPEN: 0.0}
+
+    def __init__(self, monitor: Optional['Monitor'] = None,
+                 llm_metrics: Optional['LLMMetricsCollector'] = None,
+                 client: Optional['OpenHandsClient'] = None,
+                 capacity: int = 3600):
+        self.monitor = monitor
+        self.llm_metrics = llm_metrics
+        self.client = client
+        self.capacity = capacity
+        self.series: Dict[str, Dict[str, RingBuffer]] = {chart: {} for chart in self.CHARTS}
+        self._last_time: Optional[float] = None
+        self._last_usage: Dict[str, Tuple[int, float]] = {}
+
+    def set_capacity(self, capacity: int):
+        """Change how many points each series keeps, resizing existing buffers"""
+        self.capacity = capacity
+        for series in self.series.values():
+            for name, old in series.items():
+                buffer = series[name] = RingBuffer(capacity)
+                for t, value in zip(*old.points()):
+                    buffer.append(t, value)
+
+    def _append(self, chart: str, name: str, t: float, value: float):
+        buffer = self.series[chart].get(name)
+        if buffer is None:
+            buffer = self.series[chart][name] = RingBuffer(self.capacity)
+        buffer.append(t, value)
+
+    def sample(self, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        if self.monitor is not None:
+            self._append("throughput", "tasks/s", now, self.monitor.total_throughput.rate(now))
+            latency = self.monitor.take_recent_latency()
+            if latency.count:
+                for name, q in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+                    self._append("latency", name, now, latency.quantile(q))
+
+        if self.llm_metrics is not None:
+            elapsed = now - self._last_time if self._last_time is not None else None
+            for model, metrics in list(self.llm_metrics.models.items()):
+                with metrics.lock:
+                    usage = (metrics.tokens, metrics.cost)
+                previous = self._last_usage.get(model)
+                self._last_usage[model] = usage
+                if previous is not None and elapsed:
+                    self._append("tokens", model, now, (usage[0] - previous[0]) / elapsed)
+                    self._append("cost", model, now, (usage[1] - previous[1]) / elapsed)
+
+        if self.client is not None:
+            state = self.client.scheduler.get_state()
+            for endpoint in self.client.endpoints:
+                breaker = state.get(endpoint.name, {}).get("breaker", CircuitBreaker.CLOSED)
+                health = self.HEALTH[breaker] if endpoint.active else 0.0
+                self._append("health", endpoint.name, now, health)
+
+        self._last_time = now
@@ -0,0 +1,231 @@
+import os
+import json
+import asyncio
+import tempfile
+import itertools
+from string import Template
+from pathlib import Path
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, Optional, List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from task_queue import TaskQueue
+    from .agent_manager import AgentManager
+
+
+@dataclass
+class WorkflowNode:
+    """One step of a workflow, run by ``agent``.
+
+    ``input`` may refer to a parent's output as ``$parent_name``. ``cost`` is
+    the expected duration relative to other nodes and only affects ordering.
+    """
+    name: str
+    agent: str
+    input: str
+    depends_on: List[str] = field(default_factory=list)
+    cost: float = 1.0
+    retries: int = 2
+    status: str = "pending"
+    attempts: int = 0
+    output: Any = None
+    error: Optional[str] = None
+
+
+class Workflow:
+    """A directive as a dependency graph of agent runs"""
+
+    def __init__(self, name: str, nodes: Optional[List[WorkflowNode]] = None):
+        self.name = name
+        self.nodes: Dict[str, WorkflowNode] = {}
+        for node in nodes or []:
+            self.add(node)
+
+    def add(self, node: WorkflowNode) -> WorkflowNode:
+        if node.name in self.nodes:
+            raise ValueError(f"Duplicate workflow node {node.name}")
+        self.nodes[node.name] = node
+        return node
+
+    def children(self) -> Dict[str, List[str]]:
+        children = {name: [] for name in self.nodes}
+        for node in self.nodes.values():
+            for parent in node.depends_on:
+                if parent not in self.nodes:
+                    raise ValueError(f"Node {node.name} depends on unknown node {parent}")
+                children[parent].append(node.name)
+        return children
+
+    def topological_order(self) -> List[str]:
+        """Node names with every node after its parents; raises on cycles"""
+        children = self.children()
+        waiting = {name: len(node.depends_on) for name, node in self.nodes.items()}
+        ready = [name for name, count in waiting.items() if count == 0]
+        order = []
+        while ready:
+            name = ready.pop()
+            order.append(name)
+            for child in children[name]:
+                waiting[child] -= 1
+                if waiting[child] == 0:
+                    ready.append(child)
+        if len(order) != len(self.nodes):
+            raise ValueError(f"Workflow {self.name} has a dependency cycle")
+        return order
+
+    def critical_path(self) -> Dict[str, float]:
+        """Cost of the longest chain from each node to the end of the workflow"""
+        children = self.children()
+        lengths: Dict[str, float] = {}
+        for name in reversed(self.topological_order()):
+            tail = max((lengths[child] for child in children[name]), default=0.0)
+            lengths[name] = self.nodes[name].cost + tail
+        return lengths
+
+    def ready(self) -> List[WorkflowNode]:
+        """Pending nodes whose parents have all completed"""
+        return [
+            node for node in self.nodes.values()
+            if node.status == "pending"
+            and all(self.nodes[p].status == "completed" for p in node.depends_on)
+        ]
+
+    @property
+    def finished(self) -> bool:
+        return all(node.status == "completed" for node in self.nodes.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "nodes": [asdict(node) for node in self.nodes.values()]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Workflow':
+        return cls(data["name"], [WorkflowNode(**node) for node in data["nodes"]])
+
+    def save(self, path: str):
+        """Write a checkpoint atomically, so a crash never leaves half a file"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.to_dict(), f, indent=2, default=str)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> 'Workflow':
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+class WorkflowExecutor:
+    """Runs a ``Workflow`` through a ``TaskQueue`` and an ``AgentManager``.
+
+    Nodes are queued as soon as their parents complete, prioritised by their
+    critical path, so the longest remaining chain always starts first. Up to
+    ``max_parallel`` nodes run at once. A failed node is retried on its own
+    up to its ``retries`` and, if it still fails, only its descendants are
+    held back. With ``checkpoint_path`` the workflow is saved after every
+    node, and running a loaded checkpoint skips completed nodes.
+
+    ``task_queue`` should belong to the executor; a queue shared with the
+    dispatcher would let it take workflow nodes. Each run tags its tasks and
+    puts back any it takes that belong to another run.
+    """
+
+    def __init__(self, agent_manager: 'AgentManager', task_queue: Optional['TaskQueue'] = None,
+                 max_parallel: int = 8, timeout: Optional[float] = None,
+                 checkpoint_path: Optional[str] = None):
+        self.agent_manager = agent_manager
+        if task_queue is None:
+            from task_queue import TaskQueue
+            task_queue = TaskQueue()
+        self.task_queue = task_queue
+        self.max_parallel = max_parallel
+        self.timeout = timeout
+        self.checkpoint_path = checkpoint_path
+        self._runs = itertools.count()
+
+    @staticmethod
+    def priorities(workflow: Workflow) -> Dict[str, int]:
+        """Critical-path lengths as integer ranks, longest chain highest"""
+        lengths = workflow.critical_path()
+        ranks = {length: rank for rank, length in enumerate(sorted(set(lengths.values())), 1)}
+        return {name: ranks[length] for name, length in lengths.items()}
+
+    async def run(self, workflow: Workflow) -> Workflow:
+        """Run every unfinished node; check ``workflow.finished`` afterwards"""
+        priorities = self.priorities(workflow)
+        run_id = f"{id(self):x}-{next(self._runs)}"
+        for node in workflow.nodes.values():
+            if node.status != "completed":
+                node.status, node.attempts, node.error = "pending", 0, None
+
+        queued = set()
+        running: Dict[asyncio.Task, tuple] = {}
+
+        def enqueue_ready():
+            for node in workflow.ready():
+                if node.name not in queued:
+                    queued.add(node.name)
+                    self.task_queue.add_task({"workflow": workflow.name, "run": run_id,
+                                              "node": node.name, "agent": node.agent},
+                                             priorities[node.name])
+
+        enqueue_ready()
+        try:
+            while True:
+                foreign = []
+                while len(running) < self.max_parallel:
+                    task = self.task_queue.get_next_task()
+                    if task is None:
+                        break
+                    if task["task"].get("run") != run_id:
+                        foreign.append(task)
+                        continue
+                    node = workflow.nodes[task["task"]["node"]]
+                    node.status = "running"
+                    node.attempts += 1
+                    execution = asyncio.create_task(self._run_node(workflow, node))
+                    running[execution] = (task["id"], node)
+                for task in foreign:
+                    self.task_queue.requeue(task)
+                if not running:
+                    break
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for execution in done:
+                    task_id, node = running.pop(execution)
+                    queued.discard(node.name)
+                    error = execution.exception()
+                    if error is None:
+                        node.status, node.output, node.error = "completed", execution.result(), None
+                        self.task_queue.complete_task(task_id, {"output": node.output})
+                    else:
+                        node.error = str(error) or type(error).__name__
+                        node.status = "pending" if node.attempts <= node.retries else "failed"
+                        self.task_queue.fail_task(task_id, node.error)
+                enqueue_ready()
+                self._checkpoint(workflow)
+        finally:
+            for execution, (_, node) in running.items():
+                execution.cancel()
+                node.status = "pending"
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+                self._checkpoint(workflow)
+        return workflow
+
+    async def _run_node(self, workflow: Workflow, node: WorkflowNode) -> Any:
+        outputs = {p: str(workflow.nodes[p].output) for p in node.depends_on}
+        prompt = Template(node.input).safe_substitute(outputs)
+        async with asyncio.timeout(self.timeout):
+            result = await self.agent_manager.run_agent(node.agent, prompt)
+        # Runner results carry the agent's answer in final_output
+        return getattr(result, 'final_output', result)
+
+    def _checkpoint(self, workflow: Workflow):
+        if self.checkpoint_path is not None:
+            workflow.save(self.checkpoint_path)
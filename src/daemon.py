@@ -0,0 +1,504 @@
+import hmac
+import json
+import signal
+import asyncio
+import ipaddress
+import contextlib
+from dataclasses import dataclass
+from types import SimpleNamespace
+from urllib.parse import quote, unquote, urlsplit
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+
+# Only the standard library is imported here so the GUI can use DaemonClient
+# without loading the LLM stack; Daemon imports the controller lazily.
+
+if TYPE_CHECKING:
+    from core.config_manager import ConfigManager
+    from core.agent_manager import AgentManager
+
+DEFAULT_ADDRESS = "127.0.0.1:8765"
+
+
+def parse_address(address: str) -> Tuple[str, Any]:
+    """``unix:/path/to.sock`` or ``host:port`` as ('unix', path) or ('tcp', (host, port))"""
+    if address.startswith('unix:'):
+        return 'unix', address[5:]
+    host, _, port = address.rpartition(':')
+    if not host or not port.isdigit():
+        raise ValueError(f"Invalid daemon address: {address}")
+    return 'tcp', (host.strip('[]'), int(port))
+
+
+def is_loopback(host: str) -> bool:
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class DaemonError(Exception):
+    """An error response from the control API"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+Handler = Callable[..., Awaitable[Any]]
+
+
+class ControlServer:
+    """Minimal HTTP/1.1 JSON API served over TCP or a Unix socket.
+
+    Routes are registered as ``route("GET", "/tasks/{id}", handler)``; the
+    handler gets the decoded JSON body (or None) followed by the path
+    parameters, and its return value is sent back as JSON. Raising
+    DaemonError sets the response status. With a ``token`` every request
+    needs an ``Authorization: Bearer <token>`` header; without one only Unix
+    sockets and loopback addresses are served. Connections idle for
+    ``idle_timeout`` seconds between or during requests are closed.
+    """
+
+    REASONS = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+               405: "Method Not Allowed", 413: "Payload Too Large",
+               500: "Internal Server Error", 503: "Service Unavailable"}
+
+    def __init__(self, token: str = "", max_body: int = 64 * 1024 * 1024,
+                 idle_timeout: float = 60):
+        self.token = token
+        self.max_body = max_body
+        self.idle_timeout = idle_timeout
+        self.routes: List[Tuple[str, List[str], Handler]] = []
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    def route(self, method: str, path: str, handler: Handler):
+        self.routes.append((method, path.strip('/').split('/'), handler))
+
+    async def start(self, address: str):
+        kind, target = parse_address(address)
+        if kind == 'unix':
+            self.server = await asyncio.start_unix_server(self._handle, target)
+        else:
+            if not self.token and not is_loopback(target[0]):
+                raise ValueError(f"Refusing to serve {address} without daemon.token")
+            self.server = await asyncio.start_server(self._handle, *target)
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    def _match(self, method: str, path: str) -> Tuple[Handler, List[str]]:
+        parts = path.strip('/').split('/')
+        wrong_method = False
+        for route_method, pattern, handler in self.routes:
+            if len(pattern) != len(parts):
+                continue
+            params = []
+            for expected, actual in zip(pattern, parts):
+                if expected.startswith('{'):
+                    params.append(unquote(actual))
+                elif expected != actual:
+                    break
+            else:
+                if route_method == method:
+                    return handler, params
+                wrong_method = True
+        raise DaemonError(405 if wrong_method else 404, f"No route for {method} {path}")
+
+    async def _dispatch(self, method: str, target: str, headers: Dict[str, str],
+                        body: bytes) -> Tuple[int, Any]:
+        try:
+            if self.token and not hmac.compare_digest(
+                    headers.get('authorization', '').encode('utf-8'),
+                    f"Bearer {self.token}".encode('utf-8')):
+                raise DaemonError(401, "Missing or wrong token")
+            handler, params = self._match(method, urlsplit(target).path)
+            try:
+                payload = json.loads(body) if body else None
+            except ValueError as e:
+                raise DaemonError(400, f"Invalid JSON: {e}")
+            return 200, await handler(payload, *params)
+        except DaemonError as e:
+            return e.status, {"error": str(e)}
+        except Exception as e:
+            from loguru import logger
+            logger.exception(f"Control API {method} {target} failed")
+            return 500, {"error": str(e)}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    async with asyncio.timeout(self.idle_timeout):
+                        request = await self._read_request(reader)
+                except DaemonError as e:
+                    self._respond(writer, e.status, {"error": str(e)}, False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, target, version, headers, body = request
+                status, result = await self._dispatch(method, target, headers, body)
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                self._respond(writer, status, result, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, TimeoutError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader
+                            ) -> Optional[Tuple[str, str, str, Dict[str, str], bytes]]:
+        """One request, or None once the client is done; bad input raises DaemonError"""
+        try:
+            request_line = await reader.readline()
+            if not request_line.strip():
+                return None
+            try:
+                method, target, version = request_line.decode('latin-1').split()
+            except ValueError:
+                raise DaemonError(400, "Malformed request line")
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+        except (ValueError, asyncio.LimitOverrunError):
+            # readline() raises ValueError for lines past the stream limit
+            raise DaemonError(400, "Request line or header too long")
+        try:
+            length = int(headers.get('content-length') or 0)
+        except ValueError:
+            raise DaemonError(400, "Invalid Content-Length")
+        if length < 0:
+            raise DaemonError(400, "Invalid Content-Length")
+        if length > self.max_body:
+            raise DaemonError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b''
+        return method, target, version, headers, body
+
+    def _respond(self, writer: asyncio.StreamWriter, status: int, result: Any, keep_alive: bool):
+        body = json.dumps(result, separators=(',', ':'), default=str).encode('utf-8')
+        head = (f"HTTP/1.1 {status} {self.REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+
+
+class Daemon:
+    """Headless controller: agents, task dispatch, monitoring and the control API.
+
+    Runs the AgentManager (which also starts the Prometheus exporter), a
+    TaskDispatcher over a persistent TaskQueue, and a Monitor, and serves
+    them through a ControlServer on ``daemon.address``. Nothing here imports
+    PySide6. Endpoint changes in config.json are applied while running.
+    """
+
+    def __init__(self, config: 'ConfigManager',
+                 agent_manager_factory: Callable[[], 'AgentManager'],
+                 address: Optional[str] = None):
+        self.config = config
+        self.agent_manager_factory = agent_manager_factory
+        self.address = address or config.get('daemon.address', DEFAULT_ADDRESS)
+        self.server = ControlServer(config.get('daemon.token', ''),
+                                    config.get('daemon.max_body', 64 * 1024 * 1024),
+                                    config.get('daemon.idle_timeout', 60))
+        self.agent_manager: Optional['AgentManager'] = None
+        self.monitor = None
+        self.store = None
+        self.task_queue = None
+        self.client = None
+        self.dispatcher = None
+        self._unsubscribe: List[Callable[[], None]] = []
+        self._stopping: Optional[asyncio.Event] = None
+        self._setup_routes()
+
+    def _setup_routes(self):
+        route = self.server.route
+        route("GET", "/status", self.status)
+        route("GET", "/agents", self.list_agents)
+        route("DELETE", "/agents/{name}", self.remove_agent)
+        route("POST", "/runs", self.run_agents)
+        route("POST", "/tasks", self.submit_tasks)
+        route("GET", "/tasks/{id}", self.task_status)
+
+    async def start(self):
+        from monitor import Monitor
+        from task_store import TaskStore
+        from task_queue import TaskQueue
+        from core.openhands_client import OpenHandsClient
+        from core.dispatcher import TaskDispatcher
+
+        self.monitor = Monitor()
+        self.store = TaskStore(self.config.get('daemon.task_store', 'data/tasks.db'))
+        self.task_queue = TaskQueue(self.store)
+        resumed = self.task_queue.resume()
+        self.client = OpenHandsClient(self.config.get('openhands', {}))
+        self.dispatcher = TaskDispatcher.from_config(
+            self.client, self.task_queue, self.config.get('openhands.dispatcher', {}),
+            monitor=self.monitor)
+        self._unsubscribe.append(self.config.subscribe(
+            'openhands.endpoints', self.dispatcher.apply_endpoints, loop=asyncio.get_running_loop()))
+
+        self.agent_manager = await asyncio.to_thread(self.agent_manager_factory)
+        await self.dispatcher.start()
+        await self.server.start(self.address)
+        self.config.watch()
+
+        from loguru import logger
+        logger.info(f"Daemon listening on {self.address}; resumed {resumed} queued tasks")
+
+    async def stop(self):
+        """Stop taking requests, let queued tasks finish, then release everything"""
+        await self.server.close()
+        self.config.unwatch()
+        for unsubscribe in self._unsubscribe:
+            unsubscribe()
+        self._unsubscribe = []
+        if self.dispatcher is not None:
+            try:
+                await self.dispatcher.drain(self.config.get('daemon.drain_timeout', 30))
+            except asyncio.TimeoutError:
+                pass
+        if self.client is not None:
+            await self.client.close()
+        if self.monitor is not None:
+            self.monitor.close()
+        if self.store is not None:
+            self.store.close()
+
+    async def run(self):
+        """Serve until SIGINT or SIGTERM"""
+        self._stopping = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self._stopping.set)
+            except NotImplementedError:
+                pass
+        try:
+            await self.start()
+            await self._stopping.wait()
+        finally:
+            await self.stop()
+
+    def shutdown(self):
+        if self._stopping is not None:
+            self._stopping.set()
+
+    async def status(self, _payload) -> Dict[str, Any]:
+        return {
+            "address": self.address,
+            "agents": len(self.agent_manager.agents),
+            "queued": self.task_queue.queue.qsize(),
+            "dispatching": self.dispatcher.running,
+            "endpoints": self.client.scheduler.get_state(),
+            "monitor": self.monitor.get_status()
+        }
+
+    async def list_agents(self, _payload) -> List[Dict[str, Any]]:
+        return [{"name": name, "model": str(agent.model)}
+                for name, agent in self.agent_manager.agents.items()]
+
+    async def remove_agent(self, _payload, name: str) -> Dict[str, Any]:
+        if name not in self.agent_manager.agents:
+            raise DaemonError(404, f"Agent {name} not found")
+        self.agent_manager.remove_agent(name)
+        return {"removed": name}
+
+    @staticmethod
+    def _body(payload) -> Dict[str, Any]:
+        if not isinstance(payload, dict):
+            raise DaemonError(400, "Expected a JSON object")
+        return payload
+
+    async def run_agents(self, payload) -> List[Dict[str, Any]]:
+        """Body: {"jobs": [[agent, input], ...], "timeout": seconds}"""
+        jobs = self._body(payload).get("jobs")
+        if not isinstance(jobs, list) or not all(isinstance(j, list) and len(j) == 2 for j in jobs):
+            raise DaemonError(400, "Expected jobs: [[agent, input], ...]")
+        timeout = payload.get("timeout")
+        if timeout is not None and (isinstance(timeout, bool) or not isinstance(timeout, (int, float))):
+            raise DaemonError(400, "Expected timeout in seconds")
+        try:
+            runs = self.agent_manager.run_many([tuple(j) for j in jobs], timeout=timeout)
+            async with contextlib.aclosing(runs):
+                results = [result async for result in runs]
+        except ValueError as e:
+            raise DaemonError(404, str(e))
+        return [{
+            "agent": r.agent,
+            "input": r.input,
+            "output": getattr(r.output, 'final_output', r.output),
+            "error": None if r.ok else f"{type(r.error).__name__}: {r.error}",
+            "elapsed": r.elapsed
+        } for r in results]
+
+    async def submit_tasks(self, payload) -> Dict[str, Any]:
+        """Body: {"tasks": [{...}, ...], "priority": 1}"""
+        tasks = self._body(payload).get("tasks")
+        if not isinstance(tasks, list) or not all(isinstance(t, dict) for t in tasks):
+            raise DaemonError(400, "Expected tasks: [{...}, ...]")
+        priority = payload.get("priority", 1)
+        if isinstance(priority, bool) or not isinstance(priority, int):
+            raise DaemonError(400, "Expected an integer priority")
+        try:
+            task_ids = await self.dispatcher.submit_many(tasks, priority)
+        except RuntimeError as e:
+            raise DaemonError(503, str(e))
+        return {"ids": task_ids}
+
+    async def task_status(self, _payload, task_id: str) -> Dict[str, Any]:
+        status = self.task_queue.get_status(task_id)
+        if status is None:
+            raise DaemonError(404, f"Task {task_id} not found")
+        return status
+
+
+class DaemonClient:
+    """Client for a running daemon's control API; one connection per request"""
+
+    def __init__(self, address: str = DEFAULT_ADDRESS, token: str = "",
+                 timeout: Optional[float] = None):
+        self.address = address
+        self.token = token
+        self.timeout = timeout
+
+    async def request(self, method: str, path: str, payload: Any = None) -> Any:
+        async with asyncio.timeout(self.timeout):
+            return await self._request(method, path, payload)
+
+    async def _request(self, method: str, path: str, payload: Any) -> Any:
+        kind, target = parse_address(self.address)
+        if kind == 'unix':
+            reader, writer = await asyncio.open_unix_connection(target)
+        else:
+            reader, writer = await asyncio.open_connection(*target)
+        try:
+            body = json.dumps(payload, separators=(',', ':')).encode('utf-8') if payload is not None else b''
+            head = (f"{method} {path} HTTP/1.1\r\n"
+                    f"Host: swarm-directive\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: close\r\n")
+            if self.token:
+                head += f"Authorization: Bearer {self.token}\r\n"
+            writer.write((head + "\r\n").encode('latin-1') + body)
+            await writer.drain()
+
+            status = int((await reader.readline()).split()[1])
+            length = None
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.strip().lower() == 'content-length':
+                    length = int(value)
+            data = await (reader.readexactly(length) if length is not None else reader.read())
+        finally:
+            writer.close()
+        result = json.loads(data) if data else None
+        if status >= 400:
+            raise DaemonError(status, (result or {}).get("error", f"HTTP {status}"))
+        return result
+
+    async def status(self) -> Dict[str, Any]:
+        return await self.request("GET", "/status")
+
+    async def agents(self) -> List[Dict[str, Any]]:
+        return await self.request("GET", "/agents")
+
+    async def remove_agent(self, name: str) -> Dict[str, Any]:
+        return await self.request("DELETE", f"/agents/{quote(name, safe='')}")
+
+    async def run(self, jobs: Iterable[Tuple[str, str]], timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        return await self.request("POST", "/runs", {"jobs": [list(j) for j in jobs], "timeout": timeout})
+
+    async def submit_tasks(self, tasks: Iterable[Dict[str, Any]], priority: int = 1) -> List[str]:
+        """Queue many tasks with one request; returns their ids"""
+        result = await self.request("POST", "/tasks", {"tasks": list(tasks), "priority": priority})
+        return result["ids"]
+
+    async def task(self, task_id: str) -> Dict[str, Any]:
+        return await self.request("GET", f"/tasks/{quote(task_id, safe='')}")
+
+
+@dataclass
+class RemoteResult:
+    """An agent run finished by the daemon, shaped like AgentResult"""
+    agent: str
+    input: str
+    output: Any = None
+    error: Optional[BaseException] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class RemoteAgentManager:
+    """The parts of AgentManager the GUI uses, backed by a running daemon"""
+
+    def __init__(self, client: DaemonClient, agents: List[Dict[str, Any]],
+                 max_parallel: int = 8):
+        self.client = client
+        self.agents = {a["name"]: SimpleNamespace(name=a["name"], model=a["model"]) for a in agents}
+        self.max_parallel = max_parallel
+        self._pending: set = set()
+
+    @classmethod
+    def connect(cls, client: DaemonClient, max_parallel: int = 8) -> 'RemoteAgentManager':
+        """Fetch the daemon's agents; blocking, meant for a worker thread"""
+        return cls(client, asyncio.run(client.agents()), max_parallel)
+
+    @staticmethod
+    def _result(data: Dict[str, Any]) -> RemoteResult:
+        error = DaemonError(500, data["error"]) if data["error"] else None
+        return RemoteResult(data["agent"], data["input"], data["output"], error, data["elapsed"])
+
+    async def run_agent(self, agent_name: str, input_text: str):
+        result = self._result((await self.client.run([(agent_name, input_text)]))[0])
+        if not result.ok:
+            raise result.error
+        return result.output
+
+    async def broadcast(self, input_text: str, agent_names: Optional[Iterable[str]] = None,
+                        max_concurrency: Optional[int] = None,
+                        timeout: Optional[float] = None) -> AsyncIterator[RemoteResult]:
+        """Run every agent on the daemon, yielding results as they finish.
+
+        At most ``max_concurrency`` (default ``max_parallel``) requests are
+        open at once; closing the iterator early cancels the rest.
+        """
+        names = list(self.agents) if agent_names is None else list(agent_names)
+        slots = asyncio.Semaphore(max_concurrency or self.max_parallel)
+
+        async def run_one(name: str):
+            async with slots:
+                return await self.client.run([(name, input_text)], timeout)
+
+        runs = [asyncio.ensure_future(run_one(name)) for name in names]
+        try:
+            for finished in asyncio.as_completed(runs):
+                yield self._result((await finished)[0])
+        finally:
+            for run in runs:
+                run.cancel()
+            await asyncio.gather(*runs, return_exceptions=True)
+
+    def remove_agent(self, agent_name: str):
+        if self.agents.pop(agent_name, None) is not None:
+            task = asyncio.get_running_loop().create_task(self.client.remove_agent(agent_name))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
@@ -0,0 +1,153 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+from PySide6.QtCore import (
+    Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+)
+from .workers import WorkUpdate
+
+
+@dataclass
+class AgentRow:
+    name: str
+    model: str = ""
+    state: str = "idle"
+    in_flight: int = 0
+    latency: Optional[float] = None
+
+
+class AgentTableModel(QAbstractTableModel):
+    """Agents and their live status, for a virtualised QTableView.
+
+    Rows are inserted and removed individually with the matching begin/end
+    notifications, and status changes emit ``dataChanged`` for just the
+    cells that changed, so views never rebuild on an update. ``SortRole``
+    exposes raw values so the proxy sorts numbers numerically.
+    """
+
+    NAME, MODEL, STATE, IN_FLIGHT, LATENCY = range(5)
+    COLUMNS = ("Name", "Model", "Status", "In flight", "Last latency")
+    FIELDS = ("name", "model", "state", "in_flight", "latency")
+    SortRole = Qt.UserRole
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows: List[AgentRow] = []
+        self._row_of: Dict[str, int] = {}
+        self._headers = list(self.COLUMNS)
+        # Translates status values for display; replaced by the window
+        self.translate = lambda text: text
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        value = getattr(row, self.FIELDS[index.column()])
+        if role == self.SortRole:
+            return -1.0 if value is None else value
+        if role == Qt.DisplayRole:
+            if index.column() == self.STATE:
+                return self.translate(value)
+            if index.column() == self.LATENCY:
+                return "" if value is None else f"{value:.2f} s"
+            return value
+        if role == Qt.TextAlignmentRole and index.column() in (self.IN_FLIGHT, self.LATENCY):
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole) -> Any:
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self._headers[section]
+        return None
+
+    def set_headers(self, labels: Sequence[str]):
+        self._headers = list(labels)
+        self.headerDataChanged.emit(Qt.Horizontal, 0, len(labels) - 1)
+
+    def name_at(self, row: int) -> str:
+        return self.rows[row].name
+
+    def row_of(self, name: str) -> Optional[int]:
+        return self._row_of.get(name)
+
+    def reset(self, agents: Mapping[str, Any]):
+        """Replace every row, e.g. once the agent manager has loaded"""
+        self.beginResetModel()
+        self.rows = [AgentRow(name, str(getattr(agent, 'model', '') or '')) for name, agent in agents.items()]
+        self._row_of = {row.name: i for i, row in enumerate(self.rows)}
+        self.endResetModel()
+
+    def add_agent(self, name: str, model: str = ""):
+        if name in self._row_of:
+            self.update_agent(name, model=model)
+            return
+        position = len(self.rows)
+        self.beginInsertRows(QModelIndex(), position, position)
+        self.rows.append(AgentRow(name, model))
+        self._row_of[name] = position
+        self.endInsertRows()
+
+    def remove_agent(self, name: str):
+        position = self._row_of.get(name)
+        if position is None:
+            return
+        self.beginRemoveRows(QModelIndex(), position, position)
+        del self.rows[position]
+        del self._row_of[name]
+        for i in range(position, len(self.rows)):
+            self._row_of[self.rows[i].name] = i
+        self.endRemoveRows()
+
+    def update_agent(self, name: str, **fields):
+        """Set status fields and notify only the columns whose value changed"""
+        position = self._row_of.get(name)
+        if position is None:
+            return
+        row = self.rows[position]
+        changed = []
+        for field, value in fields.items():
+            if getattr(row, field) != value:
+                setattr(row, field, value)
+                changed.append(self.FIELDS.index(field))
+        if changed:
+            self.dataChanged.emit(self.index(position, min(changed)),
+                                  self.index(position, max(changed)),
+                                  [Qt.DisplayRole, self.SortRole])
+
+    def apply_updates(self, updates: Mapping[str, WorkUpdate]):
+        """Apply one coalesced batch from the background workers"""
+        for name, update in updates.items():
+            fields = {'state': update.state, 'in_flight': update.in_flight}
+            if update.elapsed is not None:
+                fields['latency'] = update.elapsed
+            self.update_agent(name, **fields)
+
+
+class AgentFilterModel(QSortFilterProxyModel):
+    """Sorts on raw values and filters agents by name or model"""
+
+    def __init__(self, source: AgentTableModel, parent=None):
+        super().__init__(parent)
+        self.setSourceModel(source)
+        self.setSortRole(AgentTableModel.SortRole)
+        self._filter_text = ""
+
+    def set_filter_text(self, text: str):
+        self._filter_text = text.strip().lower()
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
+        if not self._filter_text:
+            return True
+        row = self.sourceModel().rows[source_row]
+        return self._filter_text in row.name.lower() or self._filter_text in row.model.lower()
+
+    def name_at(self, index: QModelIndex) -> Optional[str]:
+        if not index.isValid():
+            return None
+        return self.sourceModel().name_at(self.mapToSource(index).row())
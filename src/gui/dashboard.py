@@ -0,0 +1,132 @@
+import time
+from typing import Dict, Optional, TYPE_CHECKING
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QComboBox, QLabel
+from PySide6.QtCharts import QChart, QChartView, QLineSeries, QValueAxis
+from PySide6.QtCore import Qt, QTimer, QPointF
+from PySide6.QtGui import QPainter
+from core.timeseries import MetricsSampler, RingBuffer, decimate_minmax
+
+if TYPE_CHECKING:
+    from core.config_manager import ConfigManager
+    from utils.i18n import Localization
+
+
+class TimeSeriesChart(QChartView):
+    """Line chart of several ring-buffered series over a trailing time window"""
+
+    def __init__(self, title: str, parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        chart = QChart()
+        chart.setTitle(title)
+        chart.setAnimationOptions(QChart.NoAnimation)
+        chart.legend().setAlignment(Qt.AlignBottom)
+        self.axis_x = QValueAxis()
+        self.axis_x.setLabelFormat("%d s")
+        self.axis_y = QValueAxis()
+        chart.addAxis(self.axis_x, Qt.AlignBottom)
+        chart.addAxis(self.axis_y, Qt.AlignLeft)
+        self.lines: Dict[str, QLineSeries] = {}
+        self.setChart(chart)
+        self.setRenderHint(QPainter.Antialiasing)
+
+    def _line(self, name: str) -> QLineSeries:
+        line = self.lines.get(name)
+        if line is None:
+            line = self.lines[name] = QLineSeries()
+            line.setName(name)
+            self.chart().addSeries(line)
+            line.attachAxis(self.axis_x)
+            line.attachAxis(self.axis_y)
+        return line
+
+    def plot(self, buffers: Dict[str, RingBuffer], now: float, window: float,
+             y_max: Optional[float] = None):
+        """Redraw from the buffers, at most two points per pixel column"""
+        buckets = max(1, self.chart().plotArea().width() or self.width())
+        highest = 0.0
+        for name, buffer in buffers.items():
+            times, values = buffer.points(since=now - window)
+            xs, ys = decimate_minmax(times, values, int(buckets))
+            self._line(name).replace([QPointF(t - now, v) for t, v in zip(xs, ys)])
+            highest = max(highest, max(ys, default=0.0))
+        self.axis_x.setRange(-window, 0)
+        self.axis_y.setRange(0, y_max if y_max is not None else (highest * 1.1 or 1.0))
+
+
+class DashboardTab(QWidget):
+    """Live throughput, latency, token/cost rate and endpoint health charts.
+
+    Samples are taken every ``ui.dashboard.interval`` seconds into ring
+    buffers holding ``ui.dashboard.history`` seconds, so memory and redraw
+    cost stay fixed however long the controller runs. Charts are only
+    redrawn while the tab is visible.
+    """
+
+    WINDOWS = (60, 600, 3600)
+    TITLES = {
+        "throughput": "Task throughput (tasks/s)",
+        "latency": "Task latency (s)",
+        "tokens": "Tokens per second by model",
+        "cost": "Cost per second by model (USD)",
+        "health": "Endpoint health"
+    }
+
+    def __init__(self, config: 'ConfigManager', i18n: 'Localization',
+                 sampler: MetricsSampler, parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self.i18n = i18n
+        self.sampler = sampler
+        self.interval = config.get('ui.dashboard.interval', 1.0)
+        self.history = config.get('ui.dashboard.history', 3600)
+        self.sampler.set_capacity(max(1, int(self.history / self.interval)))
+        self._setup_ui()
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.tick)
+        self.timer.start(int(self.interval * 1000))
+
+    def _setup_ui(self):
+        layout = QVBoxLayout()
+        controls = QHBoxLayout()
+        self.window_label = QLabel(self.i18n.gettext("Window:"))
+        self.window_combo = QComboBox()
+        for seconds in self.WINDOWS:
+            if seconds <= self.history:
+                self.window_combo.addItem(f"{seconds // 60} min", seconds)
+        self.window_combo.currentIndexChanged.connect(self.redraw)
+        controls.addWidget(self.window_label)
+        controls.addWidget(self.window_combo)
+        controls.addStretch()
+        layout.addLayout(controls)
+
+        grid = QGridLayout()
+        self.charts = {name: TimeSeriesChart(self.i18n.gettext(title))
+                       for name, title in self.TITLES.items()}
+        for position, chart in enumerate(self.charts.values()):
+            grid.addWidget(chart, position // 2, position % 2)
+        layout.addLayout(grid)
+        self.setLayout(layout)
+
+    def retranslate_ui(self):
+        self.window_label.setText(self.i18n.gettext("Window:"))
+        for name, chart in self.charts.items():
+            chart.chart().setTitle(self.i18n.gettext(self.TITLES[name]))
+
+    @property
+    def window(self) -> float:
+        return self.window_combo.currentData() or self.WINDOWS[0]
+
+    def tick(self):
+        self.sampler.sample()
+        if self.isVisible():
+            self.redraw()
+
+    def redraw(self):
+        now = time.monotonic()
+        for name, chart in self.charts.items():
+            chart.plot(self.sampler.series[name], now, self.window,
+                       y_max=1.0 if name == "health" else None)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.redraw()
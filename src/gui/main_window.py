@@ -1,26 +1,91 @@
 from PySide6.QtWidgets import (
     QMainWindow, QTabWidget, QStatusBar, QMenuBar, QMenu,
-    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QListWidget
+    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLineEdit,
+    QTableView, QAbstractItemView, QHeaderView
 )
-from PySide6.QtCore import Qt
-from typing import TYPE_CHECKING
-from .litellm_config_dialog import LiteLLMConfigDialog
+from PySide6.QtCore import Qt, Signal
+import asyncio
+import contextlib
+from typing import TYPE_CHECKING, Optional, Callable
+from .workers import UpdateCoalescer, Workers
+from .agent_model import AgentTableModel, AgentFilterModel
+from .dashboard import DashboardTab
+from core.timeseries import MetricsSampler
 
 if TYPE_CHECKING:
     from core.config_manager import ConfigManager
     from utils.i18n import Localization
     from core.agent_manager import AgentManager
     from core.litellm_manager import LiteLLMManager
+    from core.openhands_client import OpenHandsClient
+    from monitor import Monitor
 
 class MainWindow(QMainWindow):
-    def __init__(self, config: 'ConfigManager', i18n: 'Localization', agent_manager: 'AgentManager'):
+    # Emitted once the background loader finishes
+    agent_manager_ready = Signal(object)
+    agent_manager_failed = Signal(str)
+
+    # Strings updated by retranslate_ui
+    UI_STRINGS = ("OpenHands Swarm Controller", "&File", "&View", "&Tools",
+                  "Add Agent", "Remove Agent", "Agents", "Send",
+                  "Directive for the selected agent, or all agents", "Filter agents",
+                  "Dashboard")
+
+    def __init__(self, config: 'ConfigManager', i18n: 'Localization',
+                 loop: asyncio.AbstractEventLoop,
+                 agent_manager: Optional['AgentManager'] = None):
         super().__init__()
         self.config = config
         self.i18n = i18n
         self.agent_manager = agent_manager
+        self.monitor: Optional['Monitor'] = None
+        self.sampler = MetricsSampler()
+        self.agent_model = AgentTableModel(self)
+        self.agent_model.translate = i18n.gettext
+        self.agent_proxy = AgentFilterModel(self.agent_model, self)
+        # Background results reach the widgets in batches, at most max_fps times a second
+        self.updates = UpdateCoalescer(config.get('ui.max_fps', 30), self)
+        self.updates.updates.connect(self.agent_model.apply_updates)
+        self.workers = Workers(self.updates, loop)
+        self.agent_manager_ready.connect(self.set_agent_manager)
+        self.agent_manager_failed.connect(self._agent_manager_failed)
         self._setup_ui()
         self._setup_menu()
         self._load_config()
+
+    def load_agent_manager(self, factory: Callable[[], 'AgentManager']):
+        """Build the agent manager on a worker thread"""
+        self.status_bar.showMessage(self.i18n.gettext("Loading agents and models..."))
+
+        def loaded(future: asyncio.Future):
+            if future.cancelled():
+                return
+            if future.exception() is not None:
+                self.agent_manager_failed.emit(str(future.exception()))
+            else:
+                self.agent_manager_ready.emit(future.result())
+        self.workers.run_blocking(factory).add_done_callback(loaded)
+
+    def set_agent_manager(self, agent_manager: 'AgentManager'):
+        self.agent_manager = agent_manager
+        # A daemon-backed manager has no local LiteLLM to configure or chart
+        if getattr(agent_manager, 'litellm_manager', None) is not None:
+            from core.litellm_manager import LLM_METRICS
+            self.sampler.llm_metrics = LLM_METRICS
+            self.litellm_action.setEnabled(True)
+        self.send_button.setEnabled(True)
+        self._load_agents()
+        self.status_bar.clearMessage()
+
+    def attach_metrics(self, monitor: 'Monitor', client: Optional['OpenHandsClient'] = None):
+        """Chart agent runs through ``monitor`` and endpoint health from ``client``"""
+        self.monitor = monitor
+        self.workers.monitor = monitor
+        self.sampler.monitor = monitor
+        self.sampler.client = client
+
+    def _agent_manager_failed(self, error: str):
+        self.status_bar.showMessage(self.i18n.gettext("Failed to load agents: ") + error)
         
     def _setup_ui(self):
         self.setWindowTitle(self.i18n.gettext("OpenHands Swarm Controller"))
@@ -34,9 +99,22 @@ class MainWindow(QMainWindow):
         self.agent_tab = QWidget()
         self.agent_tab_layout = QVBoxLayout()
         
-        # Agent list
-        self.agent_list = QListWidget()
-        self.agent_tab_layout.addWidget(self.agent_list)
+        # Agent table; only visible rows are painted, so it scales to large swarms
+        self.agent_filter = QLineEdit()
+        self.agent_filter.setPlaceholderText(self.i18n.gettext("Filter agents"))
+        self.agent_filter.textChanged.connect(self.agent_proxy.set_filter_text)
+        self.agent_tab_layout.addWidget(self.agent_filter)
+
+        self.agent_view = QTableView()
+        self.agent_view.setModel(self.agent_proxy)
+        self.agent_view.setSortingEnabled(True)
+        self.agent_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.agent_view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.agent_view.verticalHeader().hide()
+        self.agent_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.agent_view.horizontalHeader().setStretchLastSection(True)
+        self.agent_model.set_headers(self.i18n.translate_all(AgentTableModel.COLUMNS).values())
+        self.agent_tab_layout.addWidget(self.agent_view)
         
         # Agent controls
         control_layout = QHBoxLayout()
@@ -45,9 +123,24 @@ class MainWindow(QMainWindow):
         control_layout.addWidget(self.add_agent_button)
         control_layout.addWidget(self.remove_agent_button)
         self.agent_tab_layout.addLayout(control_layout)
+
+        # Directive input
+        directive_layout = QHBoxLayout()
+        self.directive_input = QLineEdit()
+        self.directive_input.setPlaceholderText(
+            self.i18n.gettext("Directive for the selected agent, or all agents"))
+        self.send_button = QPushButton(self.i18n.gettext("Send"))
+        self.send_button.setEnabled(self.agent_manager is not None)
+        directive_layout.addWidget(self.directive_input)
+        directive_layout.addWidget(self.send_button)
+        self.agent_tab_layout.addLayout(directive_layout)
         
         self.agent_tab.setLayout(self.agent_tab_layout)
         self.tabs.addTab(self.agent_tab, self.i18n.gettext("Agents"))
+
+        # Live metrics
+        self.dashboard = DashboardTab(self.config, self.i18n, self.sampler)
+        self.tabs.addTab(self.dashboard, self.i18n.gettext("Dashboard"))
         
         # Create status bar
         self.status_bar = QStatusBar()
@@ -56,6 +149,8 @@ class MainWindow(QMainWindow):
         # Connect signals
         self.add_agent_button.clicked.connect(self._add_agent)
         self.remove_agent_button.clicked.connect(self._remove_agent)
+        self.send_button.clicked.connect(self._send_directive)
+        self.directive_input.returnPressed.connect(self._send_directive)
         
     def _setup_menu(self):
         menu_bar = QMenuBar(self)
@@ -75,7 +170,9 @@ class MainWindow(QMainWindow):
         
         # Tools menu
         tools_menu = QMenu(self.i18n.gettext("&Tools"), self)
-        tools_menu.addAction(self.i18n.gettext("Configure LiteLLM"), self._configure_litellm)
+        self.litellm_action = tools_menu.addAction(self.i18n.gettext("Configure LiteLLM"),
+                                                   self._configure_litellm)
+        self.litellm_action.setEnabled(self.agent_manager is not None)
         tools_menu.addAction(self.i18n.gettext("Configure Monitoring"), self._configure_monitoring)
         menu_bar.addMenu(tools_menu)
         
@@ -90,6 +187,7 @@ class MainWindow(QMainWindow):
         
     def _configure_litellm(self):
         """Open LiteLLM configuration dialog"""
+        from .litellm_config_dialog import LiteLLMConfigDialog
         dialog = LiteLLMConfigDialog(self.agent_manager.litellm_manager, self)
         if dialog.exec():
             self.status_bar.showMessage("LiteLLM configuration updated", 3000)
@@ -129,26 +227,79 @@ class MainWindow(QMainWindow):
             self.retranslate_ui()
             
     def _load_agents(self):
-        self.agent_list.clear()
-        for agent_name in self.agent_manager.agents.keys():
-            self.agent_list.addItem(agent_name)
+        self.agent_model.reset(self.agent_manager.agents if self.agent_manager is not None else {})
+
+    def _selected_agent(self) -> Optional[str]:
+        return self.agent_proxy.name_at(self.agent_view.currentIndex())
             
     def _add_agent(self):
         # TODO: Implement agent creation dialog
         pass
         
     def _remove_agent(self):
-        selected = self.agent_list.currentItem()
-        if selected:
-            agent_name = selected.text()
+        agent_name = self._selected_agent()
+        if agent_name and self.agent_manager is not None:
             self.agent_manager.remove_agent(agent_name)
-            self._load_agents()
+            self.agent_model.remove_agent(agent_name)
+
+    def _send_directive(self):
+        text = self.directive_input.text().strip()
+        if not text or self.agent_manager is None:
+            return
+        self.directive_input.clear()
+        agent_name = self._selected_agent()
+        if agent_name is not None:
+            self.run_agent(agent_name, text)
+        else:
+            self.broadcast(text)
+
+    def run_agent(self, agent_name: str, input_text: str) -> asyncio.Task:
+        """Run one agent on the event loop; its status is shown as it changes"""
+        return self.workers.run(agent_name, self.agent_manager.run_agent(agent_name, input_text))
+
+    def broadcast(self, input_text: str) -> asyncio.Task:
+        """Send a directive to every agent, bounded by agents.max_parallel"""
+        async def run():
+            agent_names = list(self.agent_manager.agents)
+            for agent_name in agent_names:
+                self.workers.started(agent_name)
+            pending = set(agent_names)
+            try:
+                results = self.agent_manager.broadcast(input_text, agent_names)
+                async with contextlib.aclosing(results):
+                    async for result in results:
+                        pending.discard(result.agent)
+                        self.workers.finished(result.agent, "done" if result.ok else "failed",
+                                              result.output, result.error, result.elapsed)
+            finally:
+                for agent_name in pending:
+                    self.workers.finished(agent_name, "cancelled")
+        return self.workers.submit(run())
+
+    def closeEvent(self, event):
+        self.workers.shutdown()
+        if self.monitor is not None:
+            self.monitor.close()
+        super().closeEvent(event)
             
     def retranslate_ui(self):
-        self.setWindowTitle(self.i18n.gettext("OpenHands Swarm Controller"))
-        self.menuBar().actions()[0].setText(self.i18n.gettext("&File"))
-        self.menuBar().actions()[1].setText(self.i18n.gettext("&View"))
-        self.menuBar().actions()[2].setText(self.i18n.gettext("&Tools"))
-        self.add_agent_button.setText(self.i18n.gettext("Add Agent"))
-        self.remove_agent_button.setText(self.i18n.gettext("Remove Agent"))
-        self.tabs.setTabText(0, self.i18n.gettext("Agents"))
\ No newline at end of file
+        """Apply the current language in a single repaint"""
+        text = self.i18n.translate_all(self.UI_STRINGS)
+        self.setUpdatesEnabled(False)
+        try:
+            self.setWindowTitle(text["OpenHands Swarm Controller"])
+            self.menuBar().actions()[0].setText(text["&File"])
+            self.menuBar().actions()[1].setText(text["&View"])
+            self.menuBar().actions()[2].setText(text["&Tools"])
+            self.add_agent_button.setText(text["Add Agent"])
+            self.remove_agent_button.setText(text["Remove Agent"])
+            self.tabs.setTabText(0, text["Agents"])
+            self.tabs.setTabText(1, text["Dashboard"])
+            self.dashboard.retranslate_ui()
+            self.send_button.setText(text["Send"])
+            self.directive_input.setPlaceholderText(
+                text["Directive for the selected agent, or all agents"])
+            self.agent_filter.setPlaceholderText(text["Filter agents"])
+            self.agent_model.set_headers(self.i18n.translate_all(AgentTableModel.COLUMNS).values())
+        finally:
+            self.setUpdatesEnabled(True)
\ No newline at end of file
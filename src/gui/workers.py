@@ -0,0 +1,152 @@
+import time
+import asyncio
+import itertools
+import threading
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Coroutine, Dict, Hashable, Optional, Set, TYPE_CHECKING
+from PySide6.QtCore import QObject, QTimer, Signal
+
+if TYPE_CHECKING:
+    from monitor import Monitor
+
+
+@dataclass
+class WorkUpdate:
+    """Latest state of one piece of background work, e.g. an agent run"""
+    state: str
+    result: Any = None
+    error: Optional[BaseException] = None
+    # Runs still active for the key, and how long the finished one took
+    in_flight: int = 0
+    elapsed: Optional[float] = None
+
+
+class UpdateCoalescer(QObject):
+    """Collects updates from any thread and delivers them to widgets in batches.
+
+    ``post`` keeps only the latest value per key. At most ``max_fps`` times a
+    second the pending values are emitted as one ``updates`` signal on the GUI
+    thread, so a burst from hundreds of agents costs a single repaint. Nothing
+    is scheduled while there is nothing to deliver.
+    """
+
+    updates = Signal(dict)
+    # Emitted by post() when the batch becomes non-empty; queued to the GUI thread
+    _wake = Signal()
+
+    def __init__(self, max_fps: float = 30, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.interval = 1.0 / max_fps
+        self._pending: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.flush)
+        self._wake.connect(self._schedule)
+
+    def post(self, key: Hashable, value: Any):
+        """Queue ``value`` for ``key``; safe to call from any thread"""
+        with self._lock:
+            first = not self._pending
+            self._pending[key] = value
+        if first:
+            self._wake.emit()
+
+    def _schedule(self):
+        if not self._timer.isActive():
+            wait = self._last_flush + self.interval - time.monotonic()
+            self._timer.start(max(0, int(wait * 1000)))
+
+    def flush(self):
+        """Emit everything posted since the last flush"""
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        self._last_flush = time.monotonic()
+        if batch:
+            self.updates.emit(batch)
+
+
+class Workers:
+    """Runs agent and endpoint work without blocking the GUI thread.
+
+    Coroutines become tasks on ``loop``, the Qt-integrated asyncio loop set
+    up in ``main.py``; blocking callables run in a thread pool. Progress is
+    reported through ``coalescer`` rather than by touching widgets directly.
+    Finished runs are also logged to ``monitor``, if set, for the dashboard.
+    """
+
+    # Monitor task status for each final WorkUpdate state
+    MONITOR_STATUS = {"done": "completed"}
+
+    def __init__(self, coalescer: UpdateCoalescer, loop: asyncio.AbstractEventLoop,
+                 max_threads: int = 4):
+        self.coalescer = coalescer
+        self.loop = loop
+        self.executor = ThreadPoolExecutor(max_threads, thread_name_prefix="gui-worker")
+        self.tasks: Set[asyncio.Task] = set()
+        self.in_flight: Dict[Hashable, int] = {}
+        self.monitor: Optional['Monitor'] = None
+        self._runs = itertools.count()
+
+    def submit(self, coro: Coroutine) -> asyncio.Task:
+        """Schedule a coroutine on the event loop and keep it referenced until done"""
+        task = self.loop.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    def started(self, key: Hashable):
+        """Record that work for ``key`` began; call on the event loop thread"""
+        self.in_flight[key] = self.in_flight.get(key, 0) + 1
+        self.coalescer.post(key, WorkUpdate("running", in_flight=self.in_flight[key]))
+
+    def finished(self, key: Hashable, state: str, result: Any = None,
+                 error: Optional[BaseException] = None, elapsed: Optional[float] = None):
+        """Record that work for ``key`` ended; pairs with ``started``"""
+        remaining = self.in_flight.get(key, 1) - 1
+        if remaining:
+            self.in_flight[key] = remaining
+        else:
+            self.in_flight.pop(key, None)
+        # Another run for the key may still be going; keep showing it as running
+        self.coalescer.post(key, WorkUpdate(state if not remaining else "running",
+                                            result, error, remaining, elapsed))
+        if self.monitor is not None:
+            self._record(key, state, error, elapsed)
+
+    def _record(self, key: Hashable, state: str, error: Optional[BaseException],
+                elapsed: Optional[float]):
+        details: Dict[str, Any] = {"agent": str(key)}
+        if elapsed is not None:
+            details["latency"] = elapsed
+        if error is not None:
+            details["error"] = str(error)
+        self.monitor.log_task(f"{key}-{next(self._runs)}",
+                              self.MONITOR_STATUS.get(state, state), details)
+
+    def run(self, key: Hashable, coro: Coroutine) -> asyncio.Task:
+        """Run a coroutine, posting a WorkUpdate for ``key`` as it starts and ends"""
+        async def tracked():
+            self.started(key)
+            start = time.monotonic()
+            try:
+                result = await coro
+            except asyncio.CancelledError:
+                self.finished(key, "cancelled", elapsed=time.monotonic() - start)
+                raise
+            except Exception as e:
+                self.finished(key, "failed", error=e, elapsed=time.monotonic() - start)
+            else:
+                self.finished(key, "done", result, elapsed=time.monotonic() - start)
+        return self.submit(tracked())
+
+    def run_blocking(self, fn: Callable, *args) -> asyncio.Future:
+        """Run a blocking callable in the worker pool"""
+        return self.loop.run_in_executor(self.executor, fn, *args)
+
+    def shutdown(self):
+        for task in list(self.tasks):
+            task.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,124 @@
+import json
+import threading
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any
+from loguru import logger
+
+
+class BatchedLogWriter:
+    """Writes log entries as NDJSON from a background thread.
+
+    ``write`` only appends to a bounded in-memory buffer; serialisation, file
+    I/O and rotation all happen on the writer thread in batches. When the
+    buffer is full new entries are dropped and counted rather than blocking
+    the caller. Entries that cannot be encoded or written are dropped and
+    counted too; the writer thread logs the failure and keeps running.
+    """
+
+    def __init__(self, path: str = "logs/tasks.ndjson", capacity: int = 65536,
+                 batch_size: int = 1024, flush_interval: float = 0.5,
+                 max_bytes: int = 100 * 1024 * 1024, backup_count: int = 5):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.written = 0
+        self.dropped = 0
+        self._buffer: deque = deque()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, entry: Dict[str, Any]) -> bool:
+        """Enqueue an entry; returns False if it was dropped"""
+        buffer = self._buffer
+        if len(buffer) >= self.capacity:
+            self.dropped += 1
+            return False
+        buffer.append(entry)
+        if len(buffer) == self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._drain_safely()
+            if self._stopping:
+                self._drain_safely()
+                return
+
+    def _drain_safely(self):
+        try:
+            self._drain()
+        except Exception:
+            logger.exception("Log writer failed to write a batch")
+
+    def _drain(self):
+        buffer = self._buffer
+        while buffer:
+            lines = []
+            for _ in range(min(self.batch_size, len(buffer))):
+                entry = buffer.popleft()
+                try:
+                    lines.append(self._encode(entry))
+                except (TypeError, ValueError) as e:
+                    self.dropped += 1
+                    logger.warning(f"Dropping log entry that cannot be encoded: {e}")
+            if not lines:
+                continue
+            try:
+                self._file.write("\n".join(lines) + "\n")
+                self._file.flush()
+            except OSError as e:
+                # Leave the rest buffered and try again on the next wakeup
+                self.dropped += len(lines)
+                logger.error(f"Failed to write {len(lines)} log entries: {e}")
+                return
+            self.written += len(lines)
+            if self._file.tell() >= self.max_bytes:
+                self._rotate()
+
+    @staticmethod
+    def _encode(entry: Dict[str, Any]) -> str:
+        timestamp = entry.get("timestamp")
+        if isinstance(timestamp, float):
+            entry = {**entry, "timestamp": datetime.fromtimestamp(timestamp).isoformat()}
+        return json.dumps(entry, separators=(',', ':'), default=str)
+
+    def _rotate(self):
+        self._file.close()
+        try:
+            for i in range(self.backup_count - 1, 0, -1):
+                source = self.path.with_name(f"{self.path.name}.{i}")
+                if source.exists():
+                    source.replace(self.path.with_name(f"{self.path.name}.{i + 1}"))
+            if self.backup_count > 0:
+                self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+            else:
+                self.path.unlink()
+        finally:
+            # Keep writing to the current file if the rename failed
+            self._file = open(self.path, 'a', encoding='utf-8')
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "written": self.written,
+            "dropped": self.dropped,
+            "pending": len(self._buffer)
+        }
+
+    def close(self):
+        """Write everything still buffered and stop the writer thread"""
+        self._stopping = True
+        self._wakeup.set()
+        self._thread.join()
+        self._file.close()
@@ -1,37 +1,150 @@
 import sys
-import asyncio
-from PySide6.QtWidgets import QApplication
-from utils.i18n import Localization
-from core.config_manager import ConfigManager
-from core.agent_manager import AgentManager
-from gui.main_window import MainWindow
-
-def main():
-    # Initialize application
-    app = QApplication(sys.argv)
-    
-    # Load configuration
-    config = ConfigManager('config/config.json')
-    
-    # Initialize localization
-    i18n = Localization(config.config_path)
-    i18n.set_language(config.get('ui.language'))
-    
-    # Initialize agent manager
+import argparse
+
+# Heavy modules (PySide6, agents, litellm, prometheus_client, loguru) are
+# imported inside the command functions and the background loader, so the
+# window can paint before the LLM stack has finished loading and the headless
+# commands never import PySide6.
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="swarm-directive", description="OpenHands Swarm Controller")
+    parser.add_argument('--config', default='config/config.json', help="path to config.json")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="print an import-time and startup phase breakdown")
+    parser.add_argument('--attach', metavar='ADDRESS',
+                        help="drive the agents of a running daemon instead of loading them locally")
+    commands = parser.add_subparsers(dest='command')
+
+    serve = commands.add_parser('serve', help="run headless and serve the control API")
+    serve.add_argument('--address', help="host:port or unix:/path/to.sock (default: daemon.address)")
+
+    submit = commands.add_parser('submit', help="queue tasks on a running daemon")
+    submit.add_argument('file', help="JSON list of tasks or one JSON task per line; - reads stdin")
+    submit.add_argument('--priority', type=int, default=1)
+    submit.add_argument('--address', help="daemon address (default: daemon.address)")
+    return parser.parse_args(argv)
+
+def create_agent_manager(config):
+    """Build the AgentManager and default agents; runs off the GUI thread"""
+    from core.agent_manager import AgentManager
     agent_manager = AgentManager(config)
-    
+
     # Create default agents
     agent_manager.create_agent(
         name="Swarm Controller",
         instructions="You are the main controller for the OpenHands swarm"
     )
-    
-    # Create and show main window
-    window = MainWindow(config, i18n, agent_manager)
+    return agent_manager
+
+def attach_monitoring(window, config, loop):
+    """Feed the dashboard; deferred so its imports don't delay the first paint.
+
+    Agent runs started from the window are logged to the Monitor; the client
+    follows the configured endpoints, so health shows which are in rotation.
+    """
+    from monitor import Monitor
+    from core.openhands_client import OpenHandsClient
+    client = OpenHandsClient(config.get('openhands', {}))
+    config.subscribe('openhands.endpoints', client.apply_endpoints, loop=loop)
+    window.attach_metrics(Monitor(), client)
+
+def serve(args, config):
+    """Run the controller without a GUI until SIGINT/SIGTERM"""
+    import asyncio
+    from daemon import Daemon
+    daemon = Daemon(config, lambda: create_agent_manager(config), args.address)
+    try:
+        asyncio.run(daemon.run())
+    finally:
+        config.close()
+
+def read_tasks(text):
+    """Tasks from a JSON list, or from JSON lines"""
+    import json
+    if text.lstrip().startswith('['):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+def submit(args, config):
+    """Send a batch of tasks to a running daemon and print their ids"""
+    import asyncio
+    from daemon import DaemonClient, DEFAULT_ADDRESS
+    if args.file == '-':
+        tasks = read_tasks(sys.stdin.read())
+    else:
+        with open(args.file, encoding='utf-8') as f:
+            tasks = read_tasks(f.read())
+    client = DaemonClient(args.address or config.get('daemon.address', DEFAULT_ADDRESS),
+                          config.get('daemon.token', ''))
+    for task_id in asyncio.run(client.submit_tasks(tasks, args.priority)):
+        print(task_id)
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    if args.command is not None:
+        from core.config_manager import ConfigManager
+        config = ConfigManager(args.config)
+        return {'serve': serve, 'submit': submit}[args.command](args, config)
+    run_gui(args)
+
+def run_gui(args):
+    profiler = None
+    if args.profile_startup:
+        from utils.profiling import StartupProfiler
+        profiler = StartupProfiler()
+        profiler.install()
+
+    import asyncio
+    import qasync
+    from PySide6.QtWidgets import QApplication
+    from PySide6.QtCore import QTimer
+    from utils.i18n import Localization
+    from core.config_manager import ConfigManager
+    from gui.main_window import MainWindow
+
+    # Initialize application
+    app = QApplication(sys.argv)
+
+    # Run asyncio on the Qt event loop so agent runs can be awaited from the GUI
+    loop = qasync.QEventLoop(app)
+    asyncio.set_event_loop(loop)
+
+    # Load configuration
+    config = ConfigManager(args.config)
+
+    # Initialize localization
+    i18n = Localization(config.config_path)
+    i18n.set_language(config.get('ui.language'))
+
+    # Show the window first; agents and models load in the background
+    window = MainWindow(config, i18n, loop)
     window.show()
-    
+    if profiler is not None:
+        profiler.mark("window shown")
+        QTimer.singleShot(0, lambda: profiler.mark("first paint"))
+
+        def finish_profile(*_):
+            profiler.mark("agent manager ready")
+            profiler.uninstall()
+            profiler.report()
+        window.agent_manager_ready.connect(finish_profile)
+        window.agent_manager_failed.connect(finish_profile)
+
+    if args.attach:
+        from daemon import DaemonClient, RemoteAgentManager
+        client = DaemonClient(args.attach, config.get('daemon.token', ''))
+        window.load_agent_manager(lambda: RemoteAgentManager.connect(
+            client, config.get('agents.max_parallel', 8)))
+    else:
+        window.load_agent_manager(lambda: create_agent_manager(config))
+        QTimer.singleShot(0, lambda: attach_monitoring(window, config, loop))
+    config.watch()
+
     # Start application loop
-    sys.exit(app.exec())
+    closing = asyncio.Event()
+    app.aboutToQuit.connect(closing.set)
+    with loop:
+        loop.run_until_complete(closing.wait())
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
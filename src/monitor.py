@@ -1,43 +1,141 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Callable
+from collections import OrderedDict
 from datetime import datetime
-import json
+import time
+from prometheus_client import Histogram, Counter
+from log_writer import BatchedLogWriter
+from core.stats import LatencyHistogram, SlidingWindowRate
+
+# Prometheus metrics. Agent names are unbounded, so per-agent latency is only
+# kept in memory by Monitor, not as a label here.
+TASK_LATENCY_SECONDS = Histogram(
+    'swarm_task_latency_seconds', 'Task latency in seconds',
+    ['status', 'endpoint'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+)
+TASKS_TOTAL = Counter('swarm_tasks_total', 'Total tasks processed', ['status', 'endpoint'])
 
 class Monitor:
-    def __init__(self):
+    # Latency and throughput are broken down along these task detail keys
+    DIMENSIONS = ("status", "agent", "endpoint")
+
+    def __init__(self, log_writer: Optional[BatchedLogWriter] = None,
+                 rate_window: float = 60.0, max_series: int = 256):
         self.metrics = {
             "tasks_processed": 0,
             "tasks_failed": 0,
             "tasks_completed": 0,
             "start_time": datetime.now().isoformat()
         }
-        
+        self.log_writer = log_writer or BatchedLogWriter()
+        self.rate_window = rate_window
+        # Per dimension, only the most recently seen max_series values are kept
+        self.max_series = max_series
+        self.latency: Dict[str, OrderedDict[str, LatencyHistogram]] = {
+            d: OrderedDict() for d in self.DIMENSIONS
+        }
+        self.throughput: Dict[str, OrderedDict[str, SlidingWindowRate]] = {
+            d: OrderedDict() for d in self.DIMENSIONS
+        }
+        self.total_throughput = SlidingWindowRate(rate_window)
+        # Latency of tasks finished since the last take_recent_latency()
+        self.recent_latency = LatencyHistogram()
+
     def log_task(self, task_id: str, status: str, details: Dict[str, Any]):
-        """Log task status and details"""
-        timestamp = datetime.now().isoformat()
+        """Log task status and details.
+
+        ``details`` may carry ``latency`` (seconds), ``agent`` and ``endpoint``
+        to feed the latency percentiles and throughput rates.
+        """
         log_entry = {
-            "timestamp": timestamp,
+            "timestamp": time.time(),
             "task_id": task_id,
             "status": status,
-            "details": details
+            # Encoded later on the writer thread, so detach it from the caller
+            "details": dict(details)
         }
-        
+
         # Update metrics
         if status == "completed":
             self.metrics["tasks_completed"] += 1
         elif status == "failed":
             self.metrics["tasks_failed"] += 1
         self.metrics["tasks_processed"] += 1
-        
-        # Print log (could be replaced with file/DB logging)
-        print(json.dumps(log_entry, indent=2))
-        
+        self._observe(status, details)
+
+        # Serialised and written in batches by the writer thread
+        self.log_writer.write(log_entry)
+
+    def _observe(self, status: str, details: Dict[str, Any]):
+        now = time.monotonic()
+        labels = {
+            "status": status,
+            "agent": str(details.get("agent", "")),
+            "endpoint": str(details.get("endpoint", ""))
+        }
+        latency = details.get("latency")
+        self.total_throughput.add(now=now)
+        for dimension, value in labels.items():
+            if not value:
+                continue
+            self._series(self.throughput[dimension], value,
+                         lambda: SlidingWindowRate(self.rate_window)).add(now=now)
+            if latency is not None:
+                self._series(self.latency[dimension], value, LatencyHistogram).record(latency)
+
+        TASKS_TOTAL.labels(status=status, endpoint=labels["endpoint"]).inc()
+        if latency is not None:
+            self.recent_latency.record(latency)
+            TASK_LATENCY_SECONDS.labels(status=status, endpoint=labels["endpoint"]).observe(latency)
+
+    def _series(self, series: OrderedDict, name: str, factory: Callable[[], Any]):
+        """Get or create a series, evicting the least recently used past max_series"""
+        value = series.get(name)
+        if value is None:
+            value = series[name] = factory()
+            while len(series) > self.max_series:
+                series.popitem(last=False)
+        else:
+            series.move_to_end(name)
+        return value
+
     def get_metrics(self):
         """Get current system metrics"""
         return self.metrics
-        
+
+    def get_latency(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Latency percentiles per status, agent and endpoint"""
+        return {
+            dimension: {name: h.summary() for name, h in series.items()}
+            for dimension, series in self.latency.items()
+        }
+
+    def take_recent_latency(self) -> LatencyHistogram:
+        """Latency histogram of the tasks finished since the previous call"""
+        recent, self.recent_latency = self.recent_latency, LatencyHistogram()
+        return recent
+
+    def get_throughput(self) -> Dict[str, Any]:
+        """Tasks per second over the sliding window, overall and per series"""
+        now = time.monotonic()
+        return {
+            "total": self.total_throughput.rate(now),
+            **{
+                dimension: {name: r.rate(now) for name, r in series.items()}
+                for dimension, series in self.throughput.items()
+            }
+        }
+
     def get_status(self):
         """Get system status summary"""
         return {
             "uptime": str(datetime.now() - datetime.fromisoformat(self.metrics["start_time"])),
-            **self.metrics
-        }
\ No newline at end of file
+            **self.metrics,
+            "latency": self.get_latency(),
+            "throughput": self.get_throughput(),
+            "logging": self.log_writer.get_stats()
+        }
+
+    def close(self):
+        """Flush pending log entries"""
+        self.log_writer.close()
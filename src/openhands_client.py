@@ -1,18 +1,29 @@
-from playwright.sync_api import sync_playwright
+import time
+import asyncio
 from typing import Optional
+from loguru import logger
+from .browser_pool import BrowserPool, AsyncBrowserPool
 
 class OpenHandsClient:
-    def __init__(self, url: str = "http://localhost:51090"):
+    def __init__(self, url: str = "http://localhost:51090",
+                 pool: Optional[BrowserPool] = None, agent_id: Optional[str] = None,
+                 selector_timeout: float = 30):
         self.url = url
-        self.playwright = sync_playwright().start()
-        self.browser = self.playwright.chromium.launch(headless=True)
-        self.context = self.browser.new_context()
-        self.page = self.context.new_page()
+        self.pool = pool or BrowserPool.shared()
+        self.agent_id = agent_id or url
+        self.selector_timeout_ms = selector_timeout * 1000
+        self.lease = self.pool.acquire(self.agent_id, url)
+        self.context = self.lease.context
+        self.page = self.lease.page
+        self.page.set_default_timeout(self.selector_timeout_ms)
         
     def connect(self):
+        started = time.perf_counter()
+        # Warm pages come back on about:blank, so always load the UI afresh
         self.page.goto(self.url)
         # Wait for OpenHands to load
-        self.page.wait_for_selector("#openhands-container")
+        self.page.wait_for_selector("#openhands-container", timeout=self.selector_timeout_ms)
+        self.pool.record(self.agent_id, connect_seconds=time.perf_counter() - started)
         
     def execute_command(self, command: str, params: Optional[dict] = None):
         """Execute a command through the OpenHands interface"""
@@ -29,7 +40,7 @@ class OpenHandsClient:
             self.page.click("#execute-button")
             
             # Wait for response
-            self.page.wait_for_selector("#response-container")
+            self.page.wait_for_selector("#response-container", timeout=self.selector_timeout_ms)
             
             # Return response
             return self.page.inner_text("#response-container")
@@ -37,7 +48,61 @@ class OpenHandsClient:
             print(f"Command execution failed: {str(e)}")
             return None
         
+    def get_stats(self):
+        """Startup time and memory use recorded when this client was created"""
+        return self.pool.get_stats(self.agent_id)
+        
     def close(self):
-        self.context.close()
-        self.browser.close()
-        self.playwright.stop()
\ No newline at end of file
+        self.pool.release(self.lease)
+
+class AsyncOpenHandsClient:
+    """asyncio version of ``OpenHandsClient`` driving one page of a shared browser.
+
+    Commands on the same page are serialised, since they share one form;
+    concurrency comes from running many clients, one page each.
+    """
+
+    def __init__(self, url: str, pool: AsyncBrowserPool, agent_id: Optional[str] = None,
+                 selector_timeout: float = 30):
+        self.url = url
+        self.pool = pool
+        self.agent_id = agent_id or url
+        self.selector_timeout_ms = selector_timeout * 1000
+        self.lease = None
+        self.page = None
+        self._page_lock = asyncio.Lock()
+
+    async def connect(self):
+        started = time.perf_counter()
+        self.lease = await self.pool.acquire(self.agent_id, self.url)
+        self.page = self.lease.page
+        self.page.set_default_timeout(self.selector_timeout_ms)
+        await self.page.goto(self.url)
+        await self.page.wait_for_selector("#openhands-container", timeout=self.selector_timeout_ms)
+        self.pool.record(self.agent_id, connect_seconds=time.perf_counter() - started)
+
+    async def execute_command(self, command: str, params: Optional[dict] = None):
+        """Execute a command through the OpenHands interface"""
+        async with self._page_lock:
+            try:
+                await self.page.fill("#command-input", command)
+                if params:
+                    for key, value in params.items():
+                        await self.page.fill(f"#{key}-input", str(value))
+                await self.page.click("#execute-button")
+                await self.page.wait_for_selector(
+                    "#response-container", timeout=self.selector_timeout_ms
+                )
+                return await self.page.inner_text("#response-container")
+            except Exception as e:
+                logger.error(f"Command execution failed: {e}")
+                return None
+
+    def get_stats(self):
+        """Startup time and memory use recorded when this client connected"""
+        return self.pool.get_stats(self.agent_id)
+
+    async def close(self):
+        if self.lease is not None:
+            await self.pool.release(self.lease)
+            self.lease = None
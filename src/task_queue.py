@@ -1,50 +1,205 @@
-from queue import PriorityQueue
-from typing import Dict, Any
+from queue import PriorityQueue, Empty
+from typing import Dict, Any, Optional, Iterable, TYPE_CHECKING
+import heapq
+import itertools
+import os
+import threading
 import time
 
-class TaskQueue:
+if TYPE_CHECKING:
+    from task_store import TaskStore
+
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+# Two base32 digits per lookup: 10 bits -> 2 characters
+_PAIRS = [a + b for a in _CROCKFORD for b in _CROCKFORD]
+
+class TaskIdGenerator:
+    """Thread-safe, monotonic ULID-style IDs.
+
+    48 bits of millisecond timestamp followed by 80 random bits. Within the
+    same millisecond the random part is incremented, so IDs never collide and
+    sort in creation order.
+    """
+
     def __init__(self):
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._random = 0
+        self._time_prefix = ""
+        self._prefix = ""
+
+    def _next(self) -> str:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > self._last_ms:
+            self._last_ms = now_ms
+            self._random = int.from_bytes(os.urandom(10), 'big') >> 1
+            self._time_prefix = self._encode(now_ms, 5)
+            self._prefix = ""
+        else:
+            self._random += 1
+        low = self._random & 0x3FF
+        # Everything but the last two characters only changes every 1024 IDs
+        if not self._prefix or low == 0:
+            self._prefix = self._time_prefix + self._encode(self._random >> 10, 7)
+        return self._prefix + _PAIRS[low]
+
+    def new_id(self) -> str:
+        with self._lock:
+            return self._next()
+
+    def new_ids(self, count: int) -> list[str]:
+        with self._lock:
+            return [self._next() for _ in range(count)]
+
+    @staticmethod
+    def _encode(value: int, pairs: int) -> str:
+        chars = []
+        for _ in range(pairs):
+            chars.append(_PAIRS[value & 0x3FF])
+            value >>= 10
+        return "".join(reversed(chars))
+
+class _QueueEntry:
+    """Heap entry ordered by priority, then by submission order"""
+    __slots__ = ("rank", "sequence", "task")
+
+    def __init__(self, rank: int, sequence: int, task: Dict[str, Any]):
+        self.rank = rank
+        self.sequence = sequence
+        self.task = task
+
+    def __lt__(self, other: '_QueueEntry') -> bool:
+        if self.rank != other.rank:
+            return self.rank < other.rank
+        return self.sequence < other.sequence
+
+class TaskQueue:
+    def __init__(self, store: Optional['TaskStore'] = None):
         self.queue = PriorityQueue()
+        # With a store attached only queued and in-progress tasks stay here;
+        # finished tasks and their results live on disk
         self.task_status = {}
-        
+        self.store = store
+        self._sequence = itertools.count()
+        self._ids = TaskIdGenerator()
+
     def add_task(self, task: Dict[str, Any], priority: int = 1):
         """Add a task to the queue with optional priority"""
-        task_id = str(time.time_ns())
+        task_id = self._ids.new_id()
         task_data = {
             "id": task_id,
             "priority": priority,
             "status": "queued",
             "task": task
         }
-        self.queue.put((-priority, task_data))
+        self.queue.put(_QueueEntry(-priority, next(self._sequence), task_data))
         self.task_status[task_id] = task_data
+        if self.store is not None:
+            self.store.save(task_data)
         return task_id
-        
+
+    def add_tasks(self, tasks: Iterable[Dict[str, Any]], priority: int = 1) -> list[str]:
+        """Add many tasks at once under a single queue lock"""
+        tasks = list(tasks)
+        sequence = self._sequence
+        batch = [
+            {"id": task_id, "priority": priority, "status": "queued", "task": task}
+            for task_id, task in zip(self._ids.new_ids(len(tasks)), tasks)
+        ]
+        entries = [_QueueEntry(-priority, next(sequence), t) for t in batch]
+        self.task_status.update((t["id"], t) for t in batch)
+        queue = self.queue
+        with queue.mutex:
+            heap = queue.queue
+            if len(entries) > len(heap):
+                heap.extend(entries)
+                heapq.heapify(heap)
+            else:
+                for entry in entries:
+                    heapq.heappush(heap, entry)
+            queue.unfinished_tasks += len(entries)
+            queue.not_empty.notify(len(entries))
+        if self.store is not None:
+            self.store.save_many(batch)
+        return [t["id"] for t in batch]
+
     def get_next_task(self):
         """Get the next highest priority task"""
-        if not self.queue.empty():
-            _, task = self.queue.get()
-            task["status"] = "in_progress"
-            self.task_status[task["id"]] = task
-            return task
-        return None
-        
+        try:
+            task = self.queue.get_nowait().task
+        except Empty:
+            return None
+        task["status"] = "in_progress"
+        self.task_status[task["id"]] = task
+        if self.store is not None:
+            self.store.save(task)
+        return task
+
+    def requeue(self, task: Dict[str, Any]):
+        """Put back a task taken with ``get_next_task`` that was not for the caller"""
+        task["status"] = "queued"
+        self.queue.put(_QueueEntry(-task["priority"], next(self._sequence), task))
+        self.task_status[task["id"]] = task
+        if self.store is not None:
+            self.store.save(task)
+
     def complete_task(self, task_id: str, result: Dict):
         """Mark a task as completed"""
         if task_id in self.task_status:
             self.task_status[task_id]["status"] = "completed"
             self.task_status[task_id]["result"] = result
-            
+            self._retire(task_id)
+
     def fail_task(self, task_id: str, error: str):
         """Mark a task as failed"""
         if task_id in self.task_status:
             self.task_status[task_id]["status"] = "failed"
             self.task_status[task_id]["error"] = error
-            
+            self._retire(task_id)
+
+    def _retire(self, task_id: str):
+        """Persist a finished task and drop it from memory"""
+        if self.store is not None:
+            self.store.save(self.task_status.pop(task_id))
+
     def get_status(self, task_id: str):
         """Get status of a specific task"""
-        return self.task_status.get(task_id)
-        
+        task = self.task_status.get(task_id)
+        if task is None and self.store is not None:
+            task = self.store.get(task_id)
+        return task
+
     def get_all_status(self):
         """Get status of all tasks"""
-        return self.task_status
\ No newline at end of file
+        if self.store is None:
+            return self.task_status
+        return {
+            **{task["id"]: task for task in self.store.iter_all()},
+            **self.task_status
+        }
+
+    def get_tasks_by_status(self, status: str, limit: Optional[int] = None):
+        """Get tasks with the given status, highest priority first"""
+        if self.store is not None and status not in ("queued", "in_progress"):
+            return self.store.find_by_status(status, limit)
+        tasks = sorted(
+            (t for t in self.task_status.values() if t["status"] == status),
+            key=lambda t: -t["priority"]
+        )
+        return tasks[:limit] if limit is not None else tasks
+
+    def resume(self) -> int:
+        """Re-queue unfinished tasks from the store after a restart"""
+        if self.store is None:
+            return 0
+        resumed = 0
+        for status in ("in_progress", "queued"):
+            for task in self.store.find_by_status(status):
+                if task["id"] in self.task_status:
+                    continue
+                task["status"] = "queued"
+                self.queue.put(_QueueEntry(-task["priority"], next(self._sequence), task))
+                self.task_status[task["id"]] = task
+                self.store.save(task)
+                resumed += 1
+        return resumed
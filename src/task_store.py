@@ -0,0 +1,194 @@
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from loguru import logger
+from typing import Dict, Any, Optional, Iterator
+
+
+class TaskStore:
+    """SQLite-backed task records with batched, write-behind persistence.
+
+    Writes are buffered and flushed every ``batch_size`` records or every
+    ``flush_interval`` seconds by a background thread, whichever comes first.
+    The buffer is swapped out under ``_lock`` and written under ``_db_lock``,
+    so callers saving records never wait on disk I/O. The database runs in
+    WAL mode so readers never block the writer.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id TEXT PRIMARY KEY,
+            priority INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            task TEXT NOT NULL,
+            result TEXT,
+            error TEXT,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_tasks_status_priority
+            ON tasks (status, priority DESC);
+    """
+
+    _UPSERT = """
+        INSERT INTO tasks (id, priority, status, task, result, error, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            priority = excluded.priority,
+            status = excluded.status,
+            result = excluded.result,
+            error = excluded.error,
+            updated_at = excluded.updated_at
+    """
+
+    def __init__(self, path: str = "data/tasks.db", batch_size: int = 500,
+                 flush_interval: float = 1.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self._SCHEMA)
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._pending: Dict[str, tuple] = {}
+        # Rows taken from the buffer but not yet committed, still visible to get()
+        self._writing: Dict[str, tuple] = {}
+        self._closed = threading.Event()
+        self._wakeup = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+
+    @staticmethod
+    def _row(task_data: Dict[str, Any]) -> tuple:
+        result = task_data.get("result")
+        return (
+            task_data["id"],
+            task_data.get("priority", 1),
+            task_data["status"],
+            json.dumps(task_data.get("task", {})),
+            json.dumps(result) if result is not None else None,
+            task_data.get("error"),
+            time.time()
+        )
+
+    @staticmethod
+    def _record(row: tuple) -> Dict[str, Any]:
+        task_id, priority, status, task, result, error, _ = row
+        record = {
+            "id": task_id,
+            "priority": priority,
+            "status": status,
+            "task": json.loads(task)
+        }
+        if result is not None:
+            record["result"] = json.loads(result)
+        if error is not None:
+            record["error"] = error
+        return record
+
+    def save(self, task_data: Dict[str, Any]):
+        """Queue a task record for the next batched write"""
+        row = self._row(task_data)
+        with self._lock:
+            self._pending[row[0]] = row
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def save_many(self, tasks: list[Dict[str, Any]]):
+        """Queue many task records at once"""
+        rows = [self._row(task_data) for task_data in tasks]
+        with self._lock:
+            for row in rows:
+                self._pending[row[0]] = row
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        """Write all buffered records in a single transaction"""
+        with self._db_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                self._writing, self._pending = self._pending, {}
+            try:
+                with self._conn:
+                    self._conn.executemany(self._UPSERT, list(self._writing.values()))
+            except sqlite3.Error:
+                with self._lock:
+                    # Put the batch back unless newer versions were saved meanwhile
+                    self._pending = {**self._writing, **self._pending}
+                raise
+            finally:
+                with self._lock:
+                    self._writing = {}
+
+    def _flush_loop(self):
+        while not self._closed.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                logger.error(f"Failed to flush task records: {e}")
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Look up one task record by ID"""
+        with self._lock:
+            row = self._pending.get(task_id) or self._writing.get(task_id)
+        if row is None:
+            with self._db_lock:
+                row = self._conn.execute(
+                    "SELECT * FROM tasks WHERE id = ?", (task_id,)
+                ).fetchone()
+        return self._record(row) if row else None
+
+    def find_by_status(self, status: str, limit: Optional[int] = None) -> list[Dict[str, Any]]:
+        """Tasks with a given status, highest priority first"""
+        self.flush()
+        query = "SELECT * FROM tasks WHERE status = ? ORDER BY priority DESC, rowid"
+        params: tuple = (status,)
+        if limit is not None:
+            query += " LIMIT ?"
+            params += (limit,)
+        with self._db_lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [self._record(row) for row in rows]
+
+    def count_by_status(self) -> Dict[str, int]:
+        """Number of tasks per status"""
+        self.flush()
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM tasks GROUP BY status"
+            ).fetchall()
+        return dict(rows)
+
+    def iter_all(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over every stored task without loading them all at once"""
+        self.flush()
+        last_rowid = 0
+        while True:
+            with self._db_lock:
+                rows = self._conn.execute(
+                    "SELECT rowid, * FROM tasks WHERE rowid > ? ORDER BY rowid LIMIT 1000",
+                    (last_rowid,)
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._record(row[1:])
+            last_rowid = rows[-1][0]
+
+    def close(self):
+        """Flush outstanding writes and close the database"""
+        self._closed.set()
+        self._wakeup.set()
+        self._flusher.join()
+        self.flush()
+        self._conn.close()
@@ -1,47 +1,200 @@
-import gettext
 import os
+import ast
 import json
+import mmap
+import struct
+import tempfile
+from array import array
 from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+_MO_MAGIC = 0x950412de
+
+
+def parse_po(text: str) -> Dict[str, str]:
+    """Translated messages of a .po file; fuzzy and untranslated ones are skipped"""
+    messages: Dict[str, str] = {}
+    msgid = msgstr = None
+    section = None
+    fuzzy = False
+
+    def finish():
+        if msgid is not None and msgstr and not fuzzy:
+            messages[msgid] = msgstr
+
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith('#,') and 'fuzzy' in line:
+            finish()
+            msgid = msgstr = section = None
+            fuzzy = True
+        elif line.startswith('#') or not line:
+            continue
+        elif line.startswith('msgid '):
+            if section == 'msgstr':
+                finish()
+                fuzzy = False
+            msgid, msgstr, section = ast.literal_eval(line[6:]), '', 'msgid'
+        elif line.startswith('msgstr '):
+            msgstr, section = ast.literal_eval(line[7:]), 'msgstr'
+        elif line.startswith('"'):
+            if section == 'msgid':
+                msgid += ast.literal_eval(line)
+            elif section == 'msgstr':
+                msgstr += ast.literal_eval(line)
+        else:
+            # msgctxt and plural forms are not used by the UI
+            section = None
+    finish()
+    return messages
+
+
+def write_mo(messages: Dict[str, str], path: Path):
+    """Write a GNU .mo catalog (originals sorted, as lookups expect)"""
+    keys = sorted(k.encode('utf-8') for k in messages)
+    ids = strs = b''
+    offsets = []
+    for key in keys:
+        value = messages[key.decode('utf-8')].encode('utf-8')
+        offsets.append((len(ids), len(key), len(strs), len(value)))
+        ids += key + b'\0'
+        strs += value + b'\0'
+    key_start = 7 * 4 + 16 * len(keys)
+    value_start = key_start + len(ids)
+    key_table, value_table = [], []
+    for id_offset, id_length, str_offset, str_length in offsets:
+        key_table += [id_length, id_offset + key_start]
+        value_table += [str_length, str_offset + value_start]
+    output = struct.pack("Iiiiiii", _MO_MAGIC, 0, len(keys), 7 * 4,
+                         7 * 4 + len(keys) * 8, 0, 0)
+    output += array('i', key_table).tobytes() + array('i', value_table).tobytes() + ids + strs
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(output)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class MappedCatalog:
+    """Read-only view of a .mo file through mmap.
+
+    Nothing is decoded up front: each lookup binary-searches the sorted
+    original strings in the mapped file and decodes only the match. An
+    empty file, which cannot be mapped, is an empty catalog.
+    """
+
+    def __init__(self, path: Path):
+        self._map = None
+        self.count = 0
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return
+            if size < 7 * 4:
+                raise ValueError(f"Truncated .mo file: {path}")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic = struct.unpack_from('<I', self._map)[0]
+        self._order = '<' if magic == _MO_MAGIC else '>'
+        _, self.count, self._originals, self._translations = struct.unpack_from(
+            self._order + '4I', self._map, 4)
+
+    def _string(self, table: int, index: int) -> bytes:
+        length, offset = struct.unpack_from(self._order + '2I', self._map, table + 8 * index)
+        return self._map[offset:offset + length]
+
+    def lookup(self, message: str) -> Optional[str]:
+        key = message.encode('utf-8')
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            original = self._string(self._originals, middle)
+            if original < key:
+                low = middle + 1
+            elif original > key:
+                high = middle
+            else:
+                return self._string(self._translations, middle).decode('utf-8')
+        return None
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+
+
+def _default_cache_dir() -> Path:
+    cache_home = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(cache_home) / 'swarm-directive' / 'locales'
+
 
 class Localization:
-    def __init__(self, config_path):
+    """UI translations, loaded on first use of each language.
+
+    Catalogs come from ``locales/<lang>.po``, compiled once into ``.mo``
+    files under ``cache_dir`` (recompiled when the .po is newer), or from a
+    prebuilt ``locales/<lang>/LC_MESSAGES/messages.mo``. Translated strings
+    are memoised per language, so after ``translate_all`` a UI refresh is
+    plain dict lookups.
+    """
+
+    def __init__(self, config_path, locale_dir: Optional[Path] = None,
+                 cache_dir: Optional[Path] = None):
         self.config = self._load_config(config_path)
-        self.locale_dir = Path(__file__).parent.parent / 'locales'
-        self.translations = {}
+        self.locale_dir = Path(locale_dir or Path(__file__).resolve().parent.parent.parent / 'locales')
+        self.cache_dir = Path(cache_dir or _default_cache_dir())
+        self.catalogs: Dict[str, Optional[MappedCatalog]] = {}
+        self.strings: Dict[str, Dict[str, str]] = {}
         self.current_language = self.config['i18n']['default_language']
-        
-        self._setup_translations()
+        self._current = self.strings.setdefault(self.current_language, {})
 
     def _load_config(self, config_path):
         with open(config_path, 'r', encoding='utf-8') as f:
             return json.load(f)
 
-    def _setup_translations(self):
-        for lang in self.config['i18n']['available_languages']:
-            try:
-                translation = gettext.translation(
-                    'messages',
-                    localedir=str(self.locale_dir),
-                    languages=[lang]
-                )
-                self.translations[lang] = translation
-            except FileNotFoundError:
-                continue
-
-        self.set_language(self.current_language)
+    def _catalog(self, language: str) -> Optional[MappedCatalog]:
+        if language in self.catalogs:
+            return self.catalogs[language]
+        catalog = None
+        prebuilt = self.locale_dir / language / 'LC_MESSAGES' / 'messages.mo'
+        source = self.locale_dir / f'{language}.po'
+        if prebuilt.exists() and prebuilt.stat().st_size:
+            catalog = MappedCatalog(prebuilt)
+        elif source.exists():
+            compiled = self.cache_dir / f'{language}.mo'
+            if (not compiled.exists() or not compiled.stat().st_size or
+                    compiled.stat().st_mtime < source.stat().st_mtime):
+                write_mo(parse_po(source.read_text(encoding='utf-8')), compiled)
+            catalog = MappedCatalog(compiled)
+        elif prebuilt.exists():
+            # An empty prebuilt catalog leaves every message untranslated
+            catalog = MappedCatalog(prebuilt)
+        self.catalogs[language] = catalog
+        return catalog
 
     def set_language(self, language_code):
-        if language_code in self.translations:
-            self.translations[language_code].install()
-            self.current_language = language_code
-            return True
-        return False
+        if language_code not in self.get_available_languages():
+            return False
+        if self._catalog(language_code) is None:
+            return False
+        self.current_language = language_code
+        self._current = self.strings.setdefault(language_code, {})
+        return True
 
     def get_available_languages(self):
         return self.config['i18n']['available_languages']
 
     def gettext(self, message):
-        return _(message)
+        translated = self._current.get(message)
+        if translated is None:
+            catalog = self._catalog(self.current_language)
+            translated = (catalog.lookup(message) if catalog is not None else None) or message
+            self._current[message] = translated
+        return translated
 
-# Initialize global _ function
-_ = gettext.gettext
\ No newline at end of file
+    def translate_all(self, messages: Iterable[str]) -> Dict[str, str]:
+        """Translations of a whole set of UI strings for the current language"""
+        return {message: self.gettext(message) for message in messages}
@@ -0,0 +1,78 @@
+import sys
+import time
+import builtins
+import threading
+import importlib.util
+from typing import Dict, List, Tuple, Optional, TextIO
+
+
+class StartupProfiler:
+    """Import-time and startup-phase breakdown for ``--profile-startup``.
+
+    While installed, every first import of a module is timed through
+    ``builtins.__import__``. Inclusive time covers the modules it pulls in;
+    self time excludes them. ``mark`` records named phases such as the first
+    paint, measured from when the profiler was created.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        # module -> (inclusive seconds, self seconds, nesting depth)
+        self.imports: Dict[str, Tuple[float, float, int]] = {}
+        self.phases: List[Tuple[str, float]] = []
+        self._local = threading.local()
+        self._original_import = None
+
+    def install(self):
+        if self._original_import is None:
+            self._original_import = builtins.__import__
+            builtins.__import__ = self._import
+
+    def uninstall(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def mark(self, phase: str):
+        self.phases.append((phase, time.perf_counter() - self.started))
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        module = name
+        if level:
+            try:
+                module = importlib.util.resolve_name('.' * level + name,
+                                                     (globals or {}).get('__package__') or '')
+            except (ImportError, ValueError):
+                pass
+        if module in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            self.imports.setdefault(module, (elapsed, elapsed - children, len(stack)))
+
+    def report(self, out: Optional[TextIO] = None, limit: int = 15):
+        out = out or sys.stderr
+        print("Startup phases (seconds since launch):", file=out)
+        for phase, at in self.phases:
+            print(f"  {at:8.3f}  {phase}", file=out)
+
+        top_level = sorted(((t[0], m) for m, t in self.imports.items() if t[2] == 0), reverse=True)
+        print(f"Slowest top-level imports (inclusive, of {len(self.imports)} modules):", file=out)
+        for seconds, module in top_level[:limit]:
+            print(f"  {seconds:8.3f}  {module}", file=out)
+
+        by_self = sorted(((t[1], m) for m, t in self.imports.items()), reverse=True)
+        print("Slowest modules by self time:", file=out)
+        for seconds, module in by_self[:limit]:
+            print(f"  {seconds:8.3f}  {module}", file=out)
@@ -0,0 +1,123 @@
+import asyncio
+import pytest
+
+pytest.importorskip("playwright")
+
+from src.agent import AsyncAgent, perform_tasks
+from src.browser_pool import AsyncBrowserPool
+from src.openhands_client import AsyncOpenHandsClient
+
+class FakePage:
+    """Answers each command after ``delay`` seconds and records selector timeouts"""
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.fields = {}
+        self.timeouts = []
+        self.default_timeout = None
+        self.active = 0
+        self.peak = 0
+
+    def is_closed(self):
+        return False
+
+    def set_default_timeout(self, timeout):
+        self.default_timeout = timeout
+
+    async def goto(self, url):
+        pass
+
+    async def evaluate(self, script):
+        pass
+
+    async def wait_for_selector(self, selector, timeout=None):
+        self.timeouts.append((selector, timeout))
+        if selector == "#response-container":
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            try:
+                await asyncio.sleep(self.delay)
+            finally:
+                self.active -= 1
+            if self.fail:
+                raise TimeoutError("Timeout 1000ms exceeded")
+
+    async def fill(self, selector, value):
+        self.fields[selector] = value
+
+    async def click(self, selector):
+        pass
+
+    async def inner_text(self, selector):
+        return f"ran {self.fields['#command-input']}"
+
+class FakeContext:
+    def __init__(self, page):
+        self.page = page
+
+    async def new_page(self):
+        return self.page
+
+    async def clear_cookies(self):
+        pass
+
+    async def close(self):
+        pass
+
+class FakeBrowser:
+    def __init__(self, **page_options):
+        self.page_options = page_options
+        self.pages = []
+
+    async def new_context(self):
+        self.pages.append(FakePage(**self.page_options))
+        return FakeContext(self.pages[-1])
+
+def make_pool(**page_options):
+    pool = AsyncBrowserPool()
+    pool.browser = FakeBrowser(**page_options)
+    return pool
+
+@pytest.mark.asyncio
+async def test_async_client_applies_the_selector_timeout():
+    pool = make_pool()
+    client = AsyncOpenHandsClient("http://oh", pool, selector_timeout=2)
+    await client.connect()
+
+    assert await client.execute_command("build", {"target": "all"}) == "ran build"
+    page = client.page
+    assert page.default_timeout == 2000
+    assert page.timeouts == [("#openhands-container", 2000), ("#response-container", 2000)]
+    assert page.fields["#target-input"] == "all"
+    await client.close()
+
+@pytest.mark.asyncio
+async def test_async_client_returns_none_when_a_command_fails():
+    pool = make_pool(fail=True)
+    client = AsyncOpenHandsClient("http://oh", pool, selector_timeout=1)
+    await client.connect()
+    assert await client.execute_command("build") is None
+
+    agent = AsyncAgent("coder", client)
+    assert await agent.perform_task({"command": "build"}) == {
+        "status": "failed", "error": "No result returned"
+    }
+
+@pytest.mark.asyncio
+async def test_perform_tasks_spreads_work_over_agents_concurrently():
+    pool = make_pool(delay=0.02)
+    agents = [await AsyncAgent.create(f"agent{i}", "http://oh", pool) for i in range(3)]
+
+    results = await perform_tasks(agents, [{"command": f"t{i}"} for i in range(6)])
+
+    assert [r["result"] for r in results] == [f"ran t{i}" for i in range(6)]
+    # One page per agent, and commands on one page never overlap
+    assert len(pool.browser.pages) == 3
+    assert all(page.peak == 1 for page in pool.browser.pages)
+    for agent in agents:
+        await agent.shutdown()
+
+@pytest.mark.asyncio
+async def test_perform_tasks_needs_an_agent():
+    with pytest.raises(ValueError):
+        await perform_tasks([], [{"command": "build"}])
@@ -0,0 +1,111 @@
+import os
+import json
+import time
+import asyncio
+import contextlib
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+from core.config_manager import ConfigManager  # noqa: E402
+from core.agent_manager import AgentManager  # noqa: E402
+
+DELAYS = {"fast": 0.05, "medium": 0.1, "slow": 0.2, "stuck": 10}
+
+async def fake_run(agent, input, **kwargs):
+    if input == "fail":
+        raise RuntimeError(f"{agent.name} failed")
+    await asyncio.sleep(DELAYS[agent.name])
+    return f"{agent.name}: {input}"
+
+@pytest.fixture
+def manager(tmp_path):
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps({
+        "litellm": {"models": [], "default_model": "test-model", "max_concurrent_requests": 10},
+        "monitoring": {"prometheus": {"enabled": False}}
+    }))
+    manager = AgentManager(ConfigManager(str(config_path)))
+    for name in DELAYS:
+        manager.create_agent(name, "test")
+    return manager
+
+@pytest.mark.asyncio
+async def test_broadcast_yields_in_completion_order(manager):
+    started = time.monotonic()
+    with patch('core.agent_manager.Runner.run', side_effect=fake_run):
+        results = [r async for r in manager.broadcast("go", ["slow", "fast", "medium"])]
+
+    assert [r.agent for r in results] == ["fast", "medium", "slow"]
+    assert all(r.ok for r in results)
+    # Close to the slowest agent, not the sum
+    assert time.monotonic() - started < 0.3
+
+@pytest.mark.asyncio
+async def test_timeouts_and_failures_do_not_stop_other_agents(manager):
+    jobs = [("stuck", "go"), ("fast", "fail"), ("medium", "go")]
+    with patch('core.agent_manager.Runner.run', side_effect=fake_run):
+        results = {r.agent: r async for r in manager.run_many(jobs, timeout=0.3)}
+
+    assert isinstance(results["stuck"].error, TimeoutError)
+    assert isinstance(results["fast"].error, RuntimeError)
+    assert results["medium"].output == "medium: go"
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded(manager):
+    running = peak = 0
+
+    async def counting_run(agent, input, **kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    with patch('core.agent_manager.Runner.run', side_effect=counting_run):
+        results = [r async for r in manager.run_many([("fast", str(i)) for i in range(8)],
+                                                     max_concurrency=3)]
+    assert len(results) == 8
+    assert peak == 3
+
+@pytest.mark.asyncio
+async def test_closing_the_stream_cancels_remaining_runs(manager):
+    with patch('core.agent_manager.Runner.run', side_effect=fake_run):
+        stream = manager.broadcast("go", ["fast", "stuck"])
+        first = await stream.__anext__()
+        await asyncio.wait_for(stream.aclose(), 1)
+    assert first.agent == "fast"
+    assert manager.litellm_manager.admission.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_admission_is_held_per_llm_call_not_per_run(manager):
+    admission = manager.litellm_manager.admission
+    held = []
+
+    async def multi_turn_run(agent, input, hooks, **kwargs):
+        for turn in range(3):
+            await hooks.on_llm_start(None, agent, None, [])
+            held.append(admission.in_flight)
+            await hooks.on_llm_end(None, agent, SimpleNamespace(usage=None))
+            # A tool call between turns holds no slot
+            held.append(admission.in_flight)
+        await hooks.on_llm_start(None, agent, None, [])
+        raise RuntimeError("provider down")
+
+    with patch('core.agent_manager.Runner.run', side_effect=multi_turn_run):
+        with pytest.raises(RuntimeError):
+            await manager.run_agent("fast", "go")
+
+    assert held == [1, 0] * 3
+    assert admission.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_breaking_out_inside_aclosing_cancels_remaining_runs(manager):
+    with patch('core.agent_manager.Runner.run', side_effect=fake_run):
+        results = manager.broadcast("go", ["fast", "stuck"])
+        async with contextlib.aclosing(results):
+            async for result in results:
+                break
+    assert result.agent == "fast"
+    assert manager.litellm_manager.admission.in_flight == 0
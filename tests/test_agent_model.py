@@ -0,0 +1,49 @@
+import pytest
+
+QtCore = pytest.importorskip("PySide6.QtCore")
+from gui.agent_model import AgentTableModel, AgentFilterModel
+from gui.workers import WorkUpdate
+
+class StubAgent:
+    def __init__(self, model):
+        self.model = model
+
+@pytest.fixture
+def model():
+    model = AgentTableModel()
+    model.reset({f"agent-{i}": StubAgent("gpt-4" if i % 2 else "claude") for i in range(5)})
+    return model
+
+def test_remove_notifies_single_row_and_reindexes(model):
+    removed = []
+    model.rowsRemoved.connect(lambda parent, first, last: removed.append((first, last)))
+    model.remove_agent("agent-1")
+    assert removed == [(1, 1)]
+    assert model.rowCount() == 4
+    assert model.row_of("agent-4") == 3
+    assert model.name_at(model.row_of("agent-2")) == "agent-2"
+
+def test_updates_only_signal_changed_columns(model):
+    changes = []
+    model.dataChanged.connect(lambda top, bottom, roles: changes.append(
+        (top.row(), top.column(), bottom.column())))
+    model.apply_updates({"agent-3": WorkUpdate("running", in_flight=1)})
+    model.apply_updates({"agent-3": WorkUpdate("running", in_flight=1)})
+    model.apply_updates({"agent-3": WorkUpdate("done", elapsed=1.5)})
+    assert changes == [
+        (3, AgentTableModel.STATE, AgentTableModel.IN_FLIGHT),
+        (3, AgentTableModel.STATE, AgentTableModel.LATENCY),
+    ]
+    assert model.data(model.index(3, AgentTableModel.LATENCY)) == "1.50 s"
+
+def test_proxy_filters_and_sorts_numerically(model):
+    proxy = AgentFilterModel(model)
+    proxy.set_filter_text("GPT")
+    assert sorted(proxy.name_at(proxy.index(r, 0)) for r in range(proxy.rowCount())) == [
+        "agent-1", "agent-3"]
+
+    proxy.set_filter_text("")
+    for name, latency in (("agent-0", 10.0), ("agent-1", 2.0), ("agent-2", 9.5)):
+        model.update_agent(name, latency=latency)
+    proxy.sort(AgentTableModel.LATENCY, QtCore.Qt.DescendingOrder)
+    assert [proxy.name_at(proxy.index(r, 0)) for r in range(3)] == ["agent-0", "agent-2", "agent-1"]
@@ -0,0 +1,157 @@
+import pytest
+
+pytest.importorskip("playwright")
+
+import os
+from src.browser_pool import BrowserPool, AsyncBrowserPool, ProcessTreeRss, process_tree_rss
+from src.openhands_client import OpenHandsClient, AsyncOpenHandsClient
+
+class FakePage:
+    """Records navigation and keeps per-page state like a real tab would"""
+    def __init__(self):
+        self.url = "about:blank"
+        self.state = {}
+        self.visits = []
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+    def set_default_timeout(self, timeout):
+        self.timeout = timeout
+
+    def goto(self, url):
+        self.url = url
+        self.state = {}
+        self.visits.append(url)
+
+    def evaluate(self, script):
+        self.state.pop("storage", None)
+
+    def wait_for_selector(self, selector, timeout=None):
+        pass
+
+class FakeContext:
+    def __init__(self):
+        self.cookies = {"session": "secret"}
+        self.closed = False
+
+    def new_page(self):
+        self.page = FakePage()
+        return self.page
+
+    def clear_cookies(self):
+        self.cookies = {}
+
+    def close(self):
+        self.closed = True
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+
+    def new_context(self):
+        self.contexts.append(FakeContext())
+        return self.contexts[-1]
+
+class AsyncFakePage(FakePage):
+    async def goto(self, url):
+        FakePage.goto(self, url)
+
+    async def evaluate(self, script):
+        FakePage.evaluate(self, script)
+
+    async def wait_for_selector(self, selector, timeout=None):
+        pass
+
+class AsyncFakeContext(FakeContext):
+    async def new_page(self):
+        self.page = AsyncFakePage()
+        return self.page
+
+    async def clear_cookies(self):
+        FakeContext.clear_cookies(self)
+
+    async def close(self):
+        FakeContext.close(self)
+
+class AsyncFakeBrowser(FakeBrowser):
+    async def new_context(self):
+        self.contexts.append(AsyncFakeContext())
+        return self.contexts[-1]
+
+@pytest.fixture
+def pool():
+    pool = BrowserPool(max_idle=1)
+    pool.browser = FakeBrowser()
+    return pool
+
+def test_released_lease_is_reused_for_the_same_url(pool):
+    first = pool.acquire("a", "http://oh")
+    pool.release(first)
+    second = pool.acquire("b", "http://oh")
+    other = pool.acquire("c", "http://other")
+
+    assert second is first and second.warm
+    assert other is not first and not other.warm
+    assert pool.get_stats("b")["warm"] is True
+
+def test_warm_lease_carries_no_state_into_the_next_agent(pool):
+    client = OpenHandsClient("http://oh", pool=pool, agent_id="a")
+    client.connect()
+    client.page.state = {"dom": "half-filled form", "storage": "token"}
+    client.close()
+
+    lease = client.lease
+    assert lease.context.cookies == {}
+    assert lease.page.url == "about:blank" and lease.page.state == {}
+
+    again = OpenHandsClient("http://oh", pool=pool, agent_id="b")
+    again.connect()
+    assert again.lease is lease
+    assert lease.page.visits == ["http://oh", "about:blank", "http://oh"]
+
+def test_release_closes_when_the_pool_is_full(pool):
+    kept, extra = pool.acquire("a", "http://oh"), pool.acquire("b", "http://oh")
+    pool.release(kept)
+    pool.release(extra)
+    assert not kept.context.closed and extra.context.closed
+
+@pytest.mark.asyncio
+async def test_async_pool_reuses_and_resets_leases():
+    pool = AsyncBrowserPool(max_idle=1)
+    pool.browser = AsyncFakeBrowser()
+    client = AsyncOpenHandsClient("http://oh", pool, agent_id="a")
+    await client.connect()
+    client.page.state = {"dom": "left over"}
+    lease = client.lease
+    await client.close()
+
+    again = AsyncOpenHandsClient("http://oh", pool, agent_id="b")
+    await again.connect()
+    assert again.lease is lease and lease.warm
+    assert lease.context.cookies == {} and lease.page.state == {}
+    assert lease.page.visits == ["http://oh", "about:blank", "http://oh"]
+
+def test_warm_acquires_do_not_rescan_proc(pool, monkeypatch):
+    scans = []
+    listdir = os.listdir
+
+    def counting_listdir(path):
+        if path == '/proc':
+            scans.append(path)
+        return listdir(path)
+    monkeypatch.setattr(os, "listdir", counting_listdir)
+
+    pool.release(pool.acquire("a", "http://oh"))
+    cold = len(scans)
+    for agent in "bcde":
+        pool.release(pool.acquire(agent, "http://oh"))
+    assert len(scans) == cold <= 2
+    assert pool.get_stats("e")["rss_bytes"] > 0
+
+def test_cached_tree_matches_a_full_scan():
+    sampler = ProcessTreeRss(rescan_interval=60)
+    first = sampler()
+    assert first > 0 and os.getpid() in sampler._pids
+    assert abs(sampler() - process_tree_rss()) < 64 * 1024 * 1024
@@ -0,0 +1,139 @@
+import json
+import time
+import threading
+import pytest
+from core import config_manager
+from core.config_manager import ConfigManager
+
+def make_config(tmp_path, models=3):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({
+        "litellm": {"models": [{"name": f"model-{i}", "timeout": i} for i in range(models)]},
+        "openhands": {"endpoints": [{"name": "primary", "url": "ws://localhost:3000"}]}
+    }))
+    return ConfigManager(str(path))
+
+def test_indexed_lookup_by_name(tmp_path):
+    config = make_config(tmp_path)
+    assert config.get_model("model-2")["timeout"] == 2
+    assert config.get_model("missing") is None
+    assert config.get_endpoint("primary")["url"] == "ws://localhost:3000"
+
+def test_set_invalidates_cached_values_and_indexes(tmp_path):
+    config = make_config(tmp_path)
+    assert config.get("litellm.default_model", "none") == "none"
+    assert config.get_model("model-0") is not None
+
+    config.set("litellm.default_model", "model-1")
+    config.set("litellm.models", [{"name": "replacement"}])
+
+    assert config.get("litellm.default_model") == "model-1"
+    assert config.get_model("model-0") is None
+    assert config.get_model("replacement") == {"name": "replacement"}
+
+def test_setting_a_parent_invalidates_child_paths(tmp_path):
+    config = make_config(tmp_path)
+    assert config.get("openhands.endpoints")[0]["name"] == "primary"
+    config.set("openhands", {"endpoints": []})
+    assert config.get("openhands.endpoints") == []
+    assert config.get_endpoint("primary") is None
+
+def test_get_racing_a_set_does_not_cache_the_old_value(tmp_path, monkeypatch):
+    config = make_config(tmp_path)
+    resolve = config._resolve
+    writer = threading.Thread(target=config.set, args=("openhands.endpoints", []))
+
+    def slow_resolve(key_path):
+        value = resolve(key_path)
+        # The set lands between reading the value and caching it
+        writer.start()
+        writer.join(0.1)
+        return value
+    monkeypatch.setattr(config, "_resolve", slow_resolve)
+    config.get("openhands.endpoints")
+    writer.join()
+    monkeypatch.undo()
+    assert config.get("openhands.endpoints") == []
+
+def read_file(tmp_path):
+    return json.loads((tmp_path / "config.json").read_text())
+
+def test_batch_writes_once(tmp_path):
+    config = make_config(tmp_path)
+    with config.batch():
+        for i in range(1000):
+            config.set("litellm.default_model", f"model-{i}")
+    assert config.writes == 1
+    assert read_file(tmp_path)["litellm"]["default_model"] == "model-999"
+
+def test_failed_batch_rolls_back(tmp_path):
+    config = make_config(tmp_path)
+    try:
+        with config.batch():
+            config.set("litellm.default_model", "half-done")
+            raise RuntimeError("abort")
+    except RuntimeError:
+        pass
+    assert config.get("litellm.default_model") is None
+    assert config.writes == 0
+
+def test_sets_are_debounced_into_one_background_write(tmp_path):
+    config = make_config(tmp_path)
+    config.flush_delay = 0.05
+    for i in range(100):
+        config.set("ui.font_size", i)
+    assert config.writes == 0
+    time.sleep(0.3)
+    assert config.writes == 1
+    assert read_file(tmp_path)["ui"]["font_size"] == 99
+    assert not list(tmp_path.glob("*.tmp"))
+    config.close()
+
+def test_subscribers_see_set_and_external_edits(tmp_path):
+    config = make_config(tmp_path)
+    seen = []
+    config.subscribe("openhands.endpoints", seen.append)
+    config.set("openhands.endpoints", [])
+    config.set("litellm.default_model", "unrelated")
+    assert seen == [[]]
+
+    external = read_file(tmp_path)
+    external["openhands"]["endpoints"] = [{"name": "added"}]
+    (tmp_path / "config.json").write_text(json.dumps(external))
+    assert config.reload()
+    assert seen[-1] == [{"name": "added"}]
+    assert config.get_endpoint("added") == {"name": "added"}
+
+def test_parent_path_subscribers_see_child_changes(tmp_path):
+    config = make_config(tmp_path)
+    seen = []
+    config.subscribe("openhands", seen.append)
+    config.set("openhands.default_timeout", 5)
+    config.set("openhands.default_timeout", 5)
+    assert len(seen) == 1 and seen[0]["default_timeout"] == 5
+
+@pytest.mark.parametrize("inotify", [True, False])
+def test_watch_picks_up_edits_but_not_own_writes(tmp_path, monkeypatch, inotify):
+    if inotify:
+        pytest.importorskip("watchdog")
+    else:
+        monkeypatch.setattr(config_manager, "_inotify_observer", lambda manager: None)
+    config = make_config(tmp_path)
+    config.watch(poll_interval=0.02)
+    seen = []
+    config.subscribe("litellm.default_model", seen.append)
+    try:
+        with config.batch():
+            config.set("litellm.default_model", "ours")
+        time.sleep(0.2)
+        assert seen == ["ours"]
+
+        external = read_file(tmp_path)
+        external["litellm"]["default_model"] = "theirs"
+        (tmp_path / "config.json").write_text(json.dumps(external))
+        deadline = time.monotonic() + 3
+        while seen[-1] != "theirs" and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert seen == ["ours", "theirs"]
+    finally:
+        config.close()
@@ -0,0 +1,185 @@
+import json
+import asyncio
+import pytest
+from core.config_manager import ConfigManager
+from daemon import (ControlServer, Daemon, DaemonClient, DaemonError, RemoteAgentManager,
+                    RemoteResult, parse_address)
+
+class StubAgent:
+    model = "gpt-4"
+
+class StubAgentManager:
+    def __init__(self):
+        self.agents = {"alpha": StubAgent(), "beta team": StubAgent()}
+
+    async def run_many(self, jobs, max_concurrency=None, timeout=None):
+        for agent_name, _ in jobs:
+            if agent_name not in self.agents:
+                raise ValueError(f"Agent {agent_name} not found")
+        for agent_name, input_text in jobs:
+            if input_text == "fail":
+                yield RemoteResult(agent_name, input_text, error=RuntimeError("boom"))
+            else:
+                yield RemoteResult(agent_name, input_text, f"{agent_name}: {input_text}", elapsed=0.1)
+
+    def remove_agent(self, agent_name):
+        self.agents.pop(agent_name, None)
+
+@pytest.fixture
+async def daemon(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "config.json").write_text(json.dumps({
+        "openhands": {"endpoints": []},
+        "daemon": {"token": "secret", "task_store": str(tmp_path / "tasks.db"), "drain_timeout": 0.1}
+    }))
+    config = ConfigManager(str(tmp_path / "config.json"))
+    daemon = Daemon(config, StubAgentManager, address=f"unix:{tmp_path / 'd.sock'}")
+    await daemon.start()
+    yield daemon
+    await daemon.stop()
+    config.close()
+
+def test_parse_address():
+    assert parse_address("unix:/run/sd.sock") == ("unix", "/run/sd.sock")
+    assert parse_address("127.0.0.1:8765") == ("tcp", ("127.0.0.1", 8765))
+    with pytest.raises(ValueError):
+        parse_address("localhost")
+
+@pytest.mark.asyncio
+async def test_bulk_task_submission(daemon):
+    client = DaemonClient(daemon.address, token="secret")
+    ids = await client.submit_tasks([{"command": "echo", "parameters": {"n": i}} for i in range(200)], priority=3)
+    assert len(set(ids)) == 200
+    task = await client.task(ids[0])
+    assert task["priority"] == 3
+    assert task["status"] in ("queued", "in_progress")
+    with pytest.raises(DaemonError) as error:
+        await client.task("missing")
+    assert error.value.status == 404
+    with pytest.raises(DaemonError) as error:
+        await client.request("POST", "/tasks", {"tasks": "not a list"})
+    assert error.value.status == 400
+
+@pytest.mark.asyncio
+async def test_requests_need_the_token(daemon):
+    with pytest.raises(DaemonError) as error:
+        await DaemonClient(daemon.address, token="wrong").status()
+    assert error.value.status == 401
+
+@pytest.mark.asyncio
+async def test_remote_agent_manager_runs_on_the_daemon(daemon):
+    client = DaemonClient(daemon.address, token="secret")
+    remote = RemoteAgentManager(client, await client.agents())
+    assert set(remote.agents) == {"alpha", "beta team"}
+
+    assert await remote.run_agent("alpha", "hello") == "alpha: hello"
+    results = {r.agent: r async for r in remote.broadcast("fail")}
+    assert set(results) == {"alpha", "beta team"}
+    assert not results["alpha"].ok and "boom" in str(results["alpha"].error)
+    with pytest.raises(DaemonError) as error:
+        await client.run([("nobody", "hi")])
+    assert error.value.status == 404
+
+    await client.remove_agent("beta team")
+    assert [a["name"] for a in await client.agents()] == ["alpha"]
+    assert (await client.status())["agents"] == 1
+
+async def send_raw(daemon, data):
+    reader, writer = await asyncio.open_unix_connection(daemon.address[5:])
+    writer.write(data)
+    await writer.drain()
+    try:
+        return await asyncio.wait_for(reader.read(), 5)
+    finally:
+        writer.close()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("headers", [
+    b"Content-Length: ten\r\n",
+    b"Content-Length: -1\r\n",
+    b"X-Padding: " + b"a" * 70000 + b"\r\n",
+])
+async def test_malformed_requests_get_400(daemon, headers):
+    response = await send_raw(daemon, b"GET /status HTTP/1.1\r\n" + headers + b"\r\n")
+    assert response.startswith(b"HTTP/1.1 400 ")
+
+@pytest.mark.asyncio
+async def test_idle_connections_are_closed(daemon):
+    daemon.server.idle_timeout = 0.05
+    assert await send_raw(daemon, b"") == b""
+
+@pytest.mark.asyncio
+async def test_public_address_needs_a_token():
+    with pytest.raises(ValueError):
+        await ControlServer().start("0.0.0.0:0")
+    server = ControlServer(token="secret")
+    await server.start("0.0.0.0:0")
+    await server.close()
+    server = ControlServer()
+    await server.start("127.0.0.1:0")
+    await server.close()
+
+@pytest.mark.asyncio
+async def test_failed_start_still_releases_resources(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    config = ConfigManager(str(tmp_path / "config.json"))
+    daemon = Daemon(config, StubAgentManager, address="unix:/nonexistent/dir/d.sock")
+    stopped = []
+
+    async def stop():
+        stopped.append(True)
+    monkeypatch.setattr(daemon, "stop", stop)
+    with pytest.raises(OSError):
+        await daemon.run()
+    assert stopped == [True]
+    await Daemon.stop(daemon)
+    config.close()
+
+class SlowClient:
+    def __init__(self):
+        self.active = self.peak = self.cancelled = 0
+
+    async def run(self, jobs, timeout=None):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.01)
+            return [{"agent": jobs[0][0], "input": jobs[0][1], "output": "ok",
+                     "error": None, "elapsed": 0.01}]
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.active -= 1
+
+@pytest.mark.asyncio
+async def test_remote_broadcast_is_bounded_and_cancels_on_close():
+    client = SlowClient()
+    agents = [{"name": f"agent{i}", "model": "gpt-4"} for i in range(6)]
+    remote = RemoteAgentManager(client, agents, max_parallel=2)
+    assert len([r async for r in remote.broadcast("hi")]) == 6
+    assert client.peak == 2
+
+    results = remote.broadcast("hi")
+    await anext(results)
+    await results.aclose()
+    assert client.active == 0 and client.cancelled >= 1
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path, payload", [
+    ("/tasks", [{"command": "echo"}]),
+    ("/tasks", {"tasks": [{"command": "echo"}], "priority": "high"}),
+    ("/runs", ["alpha", "hi"]),
+    ("/runs", {"jobs": [["alpha", "hi"]], "timeout": "soon"}),
+])
+async def test_malformed_bodies_get_400(daemon, path, payload):
+    client = DaemonClient(daemon.address, token="secret")
+    with pytest.raises(DaemonError) as error:
+        await client.request("POST", path, payload)
+    assert error.value.status == 400
+
+@pytest.mark.asyncio
+async def test_stop_stops_the_config_watcher(daemon):
+    assert daemon.config._watcher is not None
+    await daemon.stop()
+    assert daemon.config._watcher is None
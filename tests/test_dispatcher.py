@@ -0,0 +1,93 @@
+import asyncio
+import pytest
+from core.dispatcher import TaskDispatcher
+from core.scheduler import EndpointScheduler
+from core.openhands_client import OpenHandsEndpoint
+from task_queue import TaskQueue
+
+class StubClient:
+    """Stands in for OpenHandsClient and records peak concurrency"""
+    def __init__(self, endpoint_names, delay=0.01, fail_on=()):
+        self.endpoints = [
+            OpenHandsEndpoint(name=name, url=f"ws://{name}", api_key="",
+                              timeout=30, active=True)
+            for name in endpoint_names
+        ]
+        self.scheduler = EndpointScheduler()
+        self.delay = delay
+        self.fail_on = set(fail_on)
+        self.active = 0
+        self.peak = 0
+
+    def get_active_endpoints(self):
+        return [e for e in self.endpoints if e.active]
+
+    async def send_command(self, endpoint, command, params=None):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if command in self.fail_on:
+                raise ConnectionError("boom")
+            return {"endpoint": endpoint.name, "command": command}
+        finally:
+            self.active -= 1
+
+@pytest.mark.asyncio
+async def test_dispatcher_runs_tasks_concurrently_and_drains():
+    client = StubClient(["a", "b"])
+    task_queue = TaskQueue()
+    dispatcher = TaskDispatcher(client, task_queue, workers_per_endpoint=2,
+                                max_in_flight=4, max_queue_size=8)
+    await dispatcher.start()
+    task_ids = [await dispatcher.submit({"command": f"cmd-{i}"}) for i in range(40)]
+    await dispatcher.drain(timeout=5)
+
+    statuses = [task_queue.get_status(task_id)["status"] for task_id in task_ids]
+    assert statuses == ["completed"] * 40
+    assert 1 < client.peak <= 2 * 2 * 4
+    assert not dispatcher.running
+
+@pytest.mark.asyncio
+async def test_dispatcher_records_failures():
+    client = StubClient(["a"], fail_on={"bad"})
+    task_queue = TaskQueue()
+    dispatcher = TaskDispatcher(client, task_queue, workers_per_endpoint=1)
+    await dispatcher.start()
+    good = await dispatcher.submit({"command": "good"})
+    bad = await dispatcher.submit({"command": "bad"})
+    await dispatcher.drain(timeout=5)
+
+    assert task_queue.get_status(good)["status"] == "completed"
+    assert task_queue.get_status(bad)["status"] == "failed"
+    assert task_queue.get_status(bad)["error"] == "boom"
+
+@pytest.mark.asyncio
+async def test_concurrent_submitters_respect_the_backlog_bound():
+    client = StubClient(["a"], delay=0.005)
+    task_queue = TaskQueue()
+    dispatcher = TaskDispatcher(client, task_queue, workers_per_endpoint=1,
+                                max_in_flight=1, max_queue_size=4)
+    await dispatcher.start()
+    peak = 0
+
+    async def watch():
+        nonlocal peak
+        while True:
+            peak = max(peak, dispatcher.max_queue_size - dispatcher._room())
+            await asyncio.sleep(0)
+
+    watcher = asyncio.create_task(watch())
+    batches = await asyncio.gather(
+        *(dispatcher.submit({"command": f"one-{i}"}) for i in range(10)),
+        *(dispatcher.submit_many([{"command": f"many-{i}-{j}"} for j in range(6)])
+          for i in range(3))
+    )
+    watcher.cancel()
+    await dispatcher.drain(timeout=5)
+
+    assert peak <= 4
+    assert len(batches) == 13 and all(len(batch) == 6 for batch in batches[10:])
+    assert task_queue.get_all_status() and all(
+        status["status"] == "completed" for status in task_queue.get_all_status().values()
+    )
@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import pytest
+
+QtCore = pytest.importorskip("PySide6.QtCore")
+from gui.workers import UpdateCoalescer, Workers
+from log_writer import BatchedLogWriter
+from monitor import Monitor
+from core.timeseries import MetricsSampler
+
+@pytest.fixture(scope="module")
+def app():
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+def test_updates_keep_latest_value_per_key(app):
+    coalescer = UpdateCoalescer(max_fps=30)
+    batches = []
+    coalescer.updates.connect(batches.append)
+    for i in range(100):
+        coalescer.post(f"agent-{i % 10}", i)
+    coalescer.flush()
+    coalescer.flush()
+    assert batches == [{f"agent-{i}": 90 + i for i in range(10)}]
+
+def test_burst_is_delivered_in_one_batch(app):
+    coalescer = UpdateCoalescer(max_fps=1000)
+    batches = []
+    coalescer.updates.connect(batches.append)
+    for i in range(500):
+        coalescer.post(i, "running")
+    deadline = QtCore.QDeadlineTimer(1000)
+    while not batches and not deadline.hasExpired():
+        app.processEvents()
+    assert len(batches) == 1 and len(batches[0]) == 500
+
+class RecordingCoalescer:
+    def __init__(self):
+        self.posts = []
+
+    def post(self, key, value):
+        self.posts.append((key, value))
+
+@pytest.fixture
+async def workers():
+    workers = Workers(RecordingCoalescer(), asyncio.get_running_loop())
+    yield workers
+    workers.shutdown()
+
+async def test_run_posts_running_then_the_outcome(workers):
+    async def succeed():
+        return 42
+
+    async def fail():
+        raise ValueError("boom")
+
+    await workers.run("a", succeed())
+    await workers.run("b", fail())
+
+    states = [(key, update.state, update.in_flight) for key, update in workers.coalescer.posts]
+    assert states == [("a", "running", 1), ("a", "done", 0),
+                      ("b", "running", 1), ("b", "failed", 0)]
+    done, failed = workers.coalescer.posts[1][1], workers.coalescer.posts[3][1]
+    assert done.result == 42 and done.elapsed is not None
+    assert isinstance(failed.error, ValueError)
+    assert workers.in_flight == {} and workers.tasks == set()
+
+async def test_cancelled_run_posts_cancelled(workers):
+    task = workers.run("a", asyncio.sleep(10))
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert [u.state for _, u in workers.coalescer.posts] == ["running", "cancelled"]
+    assert workers.in_flight == {} and workers.tasks == set()
+
+async def test_overlapping_runs_stay_running_until_the_last_ends(workers):
+    release = asyncio.Event()
+
+    async def quick():
+        return "quick"
+
+    slow = workers.run("a", release.wait())
+    await asyncio.sleep(0)
+    await workers.run("a", quick())
+    assert [(u.state, u.in_flight) for _, u in workers.coalescer.posts] == [
+        ("running", 1), ("running", 2), ("running", 1)
+    ]
+    release.set()
+    await slow
+    assert workers.coalescer.posts[-1][1].state == "done"
+
+async def test_run_blocking_uses_the_worker_pool(workers):
+    name = await workers.run_blocking(lambda: threading.current_thread().name)
+    assert name.startswith("gui-worker")
+
+async def test_agent_runs_reach_the_dashboard_charts(workers, tmp_path):
+    monitor = Monitor(BatchedLogWriter(str(tmp_path / "tasks.ndjson")))
+    workers.monitor = monitor
+    sampler = MetricsSampler(monitor)
+
+    async def succeed():
+        return "ok"
+
+    async def fail():
+        raise ValueError("boom")
+
+    await workers.run("coder", succeed())
+    await workers.run("coder", fail())
+    sampler.sample()
+
+    assert monitor.metrics["tasks_completed"] == 1 and monitor.metrics["tasks_failed"] == 1
+    assert set(monitor.get_latency()["agent"]) == {"coder"}
+    assert sampler.series["throughput"]["tasks/s"].points()[1][0] > 0
+    assert set(sampler.series["latency"]) == {"p50", "p95", "p99"}
+    monitor.close()
@@ -0,0 +1,88 @@
+import json
+import gettext
+import pytest
+from utils.i18n import Localization, parse_po, write_mo, MappedCatalog
+
+PO = '''msgid ""
+msgstr ""
+"Content-Type: text/plain; charset=UTF-8\\n"
+
+msgid "Settings"
+msgstr "Einstellungen"
+
+#, fuzzy
+msgid "Theme"
+msgstr "Thema"
+
+msgid "Add Agent"
+msgstr ""
+"Agent "
+"hinzufügen"
+
+msgid "Untranslated"
+msgstr ""
+'''
+
+@pytest.fixture
+def localization(tmp_path):
+    locales = tmp_path / "locales"
+    locales.mkdir()
+    (locales / "de_DE.po").write_text(PO, encoding="utf-8")
+    (locales / "en_US.po").write_text("", encoding="utf-8")
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps({"i18n": {
+        "available_languages": ["en_US", "de_DE", "fr_FR"], "default_language": "en_US"
+    }}))
+    return Localization(config, locale_dir=locales, cache_dir=tmp_path / "cache")
+
+def test_parse_po_skips_fuzzy_and_untranslated():
+    messages = parse_po(PO)
+    assert messages["Settings"] == "Einstellungen"
+    assert messages["Add Agent"] == "Agent hinzufügen"
+    assert "Theme" not in messages
+    assert "Untranslated" not in messages
+
+def test_compiled_catalog_matches_gettext(tmp_path):
+    path = tmp_path / "de.mo"
+    write_mo(parse_po(PO), path)
+    with open(path, "rb") as f:
+        reference = gettext.GNUTranslations(f)
+    catalog = MappedCatalog(path)
+    for message in ("Settings", "Add Agent", "Theme", "missing"):
+        assert (catalog.lookup(message) or message) == reference.gettext(message)
+
+def test_languages_load_lazily(localization, tmp_path):
+    assert localization.catalogs == {}
+    assert localization.gettext("Settings") == "Settings"
+    assert set(localization.catalogs) == {"en_US"}
+
+    assert localization.set_language("de_DE")
+    assert localization.translate_all(["Settings", "Add Agent"]) == {
+        "Settings": "Einstellungen", "Add Agent": "Agent hinzufügen"
+    }
+    assert (tmp_path / "cache" / "de_DE.mo").exists()
+    assert not localization.set_language("fr_FR")
+    assert localization.current_language == "de_DE"
+
+def test_failed_write_leaves_no_temp_file(tmp_path, monkeypatch):
+    def fail(src, dst):
+        raise OSError("disk full")
+    monkeypatch.setattr("utils.i18n.os.replace", fail)
+    with pytest.raises(OSError):
+        write_mo({"Settings": "Einstellungen"}, tmp_path / "de.mo")
+    assert list(tmp_path.iterdir()) == []
+
+def test_empty_mo_falls_back_to_the_po(localization):
+    prebuilt = localization.locale_dir / "de_DE" / "LC_MESSAGES" / "messages.mo"
+    prebuilt.parent.mkdir(parents=True)
+    prebuilt.touch()
+    assert localization.set_language("de_DE")
+    assert localization.gettext("Settings") == "Einstellungen"
+
+def test_empty_mo_without_a_po_is_an_empty_catalog(localization):
+    prebuilt = localization.locale_dir / "fr_FR" / "LC_MESSAGES" / "messages.mo"
+    prebuilt.parent.mkdir(parents=True)
+    prebuilt.touch()
+    assert localization.set_language("fr_FR")
+    assert localization.gettext("Settings") == "Settings"
+    localization.catalogs["fr_FR"].close()
@@ -0,0 +1,227 @@
+import os
+import json
+import asyncio
+import threading
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from prometheus_client import REGISTRY
+
+# Keep litellm from fetching its model price list over the network on import
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+from core.config_manager import ConfigManager  # noqa: E402
+from core.litellm_manager import LiteLLMManager  # noqa: E402
+from core.response_cache import ResponseCache  # noqa: E402
+import litellm  # noqa: E402
+
+def make_response(tokens=30, cost=0.002):
+    return SimpleNamespace(
+        usage=SimpleNamespace(prompt_tokens=tokens - 10, completion_tokens=10, total_tokens=tokens),
+        _hidden_params={"response_cost": cost}
+    )
+
+def sample(name, model):
+    return REGISTRY.get_sample_value(name, {"model": model}) or 0
+
+@pytest.fixture
+def manager(tmp_path):
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps({
+        "litellm": {"models": [], "default_model": "test-model"},
+        "monitoring": {"prometheus": {"enabled": False}}
+    }))
+    return LiteLLMManager(ConfigManager(str(config_path)))
+
+def test_completion_records_latency_tokens_and_cost(manager):
+    before = sample('llm_request_duration_seconds_count', 'metrics-model')
+    with patch('litellm.completion', return_value=make_response()):
+        manager.completion([{"role": "user", "content": "hi"}], model="metrics-model")
+
+    assert sample('llm_request_duration_seconds_count', 'metrics-model') == before + 1
+    assert sample('llm_requests_total', 'metrics-model') >= 1
+    assert sample('llm_tokens_total', 'metrics-model') >= 30
+    assert sample('llm_cost_total', 'metrics-model') == pytest.approx(0.002)
+
+def test_completion_error_is_counted(manager):
+    before = sample('llm_errors_total', 'failing-model')
+    with patch('litellm.completion', side_effect=RuntimeError("provider down")):
+        with pytest.raises(RuntimeError):
+            manager.completion([], model="failing-model")
+    assert sample('llm_errors_total', 'failing-model') == before + 1
+
+@pytest.mark.asyncio
+async def test_streamed_acompletion_records_time_to_first_token(manager):
+    async def stream():
+        yield SimpleNamespace(usage=None)
+        yield make_response(tokens=12)
+
+    async def acompletion(**kwargs):
+        return stream()
+
+    with patch('litellm.acompletion', side_effect=acompletion):
+        chunks = [c async for c in await manager.acompletion([], model="stream-model", stream=True)]
+
+    assert len(chunks) == 2
+    assert sample('llm_time_to_first_token_seconds_count', 'stream-model') == 1
+    assert sample('llm_tokens_total', 'stream-model') == 12
+
+@pytest.mark.asyncio
+async def test_abandoned_stream_releases_its_admission_on_close(manager):
+    async def endless():
+        while True:
+            yield SimpleNamespace(usage=None)
+            await asyncio.sleep(0)
+
+    async def acompletion(**kwargs):
+        return endless()
+
+    with patch('litellm.acompletion', side_effect=acompletion):
+        async with await manager.acompletion([], model="stream-model", stream=True) as stream:
+            await stream.__anext__()
+            await stream.__anext__()
+            assert manager.admission.in_flight == 1
+        assert manager.admission.in_flight == 0
+
+        stream = await manager.acompletion([], model="stream-model", stream=True)
+        await stream.aclose()
+        assert manager.admission.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_acompletion_retries_after_rate_limit(manager):
+    calls = []
+
+    async def acompletion(**kwargs):
+        calls.append(kwargs["model"])
+        if len(calls) == 1:
+            raise RateLimited()
+        return make_response()
+
+    class RateLimited(Exception):
+        status_code = 429
+        litellm_response_headers = {"retry-after": "0.05"}
+
+    with patch('litellm.acompletion', side_effect=acompletion):
+        response = await manager.acompletion([], model="limited-model", agent="coder")
+
+    assert response.usage.total_tokens == 30
+    assert len(calls) == 2
+    assert manager.admission.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_acompletion_fails_over_to_fallback_model(manager):
+    manager.config.set('litellm.fallback_models', ["backup-model"])
+
+    async def acompletion(**kwargs):
+        if kwargs["model"] == "broken-model":
+            raise RuntimeError("provider down")
+        return make_response()
+
+    with patch('litellm.acompletion', side_effect=acompletion):
+        response = await manager.acompletion([], model="broken-model")
+
+    assert response.usage.total_tokens == 30
+    assert sample('llm_errors_total', 'broken-model') >= 1
+
+@pytest.mark.asyncio
+async def test_slow_request_is_hedged_and_loser_cancelled(manager):
+    manager.config.set('litellm.fallback_models', ["fast-model"])
+    manager.config.set('litellm.hedging', {"enabled": True, "min_samples": 5})
+    for _ in range(5):
+        manager._record_first_token("slow-model", 0.02)
+    cancelled = []
+
+    async def acompletion(**kwargs):
+        if kwargs["model"] == "slow-model":
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(kwargs["model"])
+                raise
+        return make_response(tokens=7)
+
+    with patch('litellm.acompletion', side_effect=acompletion):
+        response = await asyncio.wait_for(manager.acompletion([], model="slow-model"), 2)
+
+    assert response.usage.total_tokens == 7
+    assert cancelled == ["slow-model"]
+    assert manager.admission.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_hedge_timer_starts_after_admission(manager):
+    manager.config.set('litellm.fallback_models', ["fast-model"])
+    manager.config.set('litellm.hedging', {"enabled": True, "min_samples": 5})
+    for _ in range(5):
+        manager._record_first_token("queued-model", 0.02)
+    manager.admission.max_concurrent = 1
+    called = []
+
+    async def acompletion(**kwargs):
+        called.append(kwargs["model"])
+        return make_response(tokens=5)
+
+    # Another request holds the only slot for longer than the hedge delay
+    slot = await manager.admission.admit("other-model")
+    asyncio.get_running_loop().call_later(0.1, slot.release)
+    with patch('litellm.acompletion', side_effect=acompletion):
+        response = await asyncio.wait_for(manager.acompletion([], model="queued-model"), 2)
+
+    assert response.usage.total_tokens == 5
+    assert called == ["queued-model"]
+
+@pytest.mark.asyncio
+async def test_attempt_failing_before_admission_is_collected(manager):
+    manager.config.set('litellm.fallback_models', ["fast-model"])
+    manager.config.set('litellm.hedging', {"enabled": True, "min_samples": 5})
+    for _ in range(5):
+        manager._record_first_token("broken-model", 0.02)
+
+    # Token estimation rejects the message before either attempt is admitted
+    with patch('litellm.acompletion') as call:
+        with pytest.raises(AttributeError):
+            await asyncio.wait_for(manager.acompletion(["not a dict"], model="broken-model"), 2)
+    assert not call.called
+
+@pytest.mark.asyncio
+async def test_acompletion_serves_repeats_from_cache(manager, tmp_path):
+    manager.cache = ResponseCache(str(tmp_path / "cache.db"))
+    messages = [{"role": "user", "content": "same prompt"}]
+    response = litellm.ModelResponse(
+        choices=[{"message": {"role": "assistant", "content": "cached"}}],
+        usage={"prompt_tokens": 2, "completion_tokens": 1, "total_tokens": 3})
+
+    with patch('litellm.acompletion', return_value=response) as call:
+        await manager.acompletion(messages, model="cache-model", temperature=0)
+        hit = await manager.acompletion(messages, model="cache-model", temperature=0)
+        manager.set_cache_bypass("fresh-agent")
+        await manager.acompletion(messages, model="cache-model", agent="fresh-agent", temperature=0)
+
+    assert hit.choices[0].message.content == "cached"
+    assert hit._hidden_params["cache_hit"]
+    assert call.call_count == 2
+    assert manager.cache.get_stats()["hit_rate"] == 0.5
+
+def test_model_changes_are_applied_incrementally(manager):
+    with patch.object(manager, 'register_model') as register:
+        manager.config.set('litellm.models', [{"name": "a", "rate_limit": 10}, {"name": "b"}])
+        manager.config.set('litellm.models', [{"name": "a", "rate_limit": 20}, {"name": "b"}])
+        manager.config.set('litellm.models', [{"name": "a", "rate_limit": 20}])
+
+    assert [c.args[0]["name"] for c in register.call_args_list] == ["a", "b", "a"]
+    assert manager.admission.model_limits["a"]["rpm"] == 20
+    assert "b" not in manager.admission.model_limits
+    assert list(manager.models) == ["a"]
+
+@pytest.mark.asyncio
+async def test_model_changes_from_another_thread_run_on_the_loop(manager):
+    (await manager.admission.admit("a")).release()
+    threads = []
+
+    def register(model_config):
+        threads.append(threading.get_ident())
+
+    with patch.object(manager, 'register_model', side_effect=register):
+        await asyncio.to_thread(manager.config.set, 'litellm.models', [{"name": "a", "rate_limit": 5}])
+        await asyncio.sleep(0)
+
+    assert threads == [threading.get_ident()]
+    assert manager.admission.model_limits["a"]["rpm"] == 5
@@ -0,0 +1,104 @@
+import pytest
+import json
+import time
+from log_writer import BatchedLogWriter
+from monitor import Monitor
+
+def read_lines(path):
+    return [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+
+def test_log_task_writes_compact_ndjson(tmp_path):
+    path = tmp_path / "tasks.ndjson"
+    monitor = Monitor(BatchedLogWriter(str(path), flush_interval=0.01))
+    monitor.log_task("t1", "completed", {"agent": "a"})
+    monitor.log_task("t2", "failed", {"error": "boom"})
+    monitor.close()
+
+    entries = read_lines(path)
+    assert [e["task_id"] for e in entries] == ["t1", "t2"]
+    assert entries[1]["details"] == {"error": "boom"}
+    assert ": " not in path.read_text(encoding='utf-8')
+    status = monitor.get_status()
+    assert status["tasks_completed"] == 1
+    assert status["tasks_failed"] == 1
+    assert status["logging"]["written"] == 2
+
+def test_full_buffer_drops_and_counts(tmp_path):
+    writer = BatchedLogWriter(str(tmp_path / "tasks.ndjson"), capacity=10,
+                              batch_size=1000, flush_interval=60)
+    accepted = [writer.write({"n": i}) for i in range(15)]
+    assert accepted.count(False) == 5
+    assert writer.get_stats()["dropped"] == 5
+    writer.close()
+    assert writer.get_stats()["written"] == 10
+
+def test_rotation_keeps_backups(tmp_path):
+    path = tmp_path / "tasks.ndjson"
+    writer = BatchedLogWriter(str(path), batch_size=10, flush_interval=0.01,
+                              max_bytes=200, backup_count=2)
+    for i in range(100):
+        writer.write({"n": i, "padding": "x" * 20})
+    writer.close()
+
+    assert (tmp_path / "tasks.ndjson.1").exists()
+    assert not (tmp_path / "tasks.ndjson.3").exists()
+
+def test_latency_percentiles_per_series(tmp_path):
+    monitor = Monitor(BatchedLogWriter(str(tmp_path / "tasks.ndjson")))
+    for i in range(1, 101):
+        monitor.log_task(str(i), "completed",
+                         {"latency": i / 100, "agent": "coder", "endpoint": "primary"})
+    monitor.log_task("slow", "failed", {"latency": 30.0, "endpoint": "backup"})
+    monitor.close()
+
+    latency = monitor.get_status()["latency"]
+    coder = latency["agent"]["coder"]
+    assert coder["count"] == 100
+    assert coder["p50"] == pytest.approx(0.50, rel=0.03)
+    assert coder["p99"] == pytest.approx(0.99, rel=0.03)
+    assert latency["endpoint"]["backup"]["max"] == 30.0
+    assert set(latency["status"]) == {"completed", "failed"}
+    assert monitor.get_throughput()["endpoint"]["primary"] > 0
+
+def test_bad_entries_are_dropped_and_the_writer_keeps_running(tmp_path):
+    path = tmp_path / "tasks.ndjson"
+    writer = BatchedLogWriter(str(path), batch_size=1000, flush_interval=60)
+    encode = writer._encode
+    def broken(entry):
+        writer._encode = encode
+        raise RuntimeError("unexpected")
+    writer._encode = broken
+
+    circular = {}
+    circular["self"] = circular
+    for entry in ({"n": "lost"}, circular, {"n": 1}):
+        writer.write(entry)
+    writer._wakeup.set()
+    for _ in range(100):
+        if writer._encode is encode:
+            break
+        time.sleep(0.01)
+    writer.write({"n": 2})
+    writer.close()
+
+    assert [e["n"] for e in read_lines(path)] == [1, 2]
+    assert writer.get_stats()["dropped"] == 1
+
+def test_log_task_copies_details(tmp_path):
+    path = tmp_path / "tasks.ndjson"
+    monitor = Monitor(BatchedLogWriter(str(path), flush_interval=60))
+    details = {"agent": "a"}
+    monitor.log_task("t1", "completed", details)
+    details["agent"] = "changed"
+    monitor.close()
+
+    assert read_lines(path)[0]["details"] == {"agent": "a"}
+
+def test_series_are_bounded_by_recent_use(tmp_path):
+    monitor = Monitor(BatchedLogWriter(str(tmp_path / "tasks.ndjson")), max_series=2)
+    for agent in ("a", "b", "a", "c"):
+        monitor.log_task(agent, "completed", {"latency": 0.1, "agent": agent})
+    monitor.close()
+
+    assert list(monitor.get_latency()["agent"]) == ["a", "c"]
+    assert list(monitor.get_throughput()["agent"]) == ["a", "c"]
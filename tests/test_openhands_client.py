@@ -1,8 +1,37 @@
 import pytest
 import json
+import asyncio
 from core.openhands_client import OpenHandsClient, OpenHandsEndpoint
+from core.connection_pool import ConnectionPool
 from unittest.mock import AsyncMock, patch
 
+class FakeWebSocket:
+    """Echoes a canned response for every request, tagged with its request ID"""
+    def __init__(self, response, delays=None):
+        self.response = response
+        self.delays = delays or {}
+        self.sent = []
+        self.incoming = asyncio.Queue()
+
+    async def send(self, message):
+        payload = json.loads(message)
+        self.sent.append(payload)
+        delay = self.delays.get(payload["command"], 0)
+        asyncio.get_running_loop().call_later(
+            delay, self.incoming.put_nowait,
+            json.dumps({**self.response, "request_id": payload["request_id"],
+                        "command": payload["command"]})
+        )
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.incoming.get()
+
+    async def close(self):
+        pass
+
 @pytest.fixture
 def mock_client():
     config = {
@@ -26,12 +55,35 @@ async def test_send_command_success(mock_client):
     mock_response = {"status": "success"}
     
     with patch('websockets.connect', new_callable=AsyncMock) as mock_connect:
-        mock_ws = AsyncMock()
-        mock_ws.recv.return_value = json.dumps(mock_response)
-        mock_connect.return_value.__aenter__.return_value = mock_ws
+        mock_connect.return_value = FakeWebSocket(mock_response)
         
         response = await mock_client.send_command(endpoint, "test")
-        assert response == mock_response
+        assert response["status"] == "success"
+        assert response["command"] == "test"
+
+@pytest.mark.asyncio
+async def test_send_command_reuses_pooled_connection(mock_client):
+    endpoint = mock_client.endpoints[0]
+    sockets = []
+    
+    def connect(*args, **kwargs):
+        sockets.append(FakeWebSocket({"status": "success"}, delays={"slow": 0.05}))
+        return sockets[-1]
+    
+    with patch('websockets.connect', new_callable=AsyncMock) as mock_connect:
+        mock_connect.side_effect = connect
+        
+        slow, fast = await asyncio.gather(
+            mock_client.send_command(endpoint, "slow"),
+            mock_client.send_command(endpoint, "fast")
+        )
+        again = await mock_client.send_command(endpoint, "again")
+        
+        assert slow["command"] == "slow"
+        assert fast["command"] == "fast"
+        assert again["command"] == "again"
+        assert len(sockets) == 2
+        assert sum(len(ws.sent) for ws in sockets) == 3
 
 @pytest.mark.asyncio
 async def test_send_command_failure(mock_client):
@@ -46,4 +98,135 @@ async def test_send_command_failure(mock_client):
 def test_get_active_endpoints(mock_client):
     endpoints = mock_client.get_active_endpoints()
     assert len(endpoints) == 1
-    assert endpoints[0].name == "test"
\ No newline at end of file
+    assert endpoints[0].name == "test"
+class StreamingWebSocket(FakeWebSocket):
+    """Answers a streamed command with events split across several frames"""
+    async def send(self, message):
+        self.sent.append(json.loads(message))
+        for frame in ('{"step": 1}{"st', 'ep": 2}\n', '{"step": 3, "done": true}'):
+            self.incoming.put_nowait(frame)
+
+@pytest.mark.asyncio
+async def test_stream_command_yields_events_in_order(mock_client):
+    endpoint = mock_client.endpoints[0]
+    
+    with patch('websockets.connect', new_callable=AsyncMock) as mock_connect:
+        mock_connect.return_value = StreamingWebSocket({})
+        
+        events = [e async for e in mock_client.stream_command(endpoint, "long")]
+        
+        assert [e["step"] for e in events] == [1, 2, 3]
+        assert mock_connect.return_value.sent[0]["stream"] is True
+        assert len(mock_client.pools[endpoint.name].connections) == 1
+
+def test_apply_endpoints_updates_incrementally():
+    client = OpenHandsClient({"endpoints": [
+        {"name": "keep", "url": "ws://a", "api_key": "", "timeout": 30, "active": True},
+        {"name": "move", "url": "ws://b", "api_key": "", "timeout": 30, "active": True},
+        {"name": "drop", "url": "ws://c", "api_key": "", "timeout": 30, "active": True}
+    ]})
+    keep = client.endpoints[0]
+    kept_pool, moved_pool = client._get_pool(keep), client._get_pool(client.endpoints[1])
+
+    added, removed = client.apply_endpoints([
+        {"name": "keep", "url": "ws://a", "api_key": "", "timeout": 30, "active": False},
+        {"name": "move", "url": "ws://b2", "api_key": "", "timeout": 30, "active": True},
+        {"name": "new", "url": "ws://d", "api_key": "", "timeout": 30, "active": True}
+    ])
+
+    assert (added, removed) == (["new"], ["drop"])
+    assert client.endpoints[0] is keep and not keep.active
+    assert client.pools["keep"] is kept_pool
+    assert "move" not in client.pools
+    assert client._get_pool(client.endpoints[1]) is not moved_pool
+
+class NoisyWebSocket(FakeWebSocket):
+    """Sends a garbage frame before every real response"""
+    async def send(self, message):
+        self.incoming.put_nowait("not json")
+        await super().send(message)
+
+@pytest.mark.asyncio
+async def test_non_json_frame_is_skipped(mock_client):
+    endpoint = mock_client.endpoints[0]
+    with patch('websockets.connect', new_callable=AsyncMock) as mock_connect:
+        mock_connect.return_value = NoisyWebSocket({"status": "success"})
+        first = await mock_client.send_command(endpoint, "one")
+        second = await mock_client.send_command(endpoint, "two")
+        assert (first["command"], second["command"]) == ("one", "two")
+
+@pytest.mark.asyncio
+async def test_url_change_closes_old_pool(mock_client):
+    endpoint = mock_client.endpoints[0]
+    with patch('websockets.connect', new_callable=AsyncMock) as mock_connect:
+        mock_connect.side_effect = lambda *a, **k: FakeWebSocket({"status": "success"})
+        await mock_client.send_command(endpoint, "warm")
+        old_pool = mock_client.pools[endpoint.name]
+        old_connection = old_pool.connections[0]
+
+        endpoint.url = "ws://localhost:51091"
+        await mock_client.send_command(endpoint, "moved")
+        await mock_client.close()
+        assert mock_client.pools == {}
+        assert old_connection.closed
+        assert old_pool.connections == []
+
+class OverrunWebSocket(StreamingWebSocket):
+    """Keeps sending frames after the final event"""
+    async def send(self, message):
+        await super().send(message)
+        for step in (4, 5):
+            self.incoming.put_nowait(json.dumps({"step": step}))
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_frames", [1, 64])
+async def test_stream_with_frames_past_the_end_is_not_pooled(mock_client, max_frames):
+    endpoint = mock_client.endpoints[0]
+    mock_client.stream_config = {"max_frames": max_frames}
+
+    with patch('websockets.connect', new_callable=AsyncMock) as mock_connect:
+        mock_connect.return_value = OverrunWebSocket({})
+
+        events = [e async for e in mock_client.stream_command(endpoint, "long")]
+
+        assert [e["step"] for e in events] == [1, 2, 3]
+        assert mock_client.pools[endpoint.name].connections == []
+
+@pytest.mark.asyncio
+async def test_slow_handshake_does_not_block_other_acquires():
+    gate = asyncio.Event()
+    sockets = []
+
+    async def connect(*args, **kwargs):
+        websocket = FakeWebSocket({"status": "success"})
+        sockets.append(websocket)
+        if len(sockets) == 1:
+            await gate.wait()
+        return websocket
+
+    pool = ConnectionPool("ws://localhost:51090", size=2)
+    with patch('websockets.connect', side_effect=connect):
+        slow = asyncio.create_task(pool.acquire())
+        await asyncio.sleep(0)
+        fast = await asyncio.wait_for(pool.acquire(), 1)
+        assert not slow.done()
+        # Both slots are taken, so a third caller reuses the open connection
+        assert await pool.acquire() is fast
+        gate.set()
+        assert (await slow).websocket is sockets[0]
+        assert len(pool.connections) == 2
+    await pool.close()
+
+@pytest.mark.asyncio
+async def test_cancel_during_retry_backoff_is_accounted(mock_client):
+    endpoint = mock_client.endpoints[0]
+    with patch('websockets.connect', new_callable=AsyncMock) as mock_connect:
+        mock_connect.side_effect = OSError("refused")
+        task = asyncio.create_task(mock_client.send_command(endpoint, "test"))
+        while not mock_connect.called:
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    assert mock_client.scheduler.get_state()["test"]["outstanding"] == 0
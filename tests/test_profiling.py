@@ -0,0 +1,21 @@
+import io
+import sys
+from utils.profiling import StartupProfiler
+
+def test_profiler_times_first_imports_and_phases(monkeypatch):
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+    profiler = StartupProfiler()
+    profiler.install()
+    try:
+        import colorsys  # noqa: F401
+        profiler.mark("imported")
+    finally:
+        profiler.uninstall()
+
+    assert "colorsys" in profiler.imports
+    inclusive, own, depth = profiler.imports["colorsys"]
+    assert inclusive >= own >= 0
+    out = io.StringIO()
+    profiler.report(out)
+    assert "imported" in out.getvalue()
+    assert "colorsys" in out.getvalue()
@@ -0,0 +1,85 @@
+import time
+import asyncio
+import pytest
+from types import SimpleNamespace
+from core.rate_limiter import AdmissionController, TokenBucket, retry_after
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_is_global():
+    controller = AdmissionController(max_concurrent=2)
+    peak = 0
+
+    async def request(model):
+        nonlocal peak
+        async with await controller.admit(model):
+            peak = max(peak, controller.in_flight)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(request(f"model-{i % 3}") for i in range(9)))
+    assert peak == 2
+    assert controller.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_waiting_requests_are_shared_fairly_between_agents():
+    controller = AdmissionController(max_concurrent=1)
+    order = []
+
+    async def request(agent):
+        async with await controller.admit("gpt", agent):
+            order.append(agent)
+            await asyncio.sleep(0)
+
+    # One agent floods the queue before the other asks once
+    tasks = [asyncio.create_task(request("busy")) for _ in range(5)]
+    tasks.append(asyncio.create_task(request("quiet")))
+    await asyncio.gather(*tasks)
+    assert order.index("quiet") <= 2
+
+def test_token_bucket_refills_at_rate():
+    bucket = TokenBucket(rate_per_minute=600, capacity=2)
+    now = time.monotonic()
+    assert bucket.wait_time(1, now) == 0
+    bucket.consume(2)
+    assert bucket.wait_time(1, now) == pytest.approx(0.1, rel=0.05)
+    assert bucket.wait_time(1, now + 0.11) == 0
+
+@pytest.mark.asyncio
+async def test_rpm_budget_delays_requests():
+    controller = AdmissionController(model_limits={"gpt": {"rpm": 600}})
+    controller._state("gpt").rpm = TokenBucket(600, capacity=1)
+    started = time.monotonic()
+    for _ in range(3):
+        (await controller.admit("gpt")).release()
+    # One immediately from the burst, then one every 0.1s
+    assert time.monotonic() - started >= 0.18
+
+@pytest.mark.asyncio
+async def test_rate_limit_pauses_model_for_retry_after():
+    controller = AdmissionController(model_limits={"gpt": {"rpm": 6000}})
+    controller.report_rate_limited("gpt", retry_after=0.2)
+    started = time.monotonic()
+    (await controller.admit("gpt")).release()
+    assert time.monotonic() - started >= 0.19
+    assert controller.get_state()["models"]["gpt"]["rpm"] < 6000
+
+    # Other models are not held back
+    started = time.monotonic()
+    (await controller.admit("claude")).release()
+    assert time.monotonic() - started < 0.1
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_a_slot():
+    controller = AdmissionController(max_concurrent=1)
+    held = await controller.admit("gpt")
+    waiter = asyncio.create_task(controller.admit("gpt"))
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    held.release()
+    await asyncio.gather(waiter, return_exceptions=True)
+    (await asyncio.wait_for(controller.admit("gpt"), 1)).release()
+    assert controller.in_flight == 0
+
+def test_retry_after_header_is_parsed():
+    error = SimpleNamespace(status_code=429, litellm_response_headers={"retry-after": "7"})
+    assert retry_after(error) == 7.0
+    assert retry_after(SimpleNamespace(status_code=429)) is None
@@ -0,0 +1,104 @@
+import time
+import sqlite3
+import pytest
+from core.response_cache import ResponseCache
+
+def make_cache(tmp_path, **kwargs):
+    return ResponseCache(str(tmp_path / "cache.db"), **kwargs)
+
+def test_exact_hit_survives_restart(tmp_path):
+    cache = make_cache(tmp_path)
+    scope = ResponseCache.scope("gpt-4", {"temperature": 0, "stream": False})
+    key = ResponseCache.key(scope, [{"role": "user", "content": "hi"}])
+    assert cache.get(key) is None
+    cache.put(key, scope, {"answer": 42})
+    assert cache.get(key) == {"answer": 42}
+    cache.close()
+
+    reopened = make_cache(tmp_path)
+    assert reopened.get(key) == {"answer": 42}
+    assert reopened.get_stats()["hits"] == 1
+
+def test_params_that_change_the_answer_change_the_key():
+    base = ResponseCache.scope("gpt-4", {"temperature": 0})
+    assert ResponseCache.scope("gpt-4", {"temperature": 0, "timeout": 5}) == base
+    assert ResponseCache.scope("gpt-4", {"temperature": 1}) != base
+    assert ResponseCache.scope("gpt-3.5", {"temperature": 0}) != base
+
+def test_expired_entries_are_not_returned(tmp_path):
+    cache = make_cache(tmp_path, ttl=0.05)
+    cache.put("k", "s", {"answer": 1})
+    time.sleep(0.1)
+    assert cache.get("k") is None
+
+def test_memory_tier_is_size_bounded_lru(tmp_path):
+    cache = make_cache(tmp_path, max_entries=2, max_disk_entries=2)
+    for key in ("a", "b", "c"):
+        cache.put(key, "s", {"key": key})
+    assert list(cache._memory) == ["b", "c"]
+    cache.evict()
+    assert cache.get("a") is None
+    assert cache.get("c") == {"key": "c"}
+
+def test_semantic_tier_matches_similar_prompts_in_same_scope(tmp_path):
+    cache = make_cache(tmp_path, similarity_threshold=0.9)
+    cache.put("k", "scope", {"answer": 1}, embedding=[1.0, 0.0, 0.1])
+    assert cache.find_similar("scope", [0.98, 0.02, 0.1]) == {"answer": 1}
+    assert cache.find_similar("scope", [0.0, 1.0, 0.0]) is None
+    assert cache.find_similar("other", [1.0, 0.0, 0.1]) is None
+
+def test_writes_are_batched_behind_the_caller(tmp_path):
+    cache = make_cache(tmp_path, flush_interval=60)
+    cache.put("k", "s", {"answer": 1})
+    # Readable at once, but not written until the flush
+    assert cache._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] == 0
+    cache._memory.clear()
+    assert cache.get("k") == {"answer": 1}
+    cache.flush()
+    assert cache._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] == 1
+    cache.close()
+
+@pytest.mark.asyncio
+async def test_async_lookups_read_the_disk_tier(tmp_path):
+    cache = make_cache(tmp_path, similarity_threshold=0.9)
+    cache.put("k", "scope", {"answer": 1}, embedding=[1.0, 0.0])
+    cache.flush()
+    cache._memory.clear()
+
+    assert await cache.aget("k") == {"answer": 1}
+    cache._memory.clear()
+    assert await cache.afind_similar("scope", [0.99, 0.01]) == {"answer": 1}
+    assert await cache.aget("missing") is None
+    cache.close()
+    accessed = ResponseCache(str(tmp_path / "cache.db"))._conn.execute(
+        "SELECT accessed_at > created_at FROM responses").fetchone()[0]
+    assert accessed == 1
+
+def test_failed_flush_keeps_the_batch(tmp_path):
+    cache = make_cache(tmp_path, flush_interval=60)
+    cache.put("k", "s", {"answer": 1})
+    cache._conn.execute("DROP TABLE responses")
+    with pytest.raises(sqlite3.Error):
+        cache.flush()
+    assert "k" in cache._pending
+
+    cache._conn.executescript(ResponseCache._SCHEMA)
+    cache.flush()
+    assert cache._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] == 1
+    cache.close()
+
+@pytest.mark.asyncio
+async def test_evicted_best_match_falls_back_to_the_next(tmp_path):
+    cache = make_cache(tmp_path, similarity_threshold=0.9)
+    cache.put("near", "scope", {"answer": "near"}, embedding=[1.0, 0.0])
+    cache.put("close", "scope", {"answer": "close"}, embedding=[0.95, 0.05])
+    cache.flush()
+    # The best match's row is gone but its vector is still indexed
+    cache._memory.clear()
+    cache._conn.execute("DELETE FROM responses WHERE key = 'near'")
+    cache._conn.commit()
+
+    assert cache.find_similar("scope", [1.0, 0.0]) == {"answer": "close"}
+    assert await cache.afind_similar("scope", [1.0, 0.0]) == {"answer": "close"}
+    assert await cache.afind_similar("scope", [0.0, 1.0]) is None
+    cache.close()
@@ -0,0 +1,60 @@
+import pytest
+from core.openhands_client import OpenHandsEndpoint
+from core.scheduler import EndpointScheduler, CircuitBreaker
+
+def make_endpoints(*names):
+    return [
+        OpenHandsEndpoint(name=name, url=f"ws://{name}:51090", api_key="",
+                          timeout=30, active=True)
+        for name in names
+    ]
+
+def test_round_robin_cycles_endpoints():
+    scheduler = EndpointScheduler("round_robin")
+    endpoints = make_endpoints("a", "b", "c")
+    picks = [scheduler.select(endpoints).name for _ in range(6)]
+    assert picks == ["a", "b", "c", "a", "b", "c"]
+
+def test_least_outstanding_prefers_idle_endpoint():
+    scheduler = EndpointScheduler("least_outstanding")
+    a, b = make_endpoints("a", "b")
+    scheduler.on_start(a)
+    assert scheduler.select([a, b]).name == "b"
+
+def test_latency_weighted_prefers_fast_endpoint():
+    scheduler = EndpointScheduler("latency_weighted")
+    a, b = make_endpoints("a", "b")
+    for endpoint, latency in ((a, 2.0), (b, 0.1)):
+        scheduler.on_start(endpoint)
+        scheduler.on_success(endpoint, latency)
+    assert scheduler.select([a, b]).name == "b"
+
+def test_consistent_hash_is_sticky_per_key():
+    scheduler = EndpointScheduler("consistent_hash")
+    endpoints = make_endpoints("a", "b", "c")
+    first = scheduler.select(endpoints, key="task-42").name
+    assert all(scheduler.select(endpoints, key="task-42").name == first for _ in range(5))
+
+def test_circuit_breaker_removes_and_restores_endpoint(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("core.scheduler.time.monotonic", lambda: clock[0])
+    scheduler = EndpointScheduler("round_robin", failure_threshold=2, recovery_timeout=10)
+    a, b = make_endpoints("a", "b")
+    for _ in range(2):
+        scheduler.on_start(a)
+        scheduler.on_failure(a)
+    assert scheduler.breakers["a"].state == CircuitBreaker.OPEN
+    assert {scheduler.select([a, b]).name for _ in range(4)} == {"b"}
+
+    clock[0] += 10
+    assert scheduler.select([a], exclude=()).name == "a"
+    scheduler.on_start(a)
+    scheduler.on_success(a, 0.1)
+    assert scheduler.breakers["a"].state == CircuitBreaker.CLOSED
+
+def test_no_available_endpoints_raises():
+    scheduler = EndpointScheduler()
+    endpoints = make_endpoints("a")
+    endpoints[0].active = False
+    with pytest.raises(ConnectionError):
+        scheduler.select(endpoints)
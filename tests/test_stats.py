@@ -0,0 +1,28 @@
+import random
+import pytest
+from core.stats import LatencyHistogram, SlidingWindowRate
+
+def test_histogram_quantiles_within_relative_error():
+    rng = random.Random(7)
+    samples = sorted(rng.lognormvariate(0, 1) for _ in range(20000))
+    histogram = LatencyHistogram(relative_error=0.02)
+    for value in samples:
+        histogram.record(value)
+    for q in (0.5, 0.9, 0.99):
+        exact = samples[int(q * len(samples)) - 1]
+        assert histogram.quantile(q) == pytest.approx(exact, rel=0.03)
+
+def test_histogram_memory_is_fixed():
+    histogram = LatencyHistogram()
+    buckets = len(histogram._counts)
+    for i in range(10000):
+        histogram.record(i * 0.01)
+    assert len(histogram._counts) == buckets
+
+def test_sliding_window_rate_forgets_old_events():
+    rate = SlidingWindowRate(window=10, resolution=1)
+    for t in range(10):
+        rate.add(5, now=100 + t)
+    assert rate.rate(now=109) == pytest.approx(5.0)
+    assert rate.rate(now=115) == pytest.approx(2.0)
+    assert rate.rate(now=200) == 0
@@ -0,0 +1,28 @@
+import pytest
+from core.streaming import IncrementalJSONDecoder
+
+def test_values_split_across_chunks():
+    decoder = IncrementalJSONDecoder()
+    assert decoder.feed('{"type": "progress", "te') == []
+    assert decoder.feed('xt": "a } \\" b"}\n{"done"') == [
+        {"type": "progress", "text": 'a } " b'}
+    ]
+    assert decoder.feed(': true}') == [{"done": True}]
+    assert decoder.pending == 0
+
+def test_escape_split_at_chunk_boundary():
+    decoder = IncrementalJSONDecoder()
+    assert decoder.feed('{"s": "x\\') == []
+    assert decoder.feed('"y"}') == [{"s": 'x"y'}]
+
+def test_multibyte_bytes_split_across_chunks():
+    decoder = IncrementalJSONDecoder()
+    data = '{"msg": "héllo"}'.encode('utf-8')
+    split = data.index(b'\xc3') + 1
+    assert decoder.feed(data[:split]) == []
+    assert decoder.feed(data[split:]) == [{"msg": "héllo"}]
+
+def test_buffer_limit_is_enforced():
+    decoder = IncrementalJSONDecoder(max_buffer=16)
+    with pytest.raises(ValueError):
+        decoder.feed('{"data": "' + "x" * 32)
@@ -0,0 +1,33 @@
+import threading
+from task_queue import TaskQueue
+
+def test_equal_priorities_are_fifo():
+    queue = TaskQueue()
+    ids = [queue.add_task({"command": f"cmd-{i}"}) for i in range(5)]
+    assert [queue.get_next_task()["id"] for _ in range(5)] == ids
+
+def test_higher_priority_first_across_bulk_and_single_adds():
+    queue = TaskQueue()
+    low = queue.add_tasks([{"n": i} for i in range(3)], priority=1)
+    high = queue.add_task({"n": "urgent"}, priority=10)
+    assert queue.get_next_task()["id"] == high
+    assert [queue.get_next_task()["id"] for _ in range(3)] == low
+    assert queue.get_next_task() is None
+
+def test_ids_are_unique_and_monotonic_across_threads():
+    queue = TaskQueue()
+    results = []
+
+    def submit():
+        results.append(queue.add_tasks([{}] * 1000))
+
+    threads = [threading.Thread(target=submit) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    all_ids = [task_id for batch in results for task_id in batch]
+    assert len(set(all_ids)) == 8000
+    assert all(batch == sorted(batch) for batch in results)
+    assert queue.queue.qsize() == 8000
@@ -0,0 +1,66 @@
+import time
+import pytest
+from task_queue import TaskQueue
+from task_store import TaskStore
+
+@pytest.fixture
+def store_path(tmp_path):
+    return str(tmp_path / "tasks.db")
+
+def test_finished_tasks_move_to_disk(store_path):
+    store = TaskStore(store_path, batch_size=10)
+    queue = TaskQueue(store)
+    task_id = queue.add_task({"command": "build"}, priority=2)
+    queue.get_next_task()
+    queue.complete_task(task_id, {"output": "ok"})
+
+    assert task_id not in queue.task_status
+    status = queue.get_status(task_id)
+    assert status["status"] == "completed"
+    assert status["result"] == {"output": "ok"}
+    store.close()
+
+def test_lookup_by_status_orders_by_priority(store_path):
+    store = TaskStore(store_path)
+    queue = TaskQueue(store)
+    for priority in (1, 5, 3):
+        task_id = queue.add_task({"command": f"p{priority}"}, priority=priority)
+        queue.fail_task(task_id, "error")
+
+    failed = queue.get_tasks_by_status("failed")
+    assert [t["priority"] for t in failed] == [5, 3, 1]
+    assert store.count_by_status() == {"failed": 3}
+    store.close()
+
+def test_restart_resumes_unfinished_tasks(store_path):
+    store = TaskStore(store_path)
+    queue = TaskQueue(store)
+    done = queue.add_task({"command": "done"})
+    running = queue.add_task({"command": "running"}, priority=3)
+    waiting = queue.add_task({"command": "waiting"})
+    assert queue.get_next_task()["id"] == running
+    queue.complete_task(done, {})
+    store.close()
+
+    store = TaskStore(store_path)
+    queue = TaskQueue(store)
+    assert queue.resume() == 2
+    assert queue.get_next_task()["id"] == running
+    assert queue.get_next_task()["id"] == waiting
+    assert queue.get_next_task() is None
+    store.close()
+
+def test_full_batch_is_written_by_the_flusher_not_the_caller(store_path):
+    store = TaskStore(store_path, batch_size=2, flush_interval=60)
+    with store._db_lock:
+        # A slow write in progress must not block callers saving records
+        store.save({"id": "a", "status": "pending", "task": {}})
+        store.save({"id": "b", "status": "pending", "task": {}})
+        assert store.get("a")["status"] == "pending"
+    for _ in range(100):
+        if not store._pending:
+            break
+        time.sleep(0.01)
+    assert not store._pending
+    assert store.count_by_status() == {"pending": 2}
+    store.close()
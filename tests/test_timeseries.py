@@ -0,0 +1,70 @@
+import pytest
+from core.timeseries import RingBuffer, decimate_minmax, MetricsSampler
+from core.litellm_manager import LLMMetricsCollector
+from core.openhands_client import OpenHandsClient
+from log_writer import BatchedLogWriter
+from monitor import Monitor
+
+def test_ring_buffer_keeps_latest_points_in_order():
+    buffer = RingBuffer(4)
+    for t in range(10):
+        buffer.append(t, t * 10)
+    times, values = buffer.points()
+    assert list(times) == [6, 7, 8, 9]
+    assert list(values) == [60, 70, 80, 90]
+    assert list(buffer.points(since=8)[0]) == [8, 9]
+    assert len(buffer) == 4
+
+def test_decimation_keeps_spikes_within_point_budget():
+    times = list(range(10000))
+    values = [0.0] * 10000
+    values[1234] = 50.0
+    values[8765] = -7.0
+    xs, ys = decimate_minmax(times, values, buckets=100)
+    assert len(xs) <= 200
+    assert xs == sorted(xs)
+    assert (1234, 50.0) in zip(xs, ys)
+    assert (8765, -7.0) in zip(xs, ys)
+    assert decimate_minmax([1, 2], [3, 4], buckets=100) == ([1, 2], [3, 4])
+
+class StubResponse:
+    class usage:
+        total_tokens = 100
+    _hidden_params = {"response_cost": 0.02}
+
+def test_sampler_turns_cumulative_metrics_into_rates(tmp_path):
+    monitor = Monitor(BatchedLogWriter(str(tmp_path / "tasks.ndjson"), flush_interval=0.01))
+    metrics = LLMMetricsCollector()
+    client = OpenHandsClient({"endpoints": [
+        {"name": "a", "url": "ws://a", "api_key": "", "timeout": 5, "active": True},
+        {"name": "b", "url": "ws://b", "api_key": "", "timeout": 5, "active": False}
+    ]})
+    sampler = MetricsSampler(monitor, metrics, client, capacity=10)
+
+    metrics.for_model("gpt-4").observe(StubResponse(), 1.0)
+    sampler.sample(now=100.0)
+    for latency in (0.1, 0.2, 3.0):
+        monitor.log_task("t", "completed", {"latency": latency})
+    for _ in range(4):
+        metrics.for_model("gpt-4").observe(StubResponse(), 1.0)
+    sampler.sample(now=102.0)
+    monitor.close()
+
+    assert list(sampler.series["tokens"]["gpt-4"].points()[1]) == [200.0]
+    assert sampler.series["cost"]["gpt-4"].points()[1][0] == pytest.approx(0.04)
+    assert sampler.series["latency"]["p99"].points()[1][0] == pytest.approx(3.0, rel=0.05)
+    assert len(sampler.series["latency"]["p50"]) == 1
+    assert list(sampler.series["health"]["a"].points()[1]) == [1.0, 1.0]
+    assert list(sampler.series["health"]["b"].points()[1]) == [0.0, 0.0]
+    assert monitor.take_recent_latency().count == 0
+
+def test_capacity_change_resizes_existing_series():
+    sampler = MetricsSampler(capacity=3600)
+    for t in range(10):
+        sampler._append("throughput", "tasks/s", float(t), float(t))
+    sampler.set_capacity(4)
+    buffer = sampler.series["throughput"]["tasks/s"]
+    assert buffer.capacity == 4
+    assert list(buffer.points()[1]) == [6.0, 7.0, 8.0, 9.0]
+    sampler._append("throughput", "tasks/s", 10.0, 10.0)
+    assert list(buffer.points()[1]) == [7.0, 8.0, 9.0, 10.0]
@@ -0,0 +1,99 @@
+import asyncio
+import pytest
+from task_queue import TaskQueue
+from core.workflow import Workflow, WorkflowNode, WorkflowExecutor
+
+class StubAgents:
+    def __init__(self, failures=None, delay=0.01):
+        self.calls = []
+        self.failures = dict(failures or {})
+        self.delay = delay
+
+    async def run_agent(self, agent_name, input_text):
+        self.calls.append((agent_name, input_text))
+        await asyncio.sleep(self.delay)
+        if self.failures.get(agent_name, 0) > 0:
+            self.failures[agent_name] -= 1
+            raise RuntimeError(f"{agent_name} failed")
+        return f"{agent_name} done"
+
+def directive():
+    return Workflow("release", [
+        WorkflowNode("plan", "planner", "plan it"),
+        WorkflowNode("docs", "writer", "document $plan", depends_on=["plan"]),
+        WorkflowNode("code", "coder", "implement $plan", depends_on=["plan"], cost=5),
+        WorkflowNode("test", "tester", "test", depends_on=["code"], cost=2),
+        WorkflowNode("merge", "merger", "merge", depends_on=["docs", "test"])
+    ])
+
+def test_critical_path_and_cycle_detection():
+    assert directive().critical_path() == {
+        "merge": 1, "test": 3, "docs": 2, "code": 8, "plan": 9
+    }
+    cyclic = Workflow("loop", [
+        WorkflowNode("a", "x", "", depends_on=["b"]),
+        WorkflowNode("b", "x", "", depends_on=["a"])
+    ])
+    with pytest.raises(ValueError):
+        cyclic.topological_order()
+
+@pytest.mark.asyncio
+async def test_runs_in_dependency_order_with_critical_path_first():
+    agents = StubAgents()
+    workflow = await WorkflowExecutor(agents, TaskQueue(), max_parallel=1).run(directive())
+
+    assert workflow.finished
+    order = [agent for agent, _ in agents.calls]
+    assert order == ["planner", "coder", "tester", "writer", "merger"]
+    assert ("writer", "document planner done") in agents.calls
+
+@pytest.mark.asyncio
+async def test_ready_nodes_run_in_parallel():
+    agents = StubAgents(delay=0.1)
+    workflow = Workflow("fan-out", [WorkflowNode(str(i), f"agent-{i}", "go") for i in range(5)])
+    started = asyncio.get_running_loop().time()
+    await WorkflowExecutor(agents, TaskQueue()).run(workflow)
+    assert asyncio.get_running_loop().time() - started < 0.3
+
+@pytest.mark.asyncio
+async def test_failed_node_is_retried_without_rerunning_parents():
+    agents = StubAgents(failures={"tester": 2})
+    workflow = await WorkflowExecutor(agents, TaskQueue()).run(directive())
+
+    assert workflow.finished
+    assert workflow.nodes["test"].attempts == 3
+    assert [a for a, _ in agents.calls].count("coder") == 1
+
+@pytest.mark.asyncio
+async def test_resume_from_checkpoint_skips_finished_nodes(tmp_path):
+    checkpoint = tmp_path / "release.json"
+    agents = StubAgents(failures={"tester": 5})
+    first = await WorkflowExecutor(agents, TaskQueue(), checkpoint_path=str(checkpoint)).run(directive())
+    assert not first.finished
+    assert first.nodes["test"].status == "failed"
+    assert first.nodes["docs"].status == "completed"
+    assert first.nodes["merge"].status == "pending"
+
+    agents = StubAgents()
+    resumed = await WorkflowExecutor(agents, TaskQueue()).run(Workflow.load(str(checkpoint)))
+    assert resumed.finished
+    assert [a for a, _ in agents.calls] == ["tester", "merger"]
+
+def test_priorities_are_integer_ranks_of_the_critical_path():
+    workflow = directive()
+    workflow.nodes["docs"].cost = 1.5
+    priorities = WorkflowExecutor.priorities(workflow)
+    assert all(isinstance(p, int) for p in priorities.values())
+    assert priorities == {"merge": 1, "docs": 2, "test": 3, "code": 4, "plan": 5}
+
+@pytest.mark.asyncio
+async def test_concurrent_runs_on_one_queue_only_take_their_own_nodes():
+    agents = StubAgents()
+    executor = WorkflowExecutor(agents, TaskQueue(), max_parallel=1)
+    other = Workflow("fan-out", [WorkflowNode(f"step-{i}", f"agent-{i}", "go", cost=20)
+                                 for i in range(4)])
+    first, second = await asyncio.gather(executor.run(directive()), executor.run(other))
+
+    assert first.finished and second.finished
+    assert len(agents.calls) == 9
+    assert executor.task_queue.get_tasks_by_status("queued") == []